@@ -3,6 +3,37 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+
+#------------------------------------
+# production: hand the process to gunicorn before torch / db are loaded,
+# the worker imports wsgi.py which builds the app once inside itself
+#------------------------------------
+def execGunicorn():
+    import importlib.util
+    import dotenv
+
+    dotenv.load_dotenv()
+    if os.getenv('MKIT_SERVER', '').lower() != 'gunicorn': return
+    if not importlib.util.find_spec('gunicorn'):
+        print("[app] MKIT_SERVER=gunicorn but gunicorn is not installed, using werkzeug", flush=True)
+        return
+
+    # one worker: TskMgr state and socketio rooms live in a single process, threads carry the concurrency
+    os.execv(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        # keep the cwd, a relative MKIT_DATA (docker: data/ -> /app/data volume) must not move into src/
+        '--pythonpath', os.path.dirname(os.path.abspath(__file__)),
+        '--workers', '1',
+        '--worker-class', 'gthread',
+        '--threads', os.getenv('MKIT_THREADS', '64'),
+        '--bind', f"0.0.0.0:{os.getenv('MKIT_PORT', '8086')}",
+        '--timeout', '120',
+        '--graceful-timeout', '10',
+        'wsgi:server',
+    ])
+
+if __name__ == "__main__": execGunicorn()
+
 from dsh import dash, htm, dcc, dbc
 from util import log, err
 from conf import ks
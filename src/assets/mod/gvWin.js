@@ -0,0 +1,95 @@
+//------------------------------------------------------------------------
+// Windowed grids: placeholders load their cards when scrolled near
+//------------------------------------------------------------------------
+const GvWin = window.GvWin = {
+	margin: '800px 0px',
+	io: null,
+	queued: false,
+	cntCards: 0,
+
+	init()
+	{
+		this.io = new IntersectionObserver( ( ents ) => {
+			for ( const ent of ents )
+			{
+				if ( !ent.isIntersecting ) continue
+				this.load( ent.target )
+			}
+		}, { rootMargin: this.margin } )
+
+		this.schedule()
+
+		const observer = new MutationObserver( ( mus ) => {
+			for ( const mu of mus )
+			{
+				for ( const node of mu.addedNodes )
+				{
+					if ( node.nodeType != 1 ) continue
+					this.schedule()
+					return
+				}
+			}
+		} )
+		observer.observe( document.body, { childList: true, subtree: true } )
+	},
+
+	schedule()
+	{
+		if ( this.queued ) return
+		this.queued = true
+		requestAnimationFrame( () => {
+			this.queued = false
+			this.scan()
+		} )
+	},
+
+	load( el )
+	{
+		if ( el.dataset.req ) return
+		el.dataset.req = '1'
+		this.io.unobserve( el )
+		el.click() // n_clicks drives the gv_LoadWin callback
+	},
+
+	scan()
+	{
+		const mores = document.querySelectorAll( '.gv-more' )
+		mores.forEach( el => {
+			if ( el.dataset.obs ) return
+			el.dataset.obs = '1'
+			this.fitHeight( el )
+			this.io.observe( el )
+		} )
+
+		// cards of a loaded window come in unselected, reapply the client side selection
+		const cnt = document.querySelectorAll( `[id*='"type":"card-select"']` ).length
+		if ( cnt == this.cntCards ) return
+		this.cntCards = cnt
+		if ( window.Ste && Ste.selectedIds.size ) Ste.updAllCss()
+	},
+
+	// the server guesses the placeholder height, measure the real columns and row height once cards are on screen
+	fitHeight( el )
+	{
+		const grid = el.closest( '[style*="grid"]' )
+		if ( !grid ) return
+
+		const cols = getComputedStyle( grid ).gridTemplateColumns.split( ' ' ).filter( v => v ).length
+		const card = grid.querySelector( '.card' )
+		const cnt = parseInt( el.dataset.cnt || '0' )
+		if ( !cols || !card || !cnt ) return
+
+		const gap = parseFloat( getComputedStyle( grid ).rowGap ) || 0
+		const rowH = card.parentElement.offsetHeight + gap
+		el.style.height = `${ Math.ceil( cnt / cols ) * rowH }px`
+	},
+}
+
+if ( document.readyState == 'loading' )
+{
+	document.addEventListener( 'DOMContentLoaded', () => GvWin.init() )
+}
+else
+{
+	GvWin.init()
+}
@@ -0,0 +1,126 @@
+//------------------------------------------------------------------------
+// Batched grid images: cards with data-bid load in one /api/imgs request
+//------------------------------------------------------------------------
+const ImgBatch = window.ImgBatch = {
+	maxIds: 200,
+	maxUrls: 3000,
+	urls: new Map(),
+	queued: false,
+
+	init()
+	{
+		this.schedule()
+
+		const observer = new MutationObserver( ( mus ) => {
+			for ( const mu of mus )
+			{
+				if ( mu.type == 'attributes' )
+				{
+					this.schedule()
+					return
+				}
+				for ( const node of mu.addedNodes )
+				{
+					if ( node.nodeType != 1 ) continue
+					if ( node.matches?.( 'img[data-bid]' ) || node.querySelector?.( 'img[data-bid]' ) )
+					{
+						this.schedule()
+						return
+					}
+				}
+			}
+		} )
+		// react may reuse an img for another card, a changed data-bid reloads it
+		observer.observe( document.body, { childList: true, subtree: true, attributes: true, attributeFilter: [ 'data-bid' ] } )
+	},
+
+	schedule()
+	{
+		if ( this.queued ) return
+		this.queued = true
+		requestAnimationFrame( () => {
+			this.queued = false
+			this.flush()
+		} )
+	},
+
+	keyOf( aid, w ) { return `${ aid }_${ w || '' }` },
+
+	remember( key, url )
+	{
+		this.urls.set( key, url )
+		if ( this.urls.size <= this.maxUrls ) return
+
+		const [ oldKey, oldUrl ] = this.urls.entries().next().value
+		this.urls.delete( oldKey )
+		URL.revokeObjectURL( oldUrl )
+	},
+
+	flush()
+	{
+		const byW = {}
+
+		document.querySelectorAll( 'img[data-bid]' ).forEach( img => {
+			const aid = img.dataset.bid
+			const w = img.dataset.bw || ''
+			if ( img.dataset.bdone == aid ) return
+			img.dataset.bdone = aid
+
+			const url = this.urls.get( this.keyOf( aid, w ) )
+			if ( url )
+			{
+				img.src = url
+				return
+			}
+
+			( byW[ w ] = byW[ w ] || [] ).push( img )
+		} )
+
+		for ( const [ w, imgs ] of Object.entries( byW ) )
+		{
+			for ( let i = 0; i < imgs.length; i += this.maxIds ) this.load( imgs.slice( i, i + this.maxIds ), w )
+		}
+	},
+
+	async load( imgs, w )
+	{
+		const ids = [ ... new Set( imgs.map( img => img.dataset.bid ) ) ]
+
+		try
+		{
+			const rep = await fetch( `/api/imgs?ids=${ ids.join( ',' ) }${ w ? `&w=${ w }` : '' }` )
+			if ( !rep.ok ) throw new Error( `status ${ rep.status }` )
+
+			const buf = await rep.arrayBuffer()
+			const lenHead = new DataView( buf ).getUint32( 0 )
+			const items = JSON.parse( new TextDecoder().decode( new Uint8Array( buf, 4, lenHead ) ) )
+			const base = 4 + lenHead
+
+			for ( const it of items )
+			{
+				if ( !it.len ) continue
+				const blob = new Blob( [ new Uint8Array( buf, base + it.off, it.len ) ], { type: it.mime } )
+				this.remember( this.keyOf( it.aid, w ), URL.createObjectURL( blob ) )
+			}
+		}
+		catch ( e )
+		{
+			console.warn( `[ImgBatch] batch failed, fallback to single requests`, e )
+		}
+
+		for ( const img of imgs )
+		{
+			const aid = img.dataset.bid
+			img.src = this.urls.get( this.keyOf( aid, w ) ) || ( w ? `/api/rend/${ aid }?w=${ w }` : `/api/img/${ aid }` )
+		}
+	},
+}
+
+if ( document.readyState == 'loading' )
+{
+	document.addEventListener( 'DOMContentLoaded', () => ImgBatch.init() )
+}
+else
+{
+	ImgBatch.init()
+}
@@ -59,6 +59,9 @@ window.dash_clientside.similar = {
 
 	onNowSyncToDummyInit( now_data, ste_data )
 	{
+		// the grid may be windowed, exports read the assets from here instead of the cards
+		window.simAssCur = now_data?.sim?.assCur || []
+
 		if ( now_data && now_data.sim && now_data.sim.assCur )
 		{
 			let assets = now_data.sim.assCur
@@ -118,136 +121,62 @@ window.dash_clientside.similar = {
 
 
 //------------------------------------------------------------------------
-// Group assets by their visual groups in Similar View
+// Group assets by their similar groups (muod), in the order they are shown
 //------------------------------------------------------------------------
-function groupAssetsByVisualGroups(data) {
+function groupAssetsBySimGroups(slims) {
 	const groups = []
-	let currentGroupId = 1
-
-	// Find all group headers in the DOM
-	const gvContainer = document.querySelector('.gv.fsp')
-	if (!gvContainer) {
-		// No groups found, return all assets as one group
-		return [{
-			group: 1,
-			assets: data.map(item => ({
-				assetId: item.assetId,
-				autoId: parseInt(item.autoId),
-				filename: item.filename,
-				path: item.path
-			}))
-		}]
-	}
-
-	const children = Array.from(gvContainer.children)
-	let currentGroupAssets = []
-
-	children.forEach(child => {
-		// Check if this is a group header
-		if (child.classList.contains('hr')) {
-			// Save previous group if it has assets
-			if (currentGroupAssets.length > 0) {
-				groups.push({
-					group: currentGroupId,
-					assets: currentGroupAssets
-				})
-				currentGroupAssets = []
-				currentGroupId++
-			}
-		} else {
-			// This should be an asset card
-			const metaDiv = child.querySelector('.card-meta')
-			if (metaDiv && metaDiv.dataset.meta) {
-				try {
-					const meta = JSON.parse(metaDiv.dataset.meta)
-					currentGroupAssets.push({
-						assetId: meta.id,
-						autoId: parseInt(meta.autoId),
-						filename: meta.originalFileName,
-						path: meta.originalPath
-					})
-				} catch (e) {
-					console.error('[Export] Error parsing group asset meta:', e)
-				}
-			}
+	const byGid = new Map()
+
+	slims.forEach(ass => {
+		const gid = ass.vw?.muodId || 0
+		let grp = byGid.get(gid)
+		if (!grp) {
+			grp = { group: groups.length + 1, assets: [] }
+			byGid.set(gid, grp)
+			groups.push(grp)
 		}
+		grp.assets.push(toExportRow(ass))
 	})
 
-	// Add the last group
-	if (currentGroupAssets.length > 0) {
-		groups.push({
-			group: currentGroupId,
-			assets: currentGroupAssets
-		})
+	return groups
+}
+
+function toExportRow(ass) {
+	return {
+		assetId: ass.id || '',
+		autoId: parseInt(ass.autoId),
+		filename: ass.originalFileName || '',
+		path: ass.originalPath || ''
 	}
+}
 
-	return groups
+// windowed grids only render part of the cards, the view page looks its ids up on the server
+async function fetchViewSlims() {
+	const grid = document.querySelector('.gv[data-aids]')
+	const aids = grid ? grid.dataset.aids : ''
+	if (!aids) return []
+
+	const rep = await fetch(`/api/meta?ids=${aids}`)
+	if (!rep.ok) throw new Error(`meta lookup failed (${rep.status})`)
+	return await rep.json()
 }
 
 //------------------------------------------------------------------------
 // Export IDs to JSON
 //------------------------------------------------------------------------
-window.exportIdsToCSV = function exportIdsToCSV()
+window.exportIdsToCSV = async function exportIdsToCSV()
 {
 	try {
-		// Get all image cards that have meta data
-		const cards = document.querySelectorAll('.card-meta')
+		// Check if we're in Similar View to create grouped structure
+		const isGroupedView = window.location.pathname.includes('/similar')
 
-		if (cards.length === 0) {
+		const slims = isGroupedView ? (window.simAssCur || []) : await fetchViewSlims()
+		if (slims.length === 0) {
 			alert('No images found to export')
 			return
 		}
 
-		// Extract data from each meta element
-		const data = []
-		cards.forEach(metaDiv => {
-			try {
-				console.log('[Export] Processing metaDiv:', metaDiv.dataset)
-				if (metaDiv.dataset.meta) {
-					console.log('[Export] Meta data:', metaDiv.dataset.meta)
-					try {
-						const meta = JSON.parse(metaDiv.dataset.meta)
-						console.log('[Export] Parsed meta:', meta)
-						data.push({
-							assetId: meta.id || '',
-							autoId: meta.autoId || '',
-							filename: meta.originalFileName || '',
-							path: meta.originalPath || ''
-						})
-					} catch (e) {
-						console.error('[Export] Error parsing meta data:', e, 'Raw data:', metaDiv.dataset.meta)
-					}
-				} else {
-					console.warn('[Export] No meta data in dataset')
-				}
-			}
-			catch (e) {
-				console.error('[Export] Error extracting data from meta element:', e)
-			}
-		})
-
-
-		if (data.length === 0) {
-			alert('No data could be extracted')
-			return
-		}
-
-		// Check if we're in Similar View to create grouped structure
-		const isGroupedView = window.location.pathname.includes('/similar')
-		let exportData
-
-		if (isGroupedView) {
-			// Group assets by their visual groups in Similar View
-			exportData = groupAssetsByVisualGroups(data)
-		} else {
-			// For View page, just export as flat array
-			exportData = data.map(item => ({
-				assetId: item.assetId,
-				autoId: parseInt(item.autoId),
-				filename: item.filename,
-				path: item.path
-			}))
-		}
+		const exportData = isGroupedView ? groupAssetsBySimGroups(slims) : slims.map(toExportRow)
 
 		// Create JSON content
 		const jsonContent = JSON.stringify(exportData, null, 2)
@@ -270,8 +199,8 @@ window.exportIdsToCSV = function exportIdsToCSV()
 		document.body.removeChild(link)
 
 		const message = isGroupedView ?
-			`Exported ${exportData.length} groups with ${data.length} total assets` :
-			`Exported ${data.length} assets`
+			`Exported ${exportData.length} groups with ${slims.length} total assets` :
+			`Exported ${slims.length} assets`
 		alert(`${message} to JSON file`)
 	} catch (e) {
 		console.error('[Export] Error exporting IDs:', e)
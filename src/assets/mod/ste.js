@@ -55,6 +55,11 @@ const Ste = window.Ste = {
 			return
 		}
 
+		this.updCssBy( card, aid )
+	},
+
+	updCssBy( card, aid )
+	{
 		const par = card.closest( '.card' )
 		const cbx = card.querySelector( 'input[type="checkbox"]' )
 		const isSelected = this.selectedIds.has( aid )
@@ -92,13 +97,29 @@ const Ste = window.Ste = {
 		console.log( `[Ste] updBtns - selected[ ${ cntSel } / ${ cntAll } ]` )
 	},
 
+	// windowed grids only render part of the cards, the full id list is kept on the element
+	idsBy( elem )
+	{
+		const raw = elem?.dataset?.aids
+		if ( !raw ) return null
+		return raw.split( ',' ).map( v => parseInt( v ) ).filter( v => !isNaN( v ) )
+	},
+
 	selectAll()
 	{
-		const cards = document.querySelectorAll( '[id*="card-select"]' )
-		cards.forEach( card => {
-			const assetId = this.extractAssetIdBy( card )
-			if ( assetId ) this.selectedIds.add( assetId )
-		} )
+		const grids = document.querySelectorAll( '.gv[data-aids]' )
+		if ( grids.length )
+		{
+			grids.forEach( gv => this.idsBy( gv ).forEach( aid => this.selectedIds.add( aid ) ) )
+		}
+		else
+		{
+			const cards = document.querySelectorAll( '[id*="card-select"]' )
+			cards.forEach( card => {
+				const assetId = this.extractAssetIdBy( card )
+				if ( assetId ) this.selectedIds.add( assetId )
+			} )
+		}
 		this.updAllCss()
 		this.updBtns()
 		console.log( `[Ste] Selected all ${ this.selectedIds.size } assets` )
@@ -120,7 +141,7 @@ const Ste = window.Ste = {
 		console.log( `[Ste] updAllCss cards[ ${ cards.length } ]` )
 		cards.forEach( card => {
 			const assetId = this.extractAssetIdBy( card )
-			if ( assetId ) this.updCss( assetId )
+			if ( assetId ) this.updCssBy( card, assetId )
 		} )
 	},
 
@@ -189,21 +210,29 @@ const Ste = window.Ste = {
 		return cards
 	},
 
+	getGroupIds( groupId )
+	{
+		const hdr = document.querySelector( `.gv .hr[data-gid="${ groupId }"]` )
+		const ids = this.idsBy( hdr )
+		if ( ids ) return ids
+
+		return this.getGroupCards( groupId ).map( card => this.extractAssetIdBy( card ) ).filter( aid => aid )
+	},
+
 	selectGroup( groupId )
 	{
-		const grps = this.getGroupCards( groupId )
+		const ids = this.getGroupIds( groupId )
 		let cnt = 0
 
-		grps.forEach( card => {
-			const assetId = this.extractAssetIdBy( card )
-			if ( assetId && !this.selectedIds.has( assetId ) )
+		ids.forEach( assetId => {
+			if ( !this.selectedIds.has( assetId ) )
 			{
 				this.selectedIds.add( assetId )
-				this.updCss( assetId )
 				cnt++
 			}
 		} )
 
+		this.updAllCss()
 		this.updBtns()
 		console.log( `[Ste] Selected ${ cnt } items in group ${ groupId }` )
 		dsh.syncSte( this.cntTotal, this.selectedIds )
@@ -211,19 +240,18 @@ const Ste = window.Ste = {
 
 	clearGroup( groupId )
 	{
-		const cards = this.getGroupCards( groupId )
+		const ids = this.getGroupIds( groupId )
 		let deselectedCount = 0
 
-		cards.forEach( card => {
-			const assetId = this.extractAssetIdBy( card )
-			if ( assetId && this.selectedIds.has( assetId ) )
+		ids.forEach( assetId => {
+			if ( this.selectedIds.has( assetId ) )
 			{
 				this.selectedIds.delete( assetId )
-				this.updCss( assetId )
 				deselectedCount++
 			}
 		} )
 
+		this.updAllCss()
 		this.updBtns()
 		console.log( `[Ste] Deselected ${ deselectedCount } items in group ${ groupId }` )
 		dsh.syncSte( this.cntTotal, this.selectedIds )
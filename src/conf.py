@@ -133,6 +133,7 @@ class co:
 class cmds:
     class fetch(co.to):
         asset = co.tit('fetch_asset',desc='Fetch assets from remote')
+        assetAll = co.tit('fetch_asset_all',desc='Fetch assets of all users from remote')
         clear = co.tit('fetch_clear',desc='Clear select user assets and vectors')
         reset = co.tit('fetch_reset',desc='Clear all assets and vectors')
 
@@ -266,7 +267,14 @@ class envs:
     psqlDb:str = os.getenv('PSQL_DB','')
     psqlUser:str = os.getenv('PSQL_USER','')
     psqlPass:str = os.getenv('PSQL_PASS','')
+    psqlPoolMin:int = int(os.getenv('PSQL_POOL_MIN', '1'))
+    psqlPoolMax:int = int(os.getenv('PSQL_POOL_MAX', '8'))
+    imgCacheMb:int = int(os.getenv('IMG_CACHE_MB', '64'))
+    rendCacheMb:int = int(os.getenv('REND_CACHE_MB', '2048'))
+    vdoInflightMb:int = int(os.getenv('VDO_INFLIGHT_MB', '256'))
     mkitPort:str = os.getenv('MKIT_PORT', '8086')
+    mkitServer:str = os.getenv('MKIT_SERVER', 'werkzeug').lower()
+    mkitThreads:int = int(os.getenv('MKIT_THREADS', '64'))
 
     if os.getcwd().startswith(os.path.join(pathRoot, 'tests')):
         mkitData = os.path.join(pathRoot, 'data/')
@@ -337,6 +345,11 @@ class envs:
         lg.info(f"  PSQL_DB: {envs.psqlDb}")
         lg.info(f"  PSQL_USER: {envs.psqlUser}")
         lg.info(f"  PSQL_PASS: {maskSensitive(envs.psqlPass)}")
+        lg.info(f"  PSQL_POOL: {envs.psqlPoolMin}-{envs.psqlPoolMax}")
+        lg.info(f"  IMG_CACHE_MB: {envs.imgCacheMb}")
+        lg.info(f"  REND_CACHE_MB: {envs.rendCacheMb}")
+        lg.info(f"  VDO_INFLIGHT_MB: {envs.vdoInflightMb}")
+        lg.info(f"  MKIT_SERVER: {envs.mkitServer} threads[{envs.mkitThreads}]")
         lg.info(f"  IMMICH_PATH: {envs.immichPath}")
         lg.info(f"  IMMICH_THUMB: {envs.immichThumb}")
         lg.info(f"  QDRANT_URL: {envs.qdrantUrl}")
@@ -1,3 +1,5 @@
+import json
+
 from conf import ks, Optional
 from util import log
 
@@ -24,6 +26,7 @@ def close():
     try:
         sets.close()
         vecs.close()
+        psql.close()
         lg.info('All database connections closed successfully')
     except Exception as e:
         lg.error(f'Failed to close database connections: {str(e)}')
@@ -33,8 +36,10 @@ def close():
 
 def resetAllData():
     try:
+        sim.ahead.reset()
         pics.clearAll()
         vecs.cleanAll()
+        DtoSets.clearFetchMarks()
         lg.info('[clear] All records cleared successfully')
     except Exception as e:
         lg.error(f'[clear] Failed to clear all records: {str(e)}')
@@ -91,6 +96,8 @@ class DtoSets:
 
     autoNext:bool = AutoDbField('autoNext', bool, True) #type:ignore
     showGridInfo:bool = AutoDbField('showGridInfo', bool, True) #type:ignore
+    gvBatch:bool = AutoDbField('gvBatch', bool, True) #type:ignore
+    simAhead:int = AutoDbField('simAhead', int, 2) #type:ignore
 
     rtree:bool = AutoDbField('simRtree', bool, False) #type:ignore
     rtreeMax:int = AutoDbField('simMaxItems', int, 200) #type:ignore
@@ -130,6 +137,10 @@ class DtoSets:
     cpuAutoMode:bool = AutoDbField('cpuAutoMode', bool, True) #type:ignore
     cpuWorkers:int = AutoDbField('cpuWorkers', int, 4) #type:ignore
 
+    fetchChunk:int = AutoDbField('fetchChunk', int, 500) #type:ignore
+    fetchBulk:bool = AutoDbField('fetchBulk', bool, True) #type:ignore
+    fetchWorkers:int = AutoDbField('fetchWorkers', int, 3) #type:ignore
+
     def checkIsExclude(self, asset) -> bool:
         if not self.excl or not self.excl_FilNam:
             return False
@@ -161,6 +172,26 @@ class DtoSets:
         return sets.save(key, str(value))
 
 
+    @classmethod
+    def getFetchMark(cls, usrId) -> Optional[dict]:
+        val = sets.get(f'fetchMark_{usrId}')
+        if not val: return None
+        try:
+            return json.loads(val)
+        except Exception as e:
+            lg.error(f'[dto] invalid fetch mark for usrId[{usrId}]: {e}')
+            return None
+
+    @classmethod
+    def setFetchMark(cls, usrId, mark: Optional[dict]):
+        if not mark: return sets.delete(f'fetchMark_{usrId}')
+        return sets.save(f'fetchMark_{usrId}', json.dumps(mark))
+
+    @classmethod
+    def clearFetchMarks(cls):
+        return sets.delete('fetchMark_', prefix=True)
+
+
     def clearCache(self):
         for attr_name in dir(self.__class__):
             attr = getattr(self.__class__, attr_name)
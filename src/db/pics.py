@@ -1,8 +1,10 @@
 import json
+import queue
 import sqlite3
+import threading
 from contextlib import contextmanager
 from sqlite3 import Cursor
-from typing import Optional, List
+from typing import Optional, List, Iterator, Dict, Tuple
 
 from conf import envs
 from mod import models
@@ -15,6 +17,9 @@ lg = log.get(__name__)
 
 pathDb = envs.mkitData + 'pics.db'
 
+# bumped when a migration needs a one time backfill, stored in PRAGMA user_version
+SchemaVer = 1
+
 
 @contextmanager
 def mkConn():
@@ -62,7 +67,8 @@ def init():
                     isVectored       INTEGER Default 0,
                     simOk            INTEGER Default 0,
                     simInfos         TEXT Default '[]',
-                    simGIDs          TEXT Default '[]'
+                    simGIDs          TEXT Default '[]',
+                    isMain           INTEGER Default 0
                 )
                 ''')
 
@@ -75,25 +81,227 @@ def init():
                 )
                 ''')
 
+            # migrate: group leader flag, recomputed once more for databases that stored self references as leaders
+            cols = {r[1] for r in c.execute("PRAGMA table_info(assets)").fetchall()}
+            ver = c.execute("PRAGMA user_version").fetchone()[0]
+            if 'isMain' not in cols:
+                c.execute("Alter Table assets Add Column isMain INTEGER Default 0")
+            if 'isMain' not in cols or ver < 1:
+                updMainBy(c)
+                lg.info(f"[pics] migrated assets.isMain")
+            if ver < SchemaVer: c.execute(f"PRAGMA user_version = {SchemaVer}")
+
             # indexes
             c.execute('''CREATE INDEX IF NOT EXISTS idx_assets_autoId_simOk ON assets(autoId, simOk)''')
             c.execute('''CREATE INDEX IF NOT EXISTS idx_assets_isVectored ON assets(isVectored)''')
             c.execute('''CREATE INDEX IF NOT EXISTS idx_assets_simOk ON assets(simOk)''')
             c.execute('''CREATE INDEX IF NOT EXISTS idx_assets_id ON assets(id)''')
+            c.execute('''CREATE INDEX IF NOT EXISTS idx_assets_isMain ON assets(isMain, simOk)''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_assets_grouped ON assets(autoId) WHERE simGIDs != '[]'")
+
+            initFts(c)
+            initCnts(c)
 
             conn.commit()
 
-            lg.info(f"[pics] db connected: {pathDb}")
+            paths.load(c)
+
+            lg.info(f"[pics] db connected: {pathDb} paths[{len(paths.thumb)}]")
 
         return True
     except Exception as e:
         raise mkErr("Failed to initialize pics database", e)
 
 
+#------------------------------------------------------------------------
+# autoId -> file paths for the image routes, no sqlite access per request
+#------------------------------------------------------------------------
+class PathMap:
+    """
+    three parallel lists indexed by autoId (thumbnail, preview, video),
+    rebuilt at init and patched by the writer / deletes; readers never take the lock
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thumb: List[Optional[str]] = []
+        self.prev: List[Optional[str]] = []
+        self.vdo: List[Optional[str]] = []
+        self.ready = False
+
+    def _growLocked(self, size: int):
+        add = size - len(self.thumb)
+        if add <= 0: return
+        add = max(add, len(self.thumb) // 4)  # amortize appends from the writer
+        for arr in (self.thumb, self.prev, self.vdo): arr.extend([None] * add)
+
+    def _setLocked(self, rows):
+        for aid, pThumb, pPrev, pVdo in rows:
+            self.thumb[aid] = pThumb
+            self.prev[aid] = pPrev
+            self.vdo[aid] = pVdo
+
+    def load(self, c: Cursor):
+        c.execute("Select Max(autoId) From assets")
+        mx = c.fetchone()[0] or 0
+        c.execute("Select autoId, pathThumbnail, pathPreview, pathVdo From assets")
+        rows = c.fetchall()
+
+        with self.lock:
+            self.thumb, self.prev, self.vdo = [None] * (mx + 1), [None] * (mx + 1), [None] * (mx + 1)
+            self._setLocked(rows)
+            self.ready = True
+
+    def loadByIds(self, c: Cursor, ids: List[str]):
+        if not ids: return
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            c.execute(f"Select autoId, pathThumbnail, pathPreview, pathVdo From assets Where id IN ({','.join('?' * len(chunk))})", chunk)
+            rows = c.fetchall()
+            if not rows: continue
+
+            with self.lock:
+                self._growLocked(max(r[0] for r in rows) + 1)
+                self._setLocked(rows)
+
+    def drop(self, autoIds: List[int]):
+        with self.lock:
+            for aid in autoIds:
+                if 0 <= aid < len(self.thumb):
+                    self.thumb[aid] = self.prev[aid] = self.vdo[aid] = None
+
+    def get(self, autoId: int, kind: str) -> Optional[str]:
+        arr = self.vdo if kind == 'pathVdo' else self.prev if kind == 'pathPreview' else self.thumb
+        return arr[autoId] if 0 <= autoId < len(arr) else None
+
+
+paths = PathMap()
+
+
+#------------------------------------------------------------------------
+# filename search index (fts5 trigram, external content on assets)
+#------------------------------------------------------------------------
+def initFts(c: Cursor):
+    c.execute('''
+        Create Virtual Table If Not Exists assets_fts Using fts5(
+            originalFileName, originalPath,
+            content='assets', content_rowid='autoId', tokenize='trigram'
+        )
+        ''')
+
+    c.execute('''
+        Create Trigger If Not Exists trg_assets_fts_ins After Insert On assets Begin
+            Insert Into assets_fts(rowid, originalFileName, originalPath)
+            Values (new.autoId, new.originalFileName, new.originalPath);
+        End
+        ''')
+    c.execute('''
+        Create Trigger If Not Exists trg_assets_fts_del After Delete On assets Begin
+            Insert Into assets_fts(assets_fts, rowid, originalFileName, originalPath)
+            Values ('delete', old.autoId, old.originalFileName, old.originalPath);
+        End
+        ''')
+    c.execute('''
+        Create Trigger If Not Exists trg_assets_fts_upd After Update Of originalFileName, originalPath On assets Begin
+            Insert Into assets_fts(assets_fts, rowid, originalFileName, originalPath)
+            Values ('delete', old.autoId, old.originalFileName, old.originalPath);
+            Insert Into assets_fts(rowid, originalFileName, originalPath)
+            Values (new.autoId, new.originalFileName, new.originalPath);
+        End
+        ''')
+
+    # existing db created before the index, backfill once
+    cntAss = c.execute("Select Count(*) From assets").fetchone()[0]
+    cntFts = c.execute("Select Count(*) From assets_fts_docsize").fetchone()[0]
+    if cntAss and cntFts != cntAss:
+        c.execute("Insert Into assets_fts(assets_fts) Values ('rebuild')")
+        lg.info(f"[pics] fts index rebuilt, assets[{cntAss}]")
+
+
+#------------------------------------------------------------------------
+# counters, kept by triggers so status/progress reads are O(1)
+#------------------------------------------------------------------------
+cntKeys = {
+    'ass': "1",
+    'simOk': "{0}.isVectored = 1 AND {0}.simOk = 1",
+    'simNo': "{0}.isVectored = 1 AND {0}.simOk = 0",
+    # a root whose members are all resolved only points at itself, it is not main but still pending
+    'simPnd': "({0}.isMain = 1 OR ({0}.simGIDs != '[]' AND EXISTS (SELECT 1 FROM json_each({0}.simGIDs) g WHERE g.value = {0}.autoId))) AND {0}.simOk = 0 AND json_array_length({0}.simInfos) > 1",
+}
+
+def initCnts(c: Cursor):
+    c.execute('''
+        Create Table If Not Exists counters (
+            key TEXT Primary Key,
+            val INTEGER Default 0
+        )
+        ''')
+
+    def mkDelta(sign, row):
+        return "CASE key " + " ".join(f"WHEN '{k}' THEN {sign}({cd.format(row)})" for k, cd in cntKeys.items()) + " ELSE 0 END"
+
+    keys = ", ".join(f"'{k}'" for k in cntKeys)
+
+    # recreated every start so the bodies follow cntKeys
+    for t in ('ins', 'del', 'upd'): c.execute(f"Drop Trigger If Exists trg_assets_cnt_{t}")
+    c.execute(f'''
+        Create Trigger trg_assets_cnt_ins After Insert On assets Begin
+            Update counters Set val = val + {mkDelta('+', 'new')} Where key IN ({keys});
+        End
+        ''')
+    c.execute(f'''
+        Create Trigger trg_assets_cnt_del After Delete On assets Begin
+            Update counters Set val = val + {mkDelta('-', 'old')} Where key IN ({keys});
+        End
+        ''')
+    c.execute(f'''
+        Create Trigger trg_assets_cnt_upd After Update Of isVectored, simOk, isMain, simInfos, simGIDs On assets Begin
+            Update counters Set val = val + {mkDelta('+', 'new')} + {mkDelta('-', 'old')} Where key IN ({keys});
+        End
+        ''')
+
+    # resync once per start, triggers keep them from here
+    for k, cd in cntKeys.items():
+        c.execute(f"Insert Or Replace Into counters (key, val) Select ?, Count(*) From assets a Where {cd.format('a')}", (k,))
+
+
+def getCnts() -> dict[str, int]:
+    try:
+        with mkConn() as conn:
+            c = conn.cursor()
+            c.execute("Select key, val From counters")
+            return {r[0]: r[1] for r in c.fetchall()}
+    except Exception as e:
+        raise mkErr("Failed to get counters", e)
+
+
+def getCnt(key: str) -> int:
+    try:
+        with mkConn() as conn:
+            c = conn.cursor()
+            c.execute("Select val From counters Where key = ?", (key,))
+            row = c.fetchone()
+            return row[0] if row else 0
+    except Exception as e:
+        raise mkErr(f"Failed to get counter[{key}]", e)
+
+
+def mkSearchCond(search: str):
+    """
+    trigram needs at least 3 chars, shorter terms fall back to LIKE on the same columns as the fts index
+    returns (condition, params)
+    """
+    txt = search.strip()
+    if len(txt) < 3: return "(originalFileName LIKE ? OR originalPath LIKE ?)", [f"%{txt}%", f"%{txt}%"]
+
+    return "autoId IN (Select rowid From assets_fts Where assets_fts MATCH ?)", ['"' + txt.replace('"', '""') + '"']
+
+
 def clearAll():
     try:
         with mkConn() as conn:
             c = conn.cursor()
+            c.execute("Drop Table If Exists assets_fts")
+            c.execute("Drop Table If Exists counters")
             c.execute("Drop Table If Exists assets")
             c.execute("Drop Table If Exists users")
             conn.commit()
@@ -111,6 +319,8 @@ def clearBy(usrId):
             cnt = c.rowcount
             conn.commit()
 
+            paths.load(c)
+
             lg.info(f"[pics] delete userId[ {usrId} ] assets[ {cnt} ]")
             return cnt
     except Exception as e:
@@ -118,15 +328,11 @@ def clearBy(usrId):
 
 
 def count(usrId=None):
+    if not usrId: return getCnt('ass')
     try:
         with mkConn() as conn:
             c = conn.cursor()
-            sql = "Select Count(*) From assets"
-            if usrId:
-                sql += " Where ownerId = ?"
-                c.execute(sql, (usrId,))
-            else:
-                c.execute(sql)
+            c.execute("Select Count(*) From assets Where ownerId = ?", (usrId,))
             cnt = c.fetchone()[0]
             return cnt
     except Exception as e:
@@ -164,6 +370,22 @@ def getById(assId) -> models.Asset:
         raise mkErr("Failed to get asset by id", e)
 
 
+def getAllByAutoIds(autoIds: List[int]) -> List[models.Asset]:
+    try:
+        if not autoIds: return []
+        rst = {}
+        with mkConn() as conn:
+            c = conn.cursor()
+            for i in range(0, len(autoIds), 500):
+                chunk = autoIds[i:i + 500]
+                qargs = ','.join(['?' for _ in chunk])
+                c.execute(f"Select * From assets Where autoId IN ({qargs})", chunk)
+                for row in c.fetchall(): rst[row['autoId']] = models.Asset.fromDB(c, row)
+        return [rst[aid] for aid in autoIds if aid in rst]
+    except Exception as e:
+        raise mkErr(f"Failed to get assets by autoIds[{len(autoIds)}]", e)
+
+
 def getAllByUsrId(usrId: str) -> List[models.Asset]:
     try:
         with mkConn() as conn:
@@ -224,6 +446,56 @@ def getAllNonVector() -> list[models.Asset]:
         raise mkErr("Failed to get non-vector assets", e)
 
 
+#------------------------------------------------------------------------
+# bulk (columnar)
+#------------------------------------------------------------------------
+def getBatchBy(where="", pms=(), limit=0) -> models.AssetBatch:
+    with mkConn() as conn:
+        conn.row_factory = None
+        c = conn.cursor()
+        sql = f"Select {', '.join(models.AssetBatch.cols)} From assets"
+        if where: sql += f" Where {where}"
+        sql += " Order By autoId"
+        if limit: sql += f" LIMIT {int(limit)}"
+        c.execute(sql, pms)
+        return models.AssetBatch.fromRows(c)
+
+
+def countNonVector() -> int:
+    try:
+        with mkConn() as conn:
+            c = conn.cursor()
+            c.execute("Select Count(*) From assets Where isVectored=0")
+            return c.fetchone()[0]
+    except Exception as e:
+        raise mkErr("Failed to count non-vector assets", e)
+
+
+def iterNonVector(chunk=1000) -> Iterator[models.AssetBatch]:
+    """
+    keyset paged by autoId, each chunk uses its own short connection so the
+    vector writer can commit between chunks
+    """
+    lastId = 0
+    while True:
+        try:
+            bat = getBatchBy("isVectored=0 AND autoId > ?", (lastId,), chunk)
+        except Exception as e:
+            raise mkErr(f"Failed to read non-vector assets after autoId[{lastId}]", e)
+
+        if not bat: return
+        lastId = int(bat.autoIds[-1])
+        yield bat
+        if len(bat) < chunk: return
+
+
+def getBatchByUsrId(usrId: str) -> models.AssetBatch:
+    try:
+        return getBatchBy("ownerId = ?", (usrId,))
+    except Exception as e:
+        raise mkErr(f"Failed to get asset batch by userId[{usrId}]", e)
+
+
 #------------------------------------------------------------------------
 # paged
 #------------------------------------------------------------------------
@@ -251,8 +523,9 @@ def countFiltered(usrId="", opts="all", search="", favOnly=False, arcOnly=False,
             cds.append("isVectored = 0")
 
         if search and len(search.strip()) > 0:
-            cds.append("originalFileName LIKE ?")
-            pms.append(f"%{search}%")
+            cd, pm = mkSearchCond(search)
+            cds.append(cd)
+            pms.extend(pm)
 
         query = "Select Count(*) From assets"
         if cds: query += " WHERE " + " AND ".join(cds)
@@ -290,8 +563,9 @@ def getFiltered( usrId="", opts="all", search="", onlyFav=False, onlyArc=False,
             cds.append("isVectored = 0")
 
         if search and len(search.strip()) > 0:
-            cds.append("originalFileName LIKE ?")
-            pms.append(f"%{search}%")
+            cd, pm = mkSearchCond(search)
+            cds.append(cd)
+            pms.extend(pm)
 
         query = "Select * From assets"
         if cds:
@@ -418,6 +692,140 @@ def saveBy(asset: dict, c: Cursor) -> int:  #, onExist:Callable[[models.Asset],N
         raise mkErr("Failed to save asset", e)
 
 
+def saveBulk(assets: List[dict], c: Cursor) -> Tuple[int, int, int]:
+    """
+    upsert one chunk with a single executemany (bulk import), returns (inserted, updated, unchanged)
+    """
+    try:
+        rows = []
+        for asset in assets:
+            assId = asset.get('id', None)
+            if not assId: continue
+
+            exifInfo = asset.get('exifInfo', {})
+            jsonExif = json.dumps(exifInfo, ensure_ascii=False, default=BaseDictModel.jsonSerializer) if exifInfo else None
+
+            rows.append((
+                str(assId),
+                str(asset.get('ownerId')),
+                asset.get('deviceId'),
+                str(asset.get('video_id')) if asset.get('video_id') else None,
+                asset.get('type'),
+                asset.get('originalFileName'),
+                asset.get('originalPath'),
+                asset.get('fileCreatedAt'),
+                asset.get('fileModifiedAt'),
+                asset.get('isFavorite'),
+                1 if asset.get('visibility') == 'archive' else 0,
+
+                asset.get('localDateTime'),
+                asset.get('thumbnail_path'),
+                asset.get('preview_path'),
+                asset.get('video_path'),
+                jsonExif,
+            ))
+
+        if not rows: return 0, 0, 0
+
+        # rowcount sums inserts and changed rows, the ids already here tell them apart
+        ids = [r[0] for r in rows]
+        cntOld = 0
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            c.execute(f"Select Count(*) From assets Where id IN ({','.join(['?' for _ in chunk])})", chunk)
+            cntOld += c.fetchone()[0]
+
+        c.executemany('''
+            Insert Into assets (id, ownerId, deviceId, vdoId, type, originalFileName, originalPath,
+            fileCreatedAt, fileModifiedAt, isFavorite, isArchived,
+            localDateTime, pathThumbnail, pathPreview, pathVdo, jsonExif)
+            Values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            On Conflict(id) Do Update Set
+                originalPath = excluded.originalPath,
+                pathThumbnail = excluded.pathThumbnail,
+                pathPreview = excluded.pathPreview,
+                pathVdo = excluded.pathVdo,
+                jsonExif = excluded.jsonExif,
+                isFavorite = excluded.isFavorite,
+                isArchived = excluded.isArchived
+            Where originalPath IS NOT excluded.originalPath
+                OR pathThumbnail IS NOT excluded.pathThumbnail
+                OR pathPreview IS NOT excluded.pathPreview
+                OR pathVdo IS NOT excluded.pathVdo
+                OR jsonExif IS NOT excluded.jsonExif
+                OR isFavorite IS NOT excluded.isFavorite
+                OR isArchived IS NOT excluded.isArchived
+        ''', rows)
+
+        cntNew = len(rows) - cntOld
+        cntUpd = max(c.rowcount - cntNew, 0)
+        return cntNew, cntUpd, cntOld - cntUpd
+    except Exception as e:
+        raise mkErr("Failed to bulk save assets", e)
+
+
+class Writer:
+    """
+    one thread owns the sqlite writes while several fetchers push chunks,
+    saved counts and failures are kept per key (usrId), a failed key does not stop the others
+    """
+    def __init__(self, maxQueue=8):
+        self.q = queue.Queue(maxsize=maxQueue)
+        self.cnts: Dict[str, Dict[str, int]] = {}
+        self.errs: Dict[str, Exception] = {}
+        self.err: Optional[Exception] = None
+        self.th = threading.Thread(target=self.run, name='mkit-pics-writer', daemon=True)
+        self.th.start()
+
+    def put(self, key: str, chunk: List[dict], isBulk=False):
+        if self.err: raise mkErr("pics writer stopped", self.err)
+        if key in self.errs: raise mkErr("pics writer failed", self.errs[key])
+        self.q.put((key, chunk, isBulk))
+
+    def run(self):
+        try:
+            with mkConn() as conn:
+                c = conn.cursor()
+                while True:
+                    item = self.q.get()
+                    if item is None: return
+
+                    key, chunk, isBulk = item
+                    if key in self.errs: continue  # that key already failed, its chunks are dropped
+                    self.save(conn, c, key, chunk, isBulk)
+        except Exception as e:
+            self.err = e
+            lg.error(f"[pics] writer stopped: {e}")
+            while self.q.get() is not None: pass  # keep draining so producers never block
+
+    def save(self, conn, c: Cursor, key: str, chunk: List[dict], isBulk: bool):
+        try:
+            # counted only once the chunk is committed, a rolled back chunk adds nothing
+            dlt = {'new': 0, 'upd': 0, 'skip': 0}
+            if isBulk:
+                dlt['new'], dlt['upd'], dlt['skip'] = saveBulk(chunk, c)
+            else:
+                for asset in chunk:
+                    rst = saveBy(asset, c)
+                    if rst == 1: dlt['new'] += 1
+                    elif rst == 2: dlt['upd'] += 1
+                    else: dlt['skip'] += 1
+            conn.commit()
+
+            cnt = self.cnts.setdefault(key, {'new': 0, 'upd': 0, 'skip': 0})
+            for k, v in dlt.items(): cnt[k] += v
+            paths.loadByIds(c, [str(a['id']) for a in chunk if a.get('id')])
+        except Exception as e:
+            conn.rollback()
+            self.errs[key] = e
+            lg.error(f"[pics] writer failed on key[{key}]: {e}")
+
+    def close(self):
+        self.q.put(None)
+        self.th.join()
+        if self.err: raise mkErr("pics writer failed", self.err)
+
+
 #========================================================================
 # sim
 #========================================================================
@@ -449,12 +857,7 @@ def getAnyNonSim(exclAids=[]) -> Optional[models.Asset]:
 
 def countSimOk(isOk=0):
     try:
-        with mkConn() as conn:
-            c = conn.cursor()
-            c.execute("SELECT COUNT(*) FROM assets WHERE isVectored = 1 AND simOk = ?", (isOk,))
-            count = c.fetchone()[0]
-            # lg.info(f"[pics] count isOk[{isOk}] cnt[{count}]")
-            return count
+        return getCnt('simOk' if isOk else 'simNo')
     except Exception as e:
         raise mkErr(f"Failed to count assets with simOk[{isOk}]", e)
 
@@ -474,6 +877,8 @@ def setSimGIDs(autoId: int, GID: int):
                         "UPDATE assets SET simGIDs = ? WHERE autoId = ?",
                         (json.dumps(gids), autoId)
                     )
+                    if GID != autoId:
+                        c.execute("UPDATE assets SET isMain = 1 WHERE autoId = ? AND isMain = 0", (GID,))
                     conn.commit()
                     # lg.info(f"[pics] upd #{autoId} GID[{GID}] to simGIDs[{gids}]")
                     return True
@@ -519,6 +924,7 @@ def deleteBy(assets: List[models.Asset]):
 
             # Get mainGIDs from assets to be deleted
             mainGIDs = [a.autoId for a in assets if a.vw.isMain]
+            chkGIDs = {gid for a in assets for gid in (a.simGIDs or [])}
 
             # 1. Delete incoming assets first
             assIds = [ass.id for ass in assets]
@@ -565,7 +971,10 @@ def deleteBy(assets: List[models.Asset]):
                                     (assId,)
                                 )
 
+            if chkGIDs: updMainBy(c, list(chkGIDs))
+
             conn.commit()
+            paths.drop(aids)
             lg.info(f"[pics] delete by assIds[{cntAll}] rst[{count}] mainGIDs[{mainGIDs}]")
 
             return count
@@ -584,9 +993,14 @@ def setResloveBy(assets: List[models.Asset]):
             cnt = len(autoIds)
 
             qargs = ','.join(['?' for _ in autoIds])
+            c.execute(f"SELECT DISTINCT g.value FROM assets a CROSS JOIN json_each(a.simGIDs) g WHERE a.autoId IN ({qargs})", autoIds)
+            chkGIDs = [r[0] for r in c.fetchall()]
+
             c.execute(f"UPDATE assets SET simOk = 1, simGIDs = '[]', simInfos = '[]' WHERE autoId IN ({qargs})", autoIds)
             count = c.rowcount
             if count != cnt: raise RuntimeError(f"effect[{count}] not match assets[{cnt}] ids[{qargs}]")
+
+            if chkGIDs: updMainBy(c, chkGIDs)
             conn.commit()
             lg.info(f"[pics] set simOk by autoIds[{len(autoIds)}] rst[{count}]")
             return count
@@ -605,8 +1019,9 @@ def clearAllSimIds(keepSimOk=False):
             else:
                 c.execute("UPDATE assets SET simOk = 0, simInfos = '[]', simGIDs = '[]'")
                 lg.info(f"Cleared all similarity results")
-            conn.commit()
             count = c.rowcount
+            updMainBy(c)
+            conn.commit()
             lg.info(f"Cleared similarity results for {count} assets")
             return count
     except Exception as e:
@@ -718,6 +1133,18 @@ def getAssetsByGID(gid: int) -> list[models.Asset]:
         return []
 
 
+# group leader = referenced in simGIDs of another asset, stored in assets.isMain
+def updMainBy(c: Cursor, gids: Optional[List[int]] = None):
+    sql = "SELECT g.value FROM assets a2 CROSS JOIN json_each(a2.simGIDs) g WHERE a2.simGIDs != '[]' AND a2.autoId != g.value"
+    if gids is None:
+        c.execute("UPDATE assets SET isMain = 0 WHERE isMain = 1")
+        c.execute(f"UPDATE assets SET isMain = 1 WHERE autoId IN ({sql})")
+        return
+
+    qargs = ','.join(['?' for _ in gids])
+    c.execute(f"UPDATE assets SET isMain = (autoId IN ({sql} AND g.value IN ({qargs}))) WHERE autoId IN ({qargs})", list(gids) + list(gids))
+
+
 # if incGroup, include assets with same simGIDs, else only simInfos
 # fetched rows will be set the asset.view props
 def getSimAssets(autoId: int, incGroup=False) -> List[models.Asset]:
@@ -731,17 +1158,8 @@ def getSimAssets(autoId: int, incGroup=False) -> List[models.Asset]:
         with mkConn() as conn:
             c = conn.cursor()
             c.execute("""
-                WITH main_check AS (
-                    SELECT DISTINCT gid.value as main_autoId
-                    FROM assets a2
-                    CROSS JOIN json_each(a2.simGIDs) gid
-                    WHERE a2.autoId != gid.value
-                )
-                SELECT
-                    a.*,
-                    CASE WHEN mc.main_autoId IS NOT NULL THEN 1 ELSE 0 END as isMain
+                SELECT a.*
                 FROM assets a
-                LEFT JOIN main_check mc ON a.autoId = mc.main_autoId
                 WHERE a.autoId = ?
             """, (autoId,))
             row = c.fetchone()
@@ -760,17 +1178,8 @@ def getSimAssets(autoId: int, incGroup=False) -> List[models.Asset]:
 
                 qargs = ','.join(['?' for _ in simAids])
                 c.execute(f"""
-                    WITH main_check AS (
-                        SELECT DISTINCT gid.value as main_autoId
-                        FROM assets a2
-                        CROSS JOIN json_each(a2.simGIDs) gid
-                        WHERE a2.autoId != gid.value
-                    )
-                    SELECT
-                        a.*,
-                        CASE WHEN mc.main_autoId IS NOT NULL THEN 1 ELSE 0 END as isMain
+                    SELECT a.*
                     FROM assets a
-                    LEFT JOIN main_check mc ON a.autoId = mc.main_autoId
                     WHERE a.autoId IN ({qargs})
                 """, simAids)
 
@@ -800,18 +1209,9 @@ def getSimAssets(autoId: int, incGroup=False) -> List[models.Asset]:
                 # 2. Assets with root.autoId in their simGIDs
                 gid_placeholders = ','.join(['?' for _ in root.simGIDs])
                 c.execute(f"""
-                    WITH main_check AS (
-                        SELECT DISTINCT gid.value as main_autoId
-                        FROM assets a2
-                        CROSS JOIN json_each(a2.simGIDs) gid
-                        WHERE a2.autoId != gid.value
-                    )
-                    SELECT
-                        a.*,
-                        CASE WHEN mc.main_autoId IS NOT NULL THEN 1 ELSE 0 END as isMain
+                    SELECT a.*
                     FROM assets a
-                    LEFT JOIN main_check mc ON a.autoId = mc.main_autoId
-                    WHERE a.autoId != ? AND (
+                    WHERE a.simGIDs != '[]' AND a.autoId != ? AND (
                         EXISTS (
                             SELECT 1 FROM json_each(a.simGIDs)
                             WHERE value IN ({gid_placeholders})
@@ -879,24 +1279,37 @@ def countSimPending():
     try:
         with mkConn() as conn:
             c = conn.cursor()
-            # Count all leader assets referenced in simGIDs
-            c.execute("""
-                WITH allGIDs AS (
-                    SELECT DISTINCT gid.value as gid
-                    FROM assets a
-                    CROSS JOIN json_each(a.simGIDs) gid
-                    WHERE a.simOk = 0 AND json_array_length(a.simInfos) > 1
-                )
-                SELECT COUNT(*) FROM assets a
-                INNER JOIN allGIDs g ON a.autoId = g.gid
-                WHERE a.simOk = 0 AND json_array_length(a.simInfos) > 1
-            """)
-            cnt = c.fetchone()[0]
-            return cnt
+            # leader assets, kept by counters trigger on isMain
+            c.execute("Select val From counters Where key = 'simPnd'")
+            row = c.fetchone()
+            return row[0] if row else 0
     except Exception as e:
         raise mkErr(f"Failed to count assets pending", e)
 
 
+def getPendingAutoIds(limit=500) -> List[int]:
+    try:
+        with mkConn() as conn:
+            c = conn.cursor()
+            c.execute("Select autoId From assets Where simGIDs != '[]' And simOk = 0 Order By autoId Limit ?", (limit,))
+            return [r[0] for r in c.fetchall()]
+    except Exception as e:
+        raise mkErr(f"Failed to get pending autoIds", e)
+
+
+def getPendingSig() -> tuple:
+    """
+    cheap fingerprint of the pending rows, goes through the partial index on grouped rows
+    """
+    try:
+        with mkConn() as conn:
+            c = conn.cursor()
+            c.execute("Select Count(*), Max(autoId), Total(autoId) From assets Where simGIDs != '[]' And simOk = 0")
+            return tuple(c.fetchone())
+    except Exception as e:
+        raise mkErr(f"Failed to get pending signature", e)
+
+
 def getPagedPending(page=1, size=20) -> list[models.Asset]:
     try:
         with mkConn() as conn:
@@ -904,14 +1317,8 @@ def getPagedPending(page=1, size=20) -> list[models.Asset]:
             offset = (page - 1) * size
 
             # Get all leader assets referenced in simGIDs
-            cursor.execute("""
-                WITH allGIDs AS (
-                    SELECT DISTINCT gid.value as gid
-                    FROM assets a
-                    CROSS JOIN json_each(a.simGIDs) gid
-                    WHERE a.simOk = 0 AND json_array_length(a.simInfos) > 1
-                ),
-                gidCounts AS (
+            cursor.execute(f"""
+                WITH gidCounts AS (
                     SELECT
                         gid.value as gid,
                         COUNT(*) as cntRelats
@@ -925,9 +1332,8 @@ def getPagedPending(page=1, size=20) -> list[models.Asset]:
                     a.*,
                     COALESCE(gc.cntRelats, 0) as cntRelats
                 FROM assets a
-                INNER JOIN allGIDs g ON a.autoId = g.gid
                 LEFT JOIN gidCounts gc ON a.autoId = gc.gid
-                WHERE a.simOk = 0 AND json_array_length(a.simInfos) > 1
+                WHERE {cntKeys['simPnd'].format('a')}
                 ORDER BY json_array_length(a.simInfos) DESC, a.autoId
                 LIMIT ? OFFSET ?
             """, (size, offset))
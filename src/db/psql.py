@@ -1,17 +1,23 @@
 import os
+import re
 import time
-from typing import Optional, List, Dict
+import queue
+import threading
+from typing import Optional, List, Dict, Iterator, LiteralString
 from contextlib import contextmanager
 from datetime import datetime, timezone
 
 import psycopg
 from psycopg.rows import dict_row
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
 
 import imgs
 from conf import ks, envs
 from util import log
 from mod import models
 from util.err import mkErr
+from util.cache import TtlLru
 
 lg = log.get(__name__)
 
@@ -36,6 +42,10 @@ class SchemaInfo:
         self.albumUserAlbumId = None
         self.albumUserUserId = None
 
+        # incremental sync support (updatedAt/updateId columns, asset_audit table)
+        self.hasUpdateId = False
+        self.hasAudit = False
+
 _schema = None
 
 def detectSchema():
@@ -107,9 +117,25 @@ def detectSchema():
                 schema.albumUserAlbumId = 'albumId' if 'albumId' in cols else 'albumsId'
                 schema.albumUserUserId = 'userId' if 'userId' in cols else 'usersId'
 
+                # Detect watermark columns for incremental fetch
+                c.execute("""
+                    SELECT table_name FROM information_schema.columns
+                    WHERE table_schema = 'public'
+                    AND table_name IN ('asset', 'asset_exif')
+                    AND column_name = 'updateId'
+                """)
+                schema.hasUpdateId = len({row[0] for row in c.fetchall()}) == 2
+
+                c.execute("""
+                    SELECT 1 FROM information_schema.tables
+                    WHERE table_schema = 'public' AND table_name = 'asset_audit'
+                """)
+                schema.hasAudit = c.fetchone() is not None
+
                 lg.info(f"Schema detected - Tables: asset={schema.asset}, album={schema.album}, tag={schema.tag}, user={schema.user}")
                 lg.info(f"Schema detected - album_asset: albumId={schema.albumAssetAlbumId}, assetId={schema.albumAssetAssetId}")
                 lg.info(f"Schema detected - tag_asset: tagId={schema.tagAssetTagId}, assetId={schema.tagAssetAssetId}")
+                lg.info(f"Schema detected - incremental: updateId={schema.hasUpdateId}, asset_audit={schema.hasAudit}")
 
                 _schema = schema
                 return schema
@@ -133,7 +159,7 @@ def setup_safe_timestamp_loader():
     Setup custom timestamp loader to handle BC dates and out-of-range timestamps
     """
     try:
-        from psycopg.types.datetime import TimestamptzLoader, TimestampLoader
+        from psycopg.types.datetime import TimestamptzLoader, TimestampLoader, TimestamptzBinaryLoader, TimestampBinaryLoader
         import psycopg
 
         class SafeTimestamptzLoader(TimestamptzLoader):
@@ -166,9 +192,32 @@ def setup_safe_timestamp_loader():
                         return datetime(2000, 1, 1)
                     raise
 
+        # binary COPY (bulk import) decodes with the binary loaders, which raise "too small (before year 1)" / "too large (after year 10K)"
+        class SafeTimestamptzBinaryLoader(TimestamptzBinaryLoader):
+            def load(self, data):
+                try:
+                    return super().load(data)
+                except (ValueError, OverflowError, psycopg.DataError) as e:
+                    if "year" in str(e):
+                        lg.warning(f"Replaced invalid binary timestamptz with default: {repr(bytes(data))[:50]} - {e}")
+                        return datetime(2000, 1, 1, tzinfo=timezone.utc)
+                    raise
+
+        class SafeTimestampBinaryLoader(TimestampBinaryLoader):
+            def load(self, data):
+                try:
+                    return super().load(data)
+                except (ValueError, OverflowError, psycopg.DataError) as e:
+                    if "year" in str(e):
+                        lg.warning(f"Replaced invalid binary timestamp with default: {repr(bytes(data))[:50]} - {e}")
+                        return datetime(2000, 1, 1)
+                    raise
+
         # Register globally using official psycopg method
         psycopg.adapters.register_loader("timestamptz", SafeTimestamptzLoader)
         psycopg.adapters.register_loader("timestamp", SafeTimestampLoader)
+        psycopg.adapters.register_loader("timestamptz", SafeTimestamptzBinaryLoader)
+        psycopg.adapters.register_loader("timestamp", SafeTimestampBinaryLoader)
 
         lg.info("Custom timestamp loaders registered successfully")
     except Exception as e:
@@ -195,6 +244,8 @@ def init():
     if not all([host, port, db, uid]): raise RuntimeError("PostgreSQL connection settings not initialized.")
 
     try:
+        initPool()
+
         with mkConn() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT 1")
@@ -205,30 +256,73 @@ def init():
         return True
     except Exception as e:
         lg.error(f"PostgreSQL connection test failed: {str(e)}")
+        close()
         return False
 
 
-@contextmanager
-def mkConn():
-    host = envs.psqlHost
-    port = envs.psqlPort
-    db = envs.psqlDb
-    uid = envs.psqlUser
-    pw = envs.psqlPass
+#------------------------------------------------------
+# connection pool, shared by task threads and dash callbacks
+#------------------------------------------------------
+pool: Optional[ConnectionPool] = None
+poolLock = threading.Lock()
 
-    conn = None
-    try:
-        conn = psycopg.connect(
-            host=host,
-            port=port,
-            dbname=db,
-            user=uid,
-            password=pw
+def initPool() -> ConnectionPool:
+    global pool
+
+    with poolLock:
+        if pool: return pool
+
+        szMin = max(envs.psqlPoolMin, 1)
+        szMax = max(envs.psqlPoolMax, szMin)
+
+        info = make_conninfo(
+            host=envs.psqlHost,
+            port=envs.psqlPort,
+            dbname=envs.psqlDb,
+            user=envs.psqlUser,
+            password=envs.psqlPass,
+        )
+
+        p: ConnectionPool = ConnectionPool(
+            info,
+            min_size=szMin,
+            max_size=szMax,
+            # hot queries run with prepare=True, everything else is prepared after a few runs on the same conn
+            kwargs={"prepare_threshold": 3},
+            check=ConnectionPool.check_connection,
+            max_idle=300,
+            name="mkit",
+            open=False,
         )
+        try:
+            p.open(wait=True, timeout=10)
+        except Exception:
+            p.close()
+            raise
+
+        pool = p
+        lg.info(f"[psql] pool opened min[{szMin}] max[{szMax}]")
+        return p
+
+
+def close():
+    global pool
+
+    with poolLock:
+        if not pool: return
+        try:
+            pool.close()
+        except Exception as e:
+            lg.warning(f"[psql] failed to close pool: {e}")
+        pool = None
+
+
+@contextmanager
+def mkConn():
+    p = pool or initPool()
+    # commits on success, rolls back on error and returns the conn to the pool
+    with p.connection() as conn:
         yield conn
-    except Exception: raise
-    finally:
-        if conn: conn.close()
 
 
 def chk():
@@ -251,7 +345,7 @@ def fetchUser(usrId: str) -> Optional[models.Usr]:
             Where id = %s
             """
             with conn.cursor(row_factory=dict_row) as cursor:
-                cursor.execute(sql, (usrId,))
+                cursor.execute(sql, (usrId,), prepare=True)
                 row = cursor.fetchone()
 
                 if not row: raise RuntimeError( "no db row" )
@@ -282,7 +376,7 @@ def fetchUsers() -> List[models.Usr]:
         raise mkErr("Failed to fetch users", e)
 
 
-def count(usrId=None, assetType="IMAGE"):
+def count(usrId=None, assetType="IMAGE", since: Optional[dict] = None):
     try:
         with mkConn() as conn:
             with conn.cursor() as cursor:
@@ -302,7 +396,12 @@ def count(usrId=None, assetType="IMAGE"):
 
                 sql += " AND status = 'active'"
 
-                cursor.execute(sql, params)
+                if since:
+                    cond, pms = mkSinceCond(since)
+                    sql += cond
+                    params.extend(pms)
+
+                cursor.execute(sql, params, prepare=True)
                 rst = cursor.fetchone()
                 count = rst[0] if rst else 0
 
@@ -315,6 +414,88 @@ def count(usrId=None, assetType="IMAGE"):
 
 
 
+#------------------------------------------------------
+# Incremental sync
+#------------------------------------------------------
+zeroMark = ['1970-01-01T00:00:00+00:00', '00000000-0000-0000-0000-000000000000']
+
+def mkSinceCond(since: dict):
+    """
+    assets changed after the watermark, either on the asset row or on its exif row
+    """
+    ass = since.get('ass') or zeroMark
+    exif = since.get('exif') or zeroMark
+    sql = """
+        AND (
+            ("updatedAt", "updateId") > (%s::timestamptz, %s::uuid)
+            OR id IN (Select "assetId" From asset_exif Where ("updatedAt", "updateId") > (%s::timestamptz, %s::uuid))
+        )
+    """
+    return sql, [*ass, *exif]
+
+
+def fetchMark(usrId: str) -> Optional[dict]:
+    """
+    current high-water mark of asset and asset_exif for the user,
+    None when the immich schema has no updateId columns (full fetch only)
+    """
+    if not getSchema().hasUpdateId: return None
+
+    try:
+        with mkConn() as conn:
+            with conn.cursor() as c:
+                c.execute("""
+                    Select "updatedAt", "updateId" From asset
+                    Where "ownerId" = %s
+                    Order By "updatedAt" Desc, "updateId" Desc Limit 1
+                """, (usrId,))
+                rowAss = c.fetchone()
+
+                c.execute("""
+                    Select e."updatedAt", e."updateId" From asset_exif e
+                    Join asset a On a.id = e."assetId"
+                    Where a."ownerId" = %s
+                    Order By e."updatedAt" Desc, e."updateId" Desc Limit 1
+                """, (usrId,))
+                rowExif = c.fetchone()
+
+        def toMark(row): return [row[0].isoformat(), str(row[1])] if row else None
+
+        return {'ass': toMark(rowAss), 'exif': toMark(rowExif)}
+    except Exception as e:
+        raise mkErr(f"Failed to fetch watermark for userId[{usrId}]", e)
+
+
+def fetchGoneIds(usrId: str, since: dict) -> List[str]:
+    """
+    ids trashed or set non-active after the watermark, plus hard deleted ones from asset_audit
+    """
+    ass = since.get('ass') or zeroMark
+
+    try:
+        with mkConn() as conn:
+            with conn.cursor() as c:
+                c.execute("""
+                    Select id From asset
+                    Where "ownerId" = %s
+                    AND (status != 'active' OR "deletedAt" IS NOT NULL)
+                    AND ("updatedAt", "updateId") > (%s::timestamptz, %s::uuid)
+                """, (usrId, *ass))
+                ids = {str(r[0]) for r in c.fetchall()}
+
+                if getSchema().hasAudit:
+                    c.execute("""
+                        Select "assetId" From asset_audit
+                        Where "ownerId" = %s AND "deletedAt" > %s::timestamptz
+                    """, (usrId, ass[0]))
+                    ids.update(str(r[0]) for r in c.fetchall())
+
+        lg.info(f"[psql] gone since[{ass[0]}] ids[{len(ids)}]")
+        return list(ids)
+    except Exception as e:
+        raise mkErr(f"Failed to fetch removed assets for userId[{usrId}]", e)
+
+
 def testAssetsPath():
     try:
         with mkConn() as conn:
@@ -359,9 +540,134 @@ def testAssetsPath():
 
 
 
-def fetchAssets(usr: models.Usr, onUpdate: models.IFnProg):
+# one round trip per chunk: files as a json object, exif columns (e.*) and the direct live video,
+# photos without livePhotoVideoId are paired through the per fetch map from fetchLiveMap
+enrichSql = """
+    SELECT
+        e.*,
+        ids.id AS "_aid",
+        f.files AS "_files",
+        v.id AS "_vdoId",
+        v."encodedVideoPath" AS "_vdoPath",
+        v."originalPath" AS "_vdoOrigPath"
+    FROM unnest(%s::uuid[]) AS ids(id)
+    LEFT JOIN LATERAL (
+        SELECT json_object_agg(af.type, af.path) AS files
+        FROM asset_file af
+        WHERE af."assetId" = ids.id
+    ) f ON true
+    LEFT JOIN asset_exif e ON e."assetId" = ids.id
+    LEFT JOIN asset a ON a.id = ids.id AND a.type = 'IMAGE'
+    LEFT JOIN asset v ON v.id = a."livePhotoVideoId" AND v.type = 'VIDEO'
+"""
+
+# livePhotoCID -> video of one owner, computed once per fetch instead of a self join for every chunk
+liveMapSql = """
+    SELECT DISTINCT ON (ve."livePhotoCID")
+        ve."livePhotoCID", v.id, v."encodedVideoPath", v."originalPath"
+    FROM asset_exif ve
+    JOIN asset v ON v.id = ve."assetId"
+    WHERE ve."livePhotoCID" IS NOT NULL
+    AND v.type = 'VIDEO'
+    AND v."ownerId" = %s
+    ORDER BY ve."livePhotoCID", v."createdAt"
+"""
+
+def fetchLiveMap(cursor, usrId: str) -> Dict[str, tuple]:
+    """
+    {livePhotoCID: (videoId, encodedVideoPath, originalPath)} for the user's videos
+    """
+    cursor.execute(liveMapSql, (usrId,))
+    rst = {}
+    for row in cursor.fetchall():
+        if isinstance(row, dict): row = tuple(row.values())
+        rst[row[0]] = (row[1], row[2], row[3])
+
+    lg.info(f"[psql] live photo map usrId[{usrId}] cids[{len(rst)}]")
+    return rst
+
+
+def pairLive(assetId, cid: Optional[str], liveMap: Optional[Dict[str, tuple]]) -> Optional[tuple]:
+    if not cid or not liveMap: return None
+    vdo = liveMap.get(cid)
+    if not vdo or vdo[0] == assetId: return None
+    return vdo
+
+
+def enrichAssets(cursor, rows: List[dict], liveMap: Optional[Dict[str, tuple]] = None) -> List[dict]:
+    """
+    fill thumbnail/preview paths, exif and live photo video for one chunk of asset rows,
+    rows without thumbnail are dropped
+    """
+    assetIds = [a['id'] for a in rows]
+    if not assetIds: return []
+
+    cursor.execute(enrichSql, (assetIds,), prepare=True)
+
+    extras = {}
+    for row in cursor.fetchall():
+        assetId = row['_aid']
+        ext = {}
+
+        for typ, path in (row['_files'] or {}).items():
+            if typ == ks.db.thumbnail: ext['thumbnail_path'] = envs.pth.normalize(path)
+            elif typ == ks.db.preview: ext['preview_path'] = envs.pth.normalize(path)
+
+        vdoId, vdoPath, vdoOrigPath = row['_vdoId'], row['_vdoPath'], row['_vdoOrigPath']
+        if not vdoId:
+            vdo = pairLive(assetId, row.get('livePhotoCID'), liveMap)
+            if vdo: vdoId, vdoPath, vdoOrigPath = vdo
+
+        finalPath = vdoPath if vdoPath else vdoOrigPath
+        if finalPath:
+            ext['video_path'] = envs.pth.normalize(finalPath)
+            ext['video_id'] = vdoId
+
+        if row['assetId'] is not None:
+            exifItem = {}
+            for key, val in row.items():
+                if key == 'assetId' or key.startswith('_'): continue
+
+                if key in ('dateTimeOriginal', 'modifyDate') and val is not None:
+                    if isinstance(val, str):
+                        exifItem[key] = val
+                    else:
+                        exifItem[key] = val.isoformat() if val else None
+                elif val is not None:
+                    exifItem[key] = val
+
+            if exifItem: ext['exifInfo'] = exifItem
+
+        extras[assetId] = ext
+
+    rst = []
+    for asset in rows:
+        assetId = asset['id']
+        asset.update(extras.get(assetId, {}))
+
+        if 'exifInfo' not in asset:
+            lg.warn(f"[exif] NotFound.. assetId[{assetId}]")
+
+        # final check
+        if not asset.get('thumbnail_path'):
+            lg.warn(f"[psql] ignore non thumbnail asset: {str(asset.get('id'))}")
+            continue
+
+        rst.append(asset)
+
+    return rst
+
+
+def iterAssets(usr: models.Usr, onUpdate: models.IFnProg, szChunk: Optional[int] = None, since: Optional[dict] = None) -> Iterator[List[dict]]:
+    """
+    stream active assets through a named (server-side) cursor,
+    every yielded chunk is already enriched and ready for pics.saveBy,
+    with since (see fetchMark) only assets changed after the watermark are streamed
+    """
+    import db
     usrId = usr.id
     asType = "IMAGE"
+    if not szChunk: szChunk = max(db.dto.fetchChunk, 1)
 
     try:
         chk()
@@ -369,238 +675,217 @@ def fetchAssets(usr: models.Usr, onUpdate: models.IFnProg):
         onUpdate(11, f"start querying {usrId}")
 
         with mkConn() as conn:
-            with conn.cursor(row_factory=dict_row) as cursor:
-                # count all
-                cntSql = "Select Count( * ) From asset Where status = 'active' And type = %s"
-                cntArs = [asType]
+            sql = "Select * From asset Where status = 'active' And type = %s"
+            params = [asType]
 
-                if usrId:
-                    cntSql += " AND \"ownerId\" = %s"
-                    cntArs.append(usrId)
+            if usrId:
+                sql += " AND \"ownerId\" = %s"
+                params.append(usrId)
 
-                cursor.execute(cntSql, cntArs)
-                rst = cursor.fetchone()
-                if not rst: raise RuntimeError( "cannot count assets" )
+            if since:
+                cond, pms = mkSinceCond(since)
+                sql += cond
+                params.extend(pms)
 
-                cntAll = rst.get("count", 0)
+            sql += " ORDER BY \"createdAt\" DESC"
 
-                if not cntAll: raise RuntimeError(f"fetch target type[{asType}] not found")
+            cntOk = 0
+            cntRows = 0
+            with conn.cursor(name=f"mkit_assets_{usrId or 'all'}", row_factory=dict_row) as cursor, conn.cursor(row_factory=dict_row) as cs:
+                liveMap = fetchLiveMap(cs, usrId)
 
-                # lg.info(f"Found {cntAll} {asType.lower()} assets...")
-                onUpdate(15, f"start querying {cntAll}")
+                cursor.itersize = szChunk
+                cursor.execute(sql, params)
 
-                #----------------------------------------------------------------
-                # query assets
-                #----------------------------------------------------------------
-                sql = "Select * From asset Where status = 'active' And type = %s"
+                onUpdate(15, f"start streaming assets")
 
-                params = [asType]
+                while True:
+                    rows = cursor.fetchmany(szChunk)
+                    if not rows: break
 
-                if usrId:
-                    sql += " AND \"ownerId\" = %s"
-                    params.append(usrId)
+                    cntRows += len(rows)
+                    chunk = enrichAssets(cs, rows, liveMap)
+                    cntOk += len(chunk)
 
-                sql += " ORDER BY \"createdAt\" DESC"
+                    yield chunk
 
-                cursor.execute(sql, params)
+            lg.info(f"[psql] streamed {cntOk}/{cntRows} {asType.lower()} assets")
 
-                szBatch = 100
-                szChunk = 100
-                assets = []
-                cntFetched = 0
+    except Exception as e:
+        msg = f"Failed to FetchAssets: {str(e)}"
+        raise mkErr(msg, e)
 
-                # tStart = time.time()
 
-                while True:
-                    batch = cursor.fetchmany(szBatch)
-                    if not batch: break
-
-                    cntFetched += len(batch)
-
-                    for row in batch: assets.append(row)
-
-                    # if cntAll > 0:
-                    #     if cntFetched > 0:
-                    #         tmUsed = time.time() - tStart
-                    #         tPerItem = tmUsed / cntFetched
-                    #         remCnt = cntAll - cntFetched
-                    #         remTime = tPerItem * remCnt
-                    #         remMins = int(remTime / 60)
-                    #         tmSuffix = f"remain: {remMins} mins"
-                    #     else:
-                    #         tmSuffix = "calcuating..."
-
-                        # report("fetch", cntFetched, cntAll, f"processed {cntFetched}/{cntAll} ... {tmSuffix}")
-
-                onUpdate(30, "main assets done... query for files..")
-
-                #----------------------------------------------------------------
-                # query asset files
-                #----------------------------------------------------------------
-                flsSql = """
-                   Select "assetId", type, path
-                   From asset_file
-                   Where "assetId" = ANY(%s)
-                """
+#------------------------------------------------------
+# Bulk import (first fetch of a large library)
+#------------------------------------------------------
+# asset + files + exif + live video in one projection, binary COPY avoids the per-row protocol overhead
+copySql: LiteralString = """
+    COPY (
+        SELECT
+            a.id,
+            a."ownerId",
+            a."deviceId"::text,
+            a.type::text,
+            a."originalFileName"::text,
+            a."originalPath"::text,
+            a."fileCreatedAt",
+            a."fileModifiedAt",
+            a."localDateTime",
+            a."isFavorite",
+            to_jsonb(a) ->> 'visibility',
+            f.files,
+            json_strip_nulls(row_to_json(e)),
+            v.id,
+            v."encodedVideoPath"::text,
+            v."originalPath"::text
+        FROM asset a
+        LEFT JOIN LATERAL (
+            SELECT json_object_agg(af.type::text, af.path) AS files
+            FROM asset_file af
+            WHERE af."assetId" = a.id
+        ) f ON true
+        LEFT JOIN asset_exif e ON e."assetId" = a.id
+        LEFT JOIN asset v ON v.id = a."livePhotoVideoId" AND v.type = 'VIDEO'
+        WHERE a.status = 'active' AND a.type = 'IMAGE' AND a."ownerId" = %s
+    ) TO STDOUT (FORMAT BINARY)
+"""
+
+copyTypes = [
+    'uuid', 'uuid', 'text', 'text', 'text', 'text',
+    'timestamptz', 'timestamptz', 'timestamptz', 'bool', 'text',
+    'json', 'json', 'uuid', 'text', 'text',
+]
+
+# json renders timestamps with trimmed fractions, re-format them like the row by row fetch (datetime.isoformat)
+rxIsoTs = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:\d{2})?$')
+
+def copyRowToAsset(row, liveMap: Optional[Dict[str, tuple]] = None) -> Optional[dict]:
+    (assId, ownerId, deviceId, typ, fileName, origPath, fCreated, fModified, localDt,
+     isFav, visibility, files, exif, vdoId, vdoPath, vdoOrigPath) = row
+
+    thumb = (files or {}).get(ks.db.thumbnail)
+    if not thumb: return None
+
+    asset = {
+        'id': assId,
+        'ownerId': ownerId,
+        'deviceId': deviceId,
+        'type': typ,
+        'originalFileName': fileName,
+        'originalPath': origPath,
+        'fileCreatedAt': fCreated,
+        'fileModifiedAt': fModified,
+        'localDateTime': localDt,
+        'isFavorite': isFav,
+        'visibility': visibility,
+        'thumbnail_path': envs.pth.normalize(thumb),
+    }
+
+    pvw = files.get(ks.db.preview)
+    if pvw: asset['preview_path'] = envs.pth.normalize(pvw)
+
+    if not vdoId and exif:
+        vdo = pairLive(assId, exif.get('livePhotoCID'), liveMap)
+        if vdo: vdoId, vdoPath, vdoOrigPath = vdo
+
+    finalPath = vdoPath if vdoPath else vdoOrigPath
+    if finalPath:
+        asset['video_path'] = envs.pth.normalize(finalPath)
+        asset['video_id'] = vdoId
+
+    if exif:
+        exif.pop('assetId', None)
+        for key, val in exif.items():
+            if isinstance(val, str) and rxIsoTs.match(val):
+                try:
+                    exif[key] = datetime.fromisoformat(val).isoformat()
+                except ValueError:
+                    pass
+        if exif: asset['exifInfo'] = exif
 
-                assetIds = [a['id'] for a in assets]
-                afs = []
+    return asset
 
-                for idx, i in enumerate(range(0, len(assetIds), szChunk)):
-                    chunk = assetIds[i:i + szChunk]
-                    cursor.execute(flsSql, (chunk,))
-                    chunkRows = cursor.fetchall()
-                    afs.extend(chunkRows)
-
-                    chunkPct = min((idx + 1) * szChunk, len(assetIds))
-
-                onUpdate(40, "files ready, combine data...")
-
-                dictFiles = {}
-                for af in afs:
-                    assetId = af['assetId']
-                    typ = af['type']
-                    path = af['path']
-                    if assetId not in dictFiles: dictFiles[assetId] = {}
-                    dictFiles[assetId][typ] = path
-
-                #----------------------------------------------------------------
-                # query exif
-                #----------------------------------------------------------------
-                exifSql = """
-                    Select *
-                    From asset_exif
-                    Where "assetId" = ANY(%s)
-                """
 
-                exifData = {}
-                for idx, i in enumerate(range(0, len(assetIds), szChunk)):
-                    chunk = assetIds[i:i + szChunk]
+def iterAssetsBulk(usr: models.Usr, onUpdate: models.IFnProg, szChunk: Optional[int] = None) -> Iterator[List[dict]]:
+    """
+    stream active assets with one binary COPY, rows are parsed into saveBy-ready dicts
+    on a background thread while the caller writes the previous chunk into sqlite
+    """
+    import db
+    if not szChunk: szChunk = max(db.dto.fetchChunk, 1) * 4
+
+    q = queue.Queue(maxsize=4)
+    stop = threading.Event()
+    cnts = {'rows': 0, 'ok': 0}
+
+    def push(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-                    cursor.execute(exifSql, (chunk,))
-                    chunkRows = cursor.fetchall()
-
-                    for row in chunkRows:
-                        assetId = row['assetId']
-                        exifItem = {}
-
-                        for key, val in row.items():
-                            if key == 'assetId': continue
-
-                            if key in ('dateTimeOriginal', 'modifyDate') and val is not None:
-                                if isinstance(val, str):
-                                    exifItem[key] = val
-                                else:
-                                    exifItem[key] = val.isoformat() if val else None
-                            elif val is not None:
-                                exifItem[key] = val
-
-                        if exifItem: exifData[assetId] = exifItem
-
-                    chunkPct = min((idx + 1) * szChunk, len(assetIds))
-
-                #----------------------------------------------------------------
-                # query livephoto videos
-                #----------------------------------------------------------------
-                onUpdate(42, "query livephoto videos...")
-
-                tableName = 'asset'
-                livePhotoSql = f"""
-                    -- Method 1: Direct livePhotoVideoId
-                    SELECT
-                        a.id AS photo_id,
-                        a."livePhotoVideoId" AS video_id,
-                        v."encodedVideoPath" AS video_path,
-                        v."originalPath" AS video_original_path
-                    FROM {tableName} a
-                    JOIN {tableName} v ON v.id = a."livePhotoVideoId" AND v.type = 'VIDEO'
-                    WHERE a."livePhotoVideoId" IS NOT NULL
-                    AND a.type = 'IMAGE'
-                    AND a.id = ANY(%s)
-
-                    UNION
-
-                    -- Method 2: Match by livePhotoCID (for photos without livePhotoVideoId)
-                    SELECT DISTINCT
-                        a.id AS photo_id,
-                        v.id AS video_id,
-                        v."encodedVideoPath" AS video_path,
-                        v."originalPath" AS video_original_path
-                    FROM {tableName} a
-                    JOIN asset_exif ae ON a.id = ae."assetId"
-                    JOIN asset_exif ve ON ae."livePhotoCID" = ve."livePhotoCID"
-                    JOIN {tableName} v ON ve."assetId" = v.id
-                    WHERE ae."livePhotoCID" IS NOT NULL
-                    AND a."livePhotoVideoId" IS NULL
-                    AND a.type = 'IMAGE'
-                    AND v.type = 'VIDEO'
-                    AND v.id != a.id
-                    AND a.id = ANY(%s)
-                """
+    def produce():
+        try:
+            with mkConn() as conn:
+                with conn.cursor() as cursor:
+                    liveMap = fetchLiveMap(cursor, usr.id)
 
-                livePaths = {}
-                liveVdoIds = {}
-                for idx, i in enumerate(range(0, len(assetIds), szChunk)):
-                    chunk = assetIds[i:i + szChunk]
-                    cursor.execute(livePhotoSql, (chunk, chunk))
-                    chunkRows = cursor.fetchall()
-
-                    for row in chunkRows:
-                        photoId = row['photo_id']
-                        videoId = row['video_id']
-                        videoPath = row['video_path']
-                        originalVideoPath = row['video_original_path']
-
-                        finalPath = videoPath if videoPath else originalVideoPath
-                        if finalPath:
-                            livePaths[photoId] = envs.pth.normalize(finalPath)
-                            liveVdoIds[photoId] = videoId
-
-                #----------------------------------------------------------------
-                # combine & fetch thumbnail image
-                #----------------------------------------------------------------
-                onUpdate(45, "files ready, combine data...")
-
-                cntOk = 0
-                cntErr = 0
-
-                rst = []
-
-                for asset in assets:
-                    assetId = asset['id']
-                    if assetId in dictFiles:
-                        for typ, path in dictFiles[assetId].items():
-                            if typ == ks.db.thumbnail: asset['thumbnail_path'] = envs.pth.normalize(path)
-                            elif typ == ks.db.preview: asset['preview_path'] = envs.pth.normalize(path)
-
-                    if assetId in livePaths: asset['video_path'] = livePaths[assetId]
-                    if assetId in liveVdoIds: asset['video_id'] = liveVdoIds[assetId]
-
-                    if assetId in exifData:
-                        asset['exifInfo'] = exifData[assetId]
-                    else:
-                        lg.warn(f"[exif] NotFound.. assetId[{assetId}]")
+                    with cursor.copy(copySql, (usr.id,)) as cp:
+                        cp.set_types(copyTypes)
 
-                    # final check
-                    pathThumbnail = asset.get('thumbnail_path')
-                    if not pathThumbnail:
-                        cntErr += 1
-                        lg.warn(f"[psql] ignore non thumbnail asset: {str(asset.get('id'))}")
-                        continue
+                        chunk = []
+                        for row in cp.rows():
+                            cnts['rows'] += 1
+                            asset = copyRowToAsset(row, liveMap)
+                            if asset: chunk.append(asset)
 
-                    cntOk += 1
-                    rst.append(asset)
+                            if len(chunk) >= szChunk:
+                                # raising inside the block makes psycopg cancel the copy on the server
+                                if not push(chunk): raise InterruptedError("bulk copy stopped by consumer")
+                                cnts['ok'] += len(chunk)
+                                chunk = []
 
-                    # if len(assets) > 0 and (cntOk % 100 == 0 or cntOk == len(assets)):
-                    #     report("combine", cntOk, len(assets), f"processing {cntOk}/{len(assets)}...")
+                        if chunk and push(chunk): cnts['ok'] += len(chunk)
 
-                lg.info(f"Successfully fetched {len(rst)} {asType.lower()} assets")
-                onUpdate(5, f"Successfully fetched {len(rst)} {asType.lower()} assets")
+            push(None)
+        except Exception as e:
+            if not stop.is_set(): push(e)
+
+    try:
+        chk()
+        onUpdate(11, f"start bulk copy for {usr.id}")
+
+        th = threading.Thread(target=produce, name=f"mkit-copy-{usr.id}", daemon=True)
+        th.start()
+
+        onUpdate(15, f"start streaming assets")
+
+        try:
+            while True:
+                item = q.get()
+                if item is None: break
+                if isinstance(item, Exception): raise item
+                yield item
+        finally:
+            stop.set()
+            th.join(timeout=5)
+
+        lg.info(f"[psql] bulk copied {cnts['ok']}/{cnts['rows']} image assets")
 
-                return rst
     except Exception as e:
-        msg = f"Failed to FetchAssets: {str(e)}"
-        raise mkErr(msg, e)
+        raise mkErr(f"Failed to bulk copy assets: {str(e)}", e)
+
+
+def fetchAssets(usr: models.Usr, onUpdate: models.IFnProg) -> List[dict]:
+    rst = []
+    for chunk in iterAssets(usr, onUpdate): rst.extend(chunk)
+
+    onUpdate(45, f"Successfully fetched {len(rst)} assets")
+    return rst
 
 
 #------------------------------------------------------
@@ -708,6 +993,8 @@ def addToAlbum(albumId: str, assetIds: List[str]) -> int:
                 cursor.executemany(insertSql, values)
                 conn.commit()
 
+                exCache.deleteMany(str(aid) for aid in newAssetIds)
+
                 return len(newAssetIds)
     except Exception as e:
         raise mkErr(f"Failed to add assets to album[{albumId}]", e)
@@ -727,6 +1014,8 @@ def delFromAlbumBy(albumId: str, assetIds: List[str]) -> int:
                 cursor.execute(sql, (albumId, assetIds))
                 removedCnt = cursor.rowcount
                 conn.commit()
+
+                exCache.deleteMany(str(aid) for aid in assetIds)
                 return removedCnt
     except Exception as e:
         raise mkErr(f"Failed to remove assets from album[{albumId}]", e)
@@ -839,77 +1128,83 @@ def fetchExInfo(assetId: str) -> Optional[models.AssetExInfo]:
     return rst.get(assetId)
 
 
-def fetchExInfos(assetIds: List[str]) -> Dict[str, models.AssetExInfo]:
+# albums/tags/faces per asset id, our own album edits invalidate, remote edits show up after the ttl
+exCacheTtl = 300
+exCacheMax = 20000
+exCache = TtlLru('exInfo', exCacheMax, exCacheTtl)
+
+def fetchExInfos(assetIds: List[str], useCache=True) -> Dict[str, models.AssetExInfo]:
+    if not assetIds: return {}
+    if not useCache: return queryExInfos(assetIds)
+
+    keys = list(dict.fromkeys(str(aid).strip() for aid in assetIds))
+    rst, miss = exCache.getMany(keys)
+
+    if miss:
+        fetched = queryExInfos(miss)
+        exCache.setMany(fetched)
+        rst.update(fetched)
+
+    return rst
+
+
+def mkExInfoSql() -> str:
+    """
+    albums, tags and named faces of each id as json arrays, one row per asset
+    """
+    sch = getSchema()
+    return f"""
+    Select
+        ids.id AS "_aid",
+        (
+            Select json_agg(json_build_object(
+                'id', a.id, 'ownerId', a."ownerId", 'albumName', a."albumName", 'description', a.description,
+                'updatedAt', a."updatedAt", 'albumThumbnailAssetId', a."albumThumbnailAssetId",
+                'isActivityEnabled', a."isActivityEnabled", 'order', a."order"
+            ) Order By a."createdAt" Desc)
+            From {sch.album} a
+            Join album_asset aaa On a.id = aaa."{sch.albumAssetAlbumId}"
+            Where aaa."{sch.albumAssetAssetId}" = ids.id And a."deletedAt" Is Null
+        ) AS albs,
+        (
+            Select json_agg(json_build_object('id', t.id, 'value', t.value, 'userId', t."userId"))
+            From {sch.tag} t
+            Join tag_asset ta On t.id = ta."{sch.tagAssetTagId}"
+            Where ta."{sch.tagAssetAssetId}" = ids.id
+        ) AS tags,
+        (
+            Select json_agg(json_build_object(
+                'id', af.id, 'personId', af."personId", 'name', p.name, 'ownerId', p."ownerId",
+                'imageWidth', af."imageWidth", 'imageHeight', af."imageHeight",
+                'boundingBoxX1', af."boundingBoxX1", 'boundingBoxY1', af."boundingBoxY1",
+                'boundingBoxX2', af."boundingBoxX2", 'boundingBoxY2', af."boundingBoxY2",
+                'sourceType', af."sourceType"
+            ))
+            From asset_face af
+            Join person p On af."personId" = p.id
+            Where af."assetId" = ids.id And p.name Is Not Null And p.name != '' And af."deletedAt" Is Null
+        ) AS facs
+    From unnest(%s::uuid[]) AS ids(id)
+    """
+
+
+def queryExInfos(assetIds: List[str]) -> Dict[str, models.AssetExInfo]:
     if not assetIds: return {}
 
     try:
-        sch = getSchema()
+        sql = mkExInfoSql()
         with mkConn() as conn:
             with conn.cursor(row_factory=dict_row) as cursor:
                 rst = {}
-                szChunk = 100
+                szChunk = 500
 
-                for assetId in assetIds: rst[str(assetId).strip()] = models.AssetExInfo()
-
-                # Fetch albums in chunks
-                for i in range(0, len(assetIds), szChunk):
-                    chunk = assetIds[i:i + szChunk]
-                    albSql = f"""
-                    Select aaa."{sch.albumAssetAssetId}", a.id, a."ownerId", a."albumName", a.description,
-                           a."createdAt", a."updatedAt", a."albumThumbnailAssetId", a."isActivityEnabled", a."order"
-                    From {sch.album} a
-                    Join album_asset aaa On a.id = aaa."{sch.albumAssetAlbumId}"
-                    Where aaa."{sch.albumAssetAssetId}" = ANY(%s) And a."deletedAt" Is Null
-                    Order By a."createdAt" Desc
-                    """
-                    cursor.execute(albSql, (chunk,))
-                    albRows = cursor.fetchall()
-                    # lg.info(f"Album query returned {len(albRows)} rows for chunk {chunk}")
-
-                    for row in albRows:
-                        assetId = str(row[sch.albumAssetAssetId]).strip()
-                        if assetId in rst:
-                            albData = {k: v for k, v in row.items() if k != sch.albumAssetAssetId}
-                            rst[assetId].albs.append(models.Album.fromDic(albData))
-
-                # Fetch tags in chunks
-                for i in range(0, len(assetIds), szChunk):
-                    chunk = assetIds[i:i + szChunk]
-                    tagSql = f"""
-                    Select ta."{sch.tagAssetAssetId}", t.id, t.value, t."userId"
-                    From {sch.tag} t
-                    Join tag_asset ta On t.id = ta."{sch.tagAssetTagId}"
-                    Where ta."{sch.tagAssetAssetId}" = ANY(%s)
-                    """
-                    cursor.execute(tagSql, (chunk,))
-                    tagRows = cursor.fetchall()
-
-                    for row in tagRows:
-                        assetId = str(row[sch.tagAssetAssetId]).strip()
-                        if assetId in rst:
-                            tagData = {k: v for k, v in row.items() if k != sch.tagAssetAssetId}
-                            rst[assetId].tags.append(models.Tags.fromDic(tagData))
-
-                # Fetch faces in chunks
                 for i in range(0, len(assetIds), szChunk):
                     chunk = assetIds[i:i + szChunk]
-                    facSql = """
-                    Select af."assetId", af.id, af."personId", p.name, p."ownerId",
-                           af."imageWidth", af."imageHeight", af."boundingBoxX1", af."boundingBoxY1",
-                           af."boundingBoxX2", af."boundingBoxY2", af."sourceType"
-                    From asset_face af
-                    Join person p On af."personId" = p.id
-                    Where p.name != Null And af."assetId" = ANY(%s) And af."deletedAt" Is Null
-                    """
-                    cursor.execute(facSql, (chunk,))
-                    facRows = cursor.fetchall()
-
-                    for row in facRows:
-                        assetId = str(row['assetId']).strip()
-                        if assetId in rst:
-                            facData = {k: v for k, v in row.items() if k != 'assetId'}
-                            rst[assetId].facs.append(models.AssetFace.fromDic(facData))
+                    cursor.execute(sql, (chunk,), prepare=True)
 
+                    # albs/tags/facs arrive as lists of dicts, fromDic maps them onto the models
+                    for row in cursor.fetchall():
+                        rst[str(row['_aid'])] = models.AssetExInfo.fromDic(row)
 
                 return rst
 
@@ -60,3 +60,17 @@ def save(key, value):
         error_msg = f"Failed to save setting value {key}: {str(e)}"
         lg.error(error_msg)
         return False
+
+
+def delete(key, prefix=False):
+    try:
+        with mkConn() as conn:
+            c = conn.cursor()
+            if prefix: c.execute("Delete From settings Where key LIKE ?", (key + '%',))
+            else: c.execute("Delete From settings Where key = ?", (key,))
+            conn.commit()
+            return True
+    except Exception as e:
+        error_msg = f"Failed to delete setting value {key}: {str(e)}"
+        lg.error(error_msg)
+        return False
@@ -1,5 +1,6 @@
+import threading
 import time
-from typing import List, Tuple, Set, Callable, Optional
+from typing import List, Dict, Tuple, Set, Callable, Optional
 from dataclasses import dataclass, field
 
 import db
@@ -42,9 +43,10 @@ class SearchInfo:
 
 def createReporter(doReport: IFnProg) -> Callable[[str], Tuple[int, int]]:
     def autoReport(msg: str) -> Tuple[int, int]:
-        cntAll = db.pics.count()
-        cntOk = db.pics.countSimOk(1)
-        progress = round(cntOk / cntAll * 100, 2) if cntAll > 0 else 0
+        cnts = db.pics.getCnts()
+        cntAll = cnts.get('ass', 0)
+        cntOk = cnts.get('simOk', 0)
+        progress = int(cntOk / cntAll * 100) if cntAll > 0 else 0
         doReport(progress, msg)
         return cntOk, cntAll
     return autoReport
@@ -108,7 +110,7 @@ def findCandidate(autoId: int, taskArgs: dict) -> models.Asset:
 
 
 
-def searchBy( src: Optional[models.Asset], doRep: IFnProg, isCancel: IFnCancel, fromUrl: bool = False) -> List[SearchInfo]:
+def searchBy( src: Optional[models.Asset], doRep: IFnProg, isCancel: IFnCancel, fromUrl: bool = False, exclAids: Optional[Set[int]] = None, claims: Optional[Set[int]] = None) -> List[SearchInfo]:
     gis = []
     ass = src
     grpIdx = 1
@@ -135,7 +137,7 @@ def searchBy( src: Optional[models.Asset], doRep: IFnProg, isCancel: IFnCancel,
         doRep(prog, f"Searching group {len(gis) + 1}/{sizeMax} - Asset #{ass.autoId}")
 
         try:
-            gi = findGroupBy(ass, doRep, grpIdx, fromUrl)
+            gi = findGroupBy(ass, doRep, grpIdx, fromUrl, exclAids, claims)
 
             if not gi.assets:
 
@@ -173,7 +175,158 @@ def searchBy( src: Optional[models.Asset], doRep: IFnProg, isCancel: IFnCancel,
     return gis
 
 
-def findGroupBy( asset: models.Asset, doReport: IFnProg, grpId: int, fromUrl = False) -> SearchInfo:
+#------------------------------------------------------------------------
+# look-ahead: search the next groups while the user reviews the current one
+#------------------------------------------------------------------------
+class Ahead:
+    """
+    found groups are persisted like any search (they also show up as pending),
+    the roots are kept here so auto next can show them without searching
+
+    excl: ids the prefetch keeps off (the group on screen, a foreground search, the ready groups)
+    claims: ids the prefetch has taken (the running search, the ready groups), a foreground search keeps off them
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.ready: List[int] = []
+        self.members: Dict[int, Set[int]] = {}
+        self.excl: Set[int] = set()
+        self.claims: Set[int] = set()
+        self.busy = False
+        self.gen = 0
+
+    def kick(self, skipAids: Optional[List[int]] = None):
+        depth = db.dto.simAhead
+        if depth <= 0 or not db.dto.autoNext or db.dto.muod: return
+
+        with self.cond:
+            if self.busy or len(self.ready) >= depth: return
+            self.busy = True
+            gen = self.gen
+
+            # the group on screen is still being resolved, prefetched groups must not pull its members in
+            self.excl.clear()
+            self.excl.update(skipAids or [])
+            for aids in self.members.values(): self.excl.update(aids)
+
+        threading.Thread(target=self.run, args=(gen, depth), name='mkit-sim-ahead', daemon=True).start()
+
+    def run(self, gen: int, depth: int):
+        noGrps: List[int] = []
+        try:
+            while True:
+                with self.cond:
+                    if gen != self.gen or len(self.ready) >= depth: break
+                    skips = list(self.excl | self.claims) + noGrps
+
+                ass = db.pics.getAnyNonSim(skips)
+                if not ass: break
+
+                with self.cond:
+                    if gen != self.gen or ass.autoId in self.excl: break
+                    self.claims.add(ass.autoId)
+
+                st = time.time()
+                gi = findGroupBy(ass, lambda p, m: None, 1, exclAids=self.excl, claims=self.claims)
+                if not gi.assets:
+                    noGrps.append(ass.autoId)
+                    continue
+
+                assets = db.pics.getSimAssets(ass.autoId, db.dto.rtree)  # fills exInfo cache
+                warmImgs(assets)
+
+                aids = {a.autoId for a in assets}
+                with self.cond:
+                    if gen != self.gen: break
+                    self.ready.append(ass.autoId)
+                    self.members[ass.autoId] = aids
+                    self.excl.update(aids)
+                    self.cond.notify_all()
+
+                lg.info(f"[sim:ahead] ready #{ass.autoId} assets[{len(assets)}] in {time.time() - st:.2f}s, queued[{len(self.ready)}]")
+        except Exception as e:
+            lg.error(f"[sim:ahead] prefetch failed: {e}")
+        finally:
+            with self.cond:
+                self.busy = False
+                self.unclaim()
+                self.cond.notify_all()
+
+    def unclaim(self):
+        # only the ready groups stay claimed, callers hold the cond
+        keep = set().union(*self.members.values())
+        self.claims &= keep
+
+    def take(self) -> Optional[int]:
+        """
+        the next prefetched root still waiting for review, None when nothing is ready yet
+        """
+        with self.cond:
+            while self.ready:
+                aid = self.ready.pop(0)
+                self.members.pop(aid, None)
+                self.unclaim()
+                try:
+                    root = db.pics.getByAutoId(aid)
+                except Exception:
+                    continue
+                if root and root.simGIDs and not root.simOk: return aid
+            return None
+
+    def busyAids(self) -> List[int]:
+        with self.cond:
+            return list(self.claims)
+
+    def hold(self, aid: int) -> Tuple[Set[int], Set[int]]:
+        """
+        a foreground search runs next to the prefetch without waiting on it,
+        returns (exclAids, claims) for its findGroupBy so both keep off each other's groups
+        """
+        with self.cond:
+            if aid in self.claims: lg.info(f"[sim:ahead] #{aid} is already taken by the prefetch")
+            self.excl.add(aid)
+            return self.claims, self.excl
+
+    def toGroups(self, aid: int) -> List[SearchInfo]:
+        assets = db.pics.getSimAssets(aid, db.dto.rtree)
+        if not assets: return []
+        return [SearchInfo(asset=assets[0], bseInfos=assets[0].simInfos or [], assets=assets)]
+
+    def reset(self):
+        with self.cond:
+            self.gen += 1
+            self.ready.clear()
+            self.members.clear()
+            self.claims.clear()
+            self.excl.clear()
+
+
+ahead = Ahead()
+
+
+def warmImgs(assets: List[models.Asset]):
+    import os
+    import rend
+    from conf import envs
+
+    rend.warm([a.autoId for a in assets])
+
+    # previews open in the modal, pull them into the page cache
+    if not hasattr(os, 'posix_fadvise'): return
+    for a in assets:
+        path = envs.pth.full(a.pathPreview) if a.pathPreview else ''
+        if not path or not os.path.exists(path): continue
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+
+def findGroupBy( asset: models.Asset, doReport: IFnProg, grpId: int, fromUrl = False, exclAids: Optional[Set[int]] = None, claims: Optional[Set[int]] = None) -> SearchInfo:
 
     lg.info(f"[sim:fg] grpId[{grpId}] #{asset.autoId}")
     result = SearchInfo()
@@ -183,6 +336,7 @@ def findGroupBy( asset: models.Asset, doReport: IFnProg, grpId: int, fromUrl = F
     thMin = db.dto.thMin
 
     bseVec, bseInfos = db.vecs.findSimiliar(asset.autoId, thMin)
+    if exclAids: bseInfos = [i for i in bseInfos if i.isSelf or i.aid not in exclAids]
     result.bseVec = bseVec
     result.bseInfos = bseInfos
 
@@ -225,7 +379,7 @@ def findGroupBy( asset: models.Asset, doReport: IFnProg, grpId: int, fromUrl = F
     db.pics.setSimGIDs(asset.autoId, rootGID)
     db.pics.setSimInfos(asset.autoId, bseInfos)
 
-    processChildren(asset, bseInfos, simAids, doReport)
+    processChildren(asset, bseInfos, simAids, doReport, exclAids, claims)
 
     if not fromUrl and db.dto.muod:
         #not fromUrl and enable muod
@@ -242,7 +396,7 @@ def findGroupBy( asset: models.Asset, doReport: IFnProg, grpId: int, fromUrl = F
     return result
 
 
-def processChildren( asset: models.Asset, bseInfos: List[models.SimInfo], simAids: List[int], doReport: IFnProg) -> Set[int]:
+def processChildren( asset: models.Asset, bseInfos: List[models.SimInfo], simAids: List[int], doReport: IFnProg, exclAids: Optional[Set[int]] = None, claims: Optional[Set[int]] = None) -> Set[int]:
 
     thMin = db.dto.thMin
     maxItems = db.dto.rtreeMax
@@ -253,13 +407,15 @@ def processChildren( asset: models.Asset, bseInfos: List[models.SimInfo], simAid
     db.pics.setSimInfos(asset.autoId, bseInfos)
 
     doneIds = {asset.autoId}
+    if claims is not None: claims.add(asset.autoId)
     simQ = [(aid, 0) for aid in simAids]
 
     while simQ:
         aid, depth = simQ.pop(0)
-        if aid in doneIds: continue
+        if aid in doneIds or (exclAids and aid in exclAids): continue
 
         doneIds.add(aid)
+        if claims is not None: claims.add(aid)
         doReport(50, f"Processing children similar photo #{aid} depth({depth}) count({len(doneIds)})")
 
         try:
@@ -268,6 +424,7 @@ def processChildren( asset: models.Asset, bseInfos: List[models.SimInfo], simAid
 
             lg.info(f"[sim:fnd] search child #{aid} depth[{depth}]items({len(doneIds)}/{maxItems})")
             cVec, cInfos = db.vecs.findSimiliar(aid, thMin)
+            if exclAids: cInfos = [i for i in cInfos if i.isSelf or i.aid not in exclAids]
 
             db.pics.setSimGIDs(aid, rootGID)
             db.pics.setSimInfos(aid, cInfos)
@@ -1,3 +1,4 @@
+import threading
 from typing import List, Optional, Tuple
 
 import numpy as np
@@ -17,6 +18,10 @@ keyColl = "mediakit"
 
 conn: Optional[QdrantClient] = None
 
+# point count kept by the writer, None means unknown and the next read asks qdrant
+cntLock = threading.Lock()
+cntVec: Optional[int] = None
+
 
 def init():
     global conn
@@ -61,6 +66,7 @@ def create():
 
 
 def cleanAll():
+    global cntVec
     try:
         if conn is None: raise RuntimeError("[qdrant] not connection")
 
@@ -71,6 +77,8 @@ def cleanAll():
             conn.delete_collection(keyColl, 60 * 5)
             lg.info(f"[qdrant] coll[{keyColl}] deleted")
 
+        with cntLock: cntVec = 0
+
         create()
 
     except Exception as e:
@@ -78,15 +86,30 @@ def cleanAll():
 
 
 def count():
+    global cntVec
     try:
         if conn is None: raise RuntimeError("[vecs] Qdrant connection not initialized")
 
         rst = conn.count(collection_name=keyColl)
+        with cntLock: cntVec = rst.count
         return rst.count
     except Exception as e:
         raise mkErr(f"Error checking database population", e)
 
 
+def countFast():
+    with cntLock:
+        if cntVec is not None: return cntVec
+    return count()
+
+
+def _cntAdd(n: Optional[int]):
+    global cntVec
+    with cntLock:
+        if n is None: cntVec = None
+        elif cntVec is not None: cntVec = max(cntVec + n, 0)
+
+
 def deleteBy(aids: list[int]):
     try:
         if conn is None: raise RuntimeError("[vecs] Qdrant connection not initialized")
@@ -96,6 +119,9 @@ def deleteBy(aids: list[int]):
             points_selector=qmod.PointIdsList(points=aids) # type: ignore
         )
 
+        # some aids may have no point, let the next read recount
+        _cntAdd(None)
+
         lg.info(f"[vec] delete status[{rst}] count[ {len(aids)} ]")
         if rst.status != qmod.UpdateStatus.COMPLETED:
             raise RuntimeError(f"Delete operation failed with status: {rst.status}")
@@ -105,7 +131,10 @@ def deleteBy(aids: list[int]):
         raise mkErr(f"Error deleting vector for asset {aids}", e)
 
 
-def save(aid: int, vector: np.ndarray, confirm=True):
+def save(aid: int, vector: np.ndarray, confirm=True, isNew: Optional[bool] = None):
+    """
+    isNew comes from the caller (asset.isVectored), unknown drops the cached count for a lazy recount
+    """
     try:
         if conn is None: raise RuntimeError("[vecs] Qdrant connection not initialized")
 
@@ -129,6 +158,9 @@ def save(aid: int, vector: np.ndarray, confirm=True):
             collection_name=keyColl,
             points=[qmod.PointStruct(id=aid, vector=vecList, payload={"aid": aid})]
         )
+        # a re-vectored asset overwrites its point, only a new point moves the cached count
+        if isNew is None: _cntAdd(None)
+        elif isNew: _cntAdd(1)
 
         if confirm:
             try:
@@ -7,7 +7,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import multiprocessing
 import threading
 
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Iterator
 
 import numpy as np
 from torchvision.models import resnet152, ResNet152_Weights
@@ -246,7 +246,7 @@ def saveVectorBy(asset: models.Asset, photoQ) -> Tuple[models.Asset, Optional[st
         if vec is None:
             return asset, f"feature extraction failed: {asset.id} - cannot extract features"
 
-        db.vecs.save(asset.autoId, vec)
+        db.vecs.save(asset.autoId, vec, isNew=not asset.isVectored)
 
         return asset, None
 
@@ -316,7 +316,7 @@ def saveVectorBatch(assets: List[models.Asset], photoQ) -> List[Tuple[models.Ass
 
         for asset, vec in zip(rstOKs, vecs):
             try:
-                db.vecs.save(asset.autoId, vec)
+                db.vecs.save(asset.autoId, vec, isNew=not asset.isVectored)
                 results.append((asset, None))
             except Exception as e:
                 errMsg = str(e)
@@ -333,7 +333,7 @@ def saveVectorBatch(assets: List[models.Asset], photoQ) -> List[Tuple[models.Ass
             try:
                 if idx < len(imgs):
                     vec = extractFeatures(imgs[idx])
-                    db.vecs.save(asset.autoId, vec)
+                    db.vecs.save(asset.autoId, vec, isNew=not asset.isVectored)
                     results.append((asset, None))
                 else:
                     results.append((asset, f"image loading failed: {asset.id} - no corresponding image"))
@@ -349,9 +349,27 @@ def saveVectorBatch(assets: List[models.Asset], photoQ) -> List[Tuple[models.Ass
     return results
 
 
-def processVectors(assets: List[models.Asset], photoQ, onUpdate: models.IFnProg, isCancelled: models.IFnCancel) -> models.ProcessInfo:
+def iterChunks(src: models.AssetBatch | List[models.Asset] | Iterator[models.AssetBatch], size: int) -> Iterator[list]:
+    """
+    regroup a list/AssetBatch or a stream of AssetBatch chunks into lists of at most size
+    """
+    chunks = [src] if isinstance(src, (list, models.AssetBatch)) else src
+
+    buf = []
+    for chunk in chunks:
+        for ass in chunk:
+            buf.append(ass)
+            if len(buf) >= size:
+                yield buf
+                buf = []
+    if buf: yield buf
+
+
+def processVectors(assets: models.AssetBatch | List[models.Asset] | Iterator[models.AssetBatch], photoQ, onUpdate: models.IFnProg, isCancelled: models.IFnCancel, total: Optional[int] = None) -> models.ProcessInfo:
     tS = time.time()
-    pi = models.ProcessInfo(all=len(assets), done=0, skip=0, erro=0)
+    # a stream of chunks can not be counted up front, its caller passes total
+    if total is None: total = len(assets) if isinstance(assets, (list, models.AssetBatch)) else 0
+    pi = models.ProcessInfo(all=total, done=0, skip=0, erro=0)
     inPct = 15
 
     batchSize = getOptimalBatchSize()
@@ -406,18 +424,13 @@ def processVectors(assets: List[models.Asset], photoQ, onUpdate: models.IFnProg,
         if onUpdate:
             onUpdate(inPct, f"Processing [{pi.all}] images on {deviceStr}")
 
-        batches = []
-        for i in range(0, len(assets), batchSize):
-            batch = assets[i:i + batchSize]
-            batches.append(batch)
-
         if device_type in ['cuda', 'mps'] and batchSize > 1:
-            lg.info(f"[imgs] Using {device_type.upper()} batch processing: {len(batches)} batches of size {batchSize}")
+            lg.info(f"[imgs] Using {device_type.upper()} batch processing: {(pi.all + batchSize - 1) // batchSize} batches of size {batchSize}")
 
-            for batchIdx, batch in enumerate(batches):
+            for batchIdx, batch in enumerate(iterChunks(assets, batchSize)):
                 if isCancelled and isCancelled():
                     lg.info("[imgs] Processing cancelled by user")
-                    pi.erro = len(assets) - cntDone
+                    pi.erro = max(pi.all - cntDone, 0)
                     break
 
                 try:
@@ -456,7 +469,7 @@ def processVectors(assets: List[models.Asset], photoQ, onUpdate: models.IFnProg,
 
                         currentTime = time.time()
                         tElapsed = currentTime - tS
-                        needUpdate = (batchIdx % 5 == 0 or batchIdx == len(batches) - 1 or (currentTime - lastUpdateTime) > 1)
+                        needUpdate = (batchIdx % 5 == 0 or cntDone >= pi.all or (currentTime - lastUpdateTime) > 1)
 
                         if onUpdate and needUpdate:
                             lastUpdateTime = currentTime
@@ -478,7 +491,7 @@ def processVectors(assets: List[models.Asset], photoQ, onUpdate: models.IFnProg,
                             else:
                                 remainStr = "Calculating..."
 
-                            percent = inPct + int(cntDone / pi.all * (100 - inPct))
+                            percent = inPct + int(min(cntDone / pi.all, 1) * (100 - inPct))
                             itemsPerSec = cntDone / tElapsed if tElapsed > 0 else 0
                             speedStr = f" {itemsPerSec:.1f} items/sec" if itemsPerSec > 0 else ""
 
@@ -492,7 +505,7 @@ def processVectors(assets: List[models.Asset], photoQ, onUpdate: models.IFnProg,
                     if "Critical error during image loading" in str(e):
                         lg.error(f"Critical error encountered, stopping processing: {str(e)}")
                         with lock:
-                            pi.erro += len(assets) - cntDone
+                            pi.erro += max(pi.all - cntDone, 0)
                         break
                     else:
                         lg.error(f"Batch processing failed: {str(e)}")
@@ -508,92 +521,98 @@ def processVectors(assets: List[models.Asset], photoQ, onUpdate: models.IFnProg,
         else:
             lg.info(f"[imgs] Using CPU threading: {numWorkers} workers")
 
+            # submit per chunk so a streamed source is never fully materialized
+            stopped = False
             with ThreadPoolExecutor(max_workers=numWorkers) as executor:
-                futures = {executor.submit(saveVectorBy, asset, photoQ): asset for asset in assets}
-
-                for future in as_completed(futures):
-                    if isCancelled and isCancelled():
-                        lg.info("[imgs] Processing cancelled by user")
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        pi.erro = len(assets) - cntDone
-                        break
-
-                    asset = futures[future]
-                    try:
-                        asset, error = future.result()
-
-                        with lock:
-                            if error:
-                                lg.error(error)
-                                pi.erro += 1
-                            else:
-                                pi.done += 1
-                                updAssets.append(asset)
-
-                            cntDone += 1
-
-                            # Allow processing to continue even when errors occur
-                            # Original logic would stop on first error, preventing full batch processing
-                            # Commenting out allows all images to be processed with complete success/failure stats
-                            # if pi.erro == 1:
-                            #     lg.error(f"[imgs] Stopping processing on first error: {error}")
-                            #     executor.shutdown(wait=False, cancel_futures=True)
-                            #     pi.erro += len(assets) - cntDone
-                            #     break
-
-                            if len(updAssets) >= commitBatch:
-                                assetsBatch = updAssets[:]
-                                updAssets = []
-                                with db.pics.mkConn() as conn:
-                                    cur = conn.cursor()
-                                    for a in assetsBatch:
-                                        db.pics.setVectoredBy(a, cur=cur)
-                                    conn.commit()
-
-                            currentTime = time.time()
-                            tElapsed = currentTime - tS
-                            needUpdate = (cntDone % 10 == 0 or cntDone == pi.all or
-                                          cntDone < 10 or (currentTime - lastUpdateTime) > 1)
-
-                            if onUpdate and needUpdate:
-                                if isCancelled and isCancelled():
-                                    lg.info("[imgs] Processing cancelled during update")
-                                    break
-
-                                lastUpdateTime = currentTime
-
-                                if cntDone >= 5:
-                                    avgTimePerItem = tElapsed / cntDone
-                                    remainCnt = pi.all - cntDone
-                                    remainTimeSec = avgTimePerItem * remainCnt * 1.1
-
-                                    if remainTimeSec < 60:
-                                        remainStr = f"{int(remainTimeSec)} seconds"
-                                    elif remainTimeSec < 3600:
-                                        mins = remainTimeSec / 60
-                                        remainStr = f"{mins:.1f} minutes" if mins >= 1 else "< 1 minute"
-                                    else:
-                                        hours = int(remainTimeSec / 3600)
-                                        mins = int((remainTimeSec % 3600) / 60)
-                                        remainStr = f"{hours}h {mins}m"
+                for chunk in iterChunks(assets, max(commitBatch, numWorkers * 8)):
+                    if stopped: break
+                    futures = {executor.submit(saveVectorBy, asset, photoQ): asset for asset in chunk}
+
+                    for future in as_completed(futures):
+                        if isCancelled and isCancelled():
+                            lg.info("[imgs] Processing cancelled by user")
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            pi.erro = max(pi.all - cntDone, 0)
+                            stopped = True
+                            break
+
+                        asset = futures[future]
+                        try:
+                            asset, error = future.result()
+
+                            with lock:
+                                if error:
+                                    lg.error(error)
+                                    pi.erro += 1
                                 else:
-                                    remainStr = "Calculating..."
+                                    pi.done += 1
+                                    updAssets.append(asset)
+
+                                cntDone += 1
+
+                                # Allow processing to continue even when errors occur
+                                # Original logic would stop on first error, preventing full batch processing
+                                # Commenting out allows all images to be processed with complete success/failure stats
+                                # if pi.erro == 1:
+                                #     lg.error(f"[imgs] Stopping processing on first error: {error}")
+                                #     executor.shutdown(wait=False, cancel_futures=True)
+                                #     pi.erro += len(assets) - cntDone
+                                #     break
+
+                                if len(updAssets) >= commitBatch:
+                                    assetsBatch = updAssets[:]
+                                    updAssets = []
+                                    with db.pics.mkConn() as conn:
+                                        cur = conn.cursor()
+                                        for a in assetsBatch:
+                                            db.pics.setVectoredBy(a, cur=cur)
+                                        conn.commit()
+
+                                currentTime = time.time()
+                                tElapsed = currentTime - tS
+                                needUpdate = (cntDone % 10 == 0 or cntDone == pi.all or
+                                              cntDone < 10 or (currentTime - lastUpdateTime) > 1)
+
+                                if onUpdate and needUpdate:
+                                    if isCancelled and isCancelled():
+                                        lg.info("[imgs] Processing cancelled during update")
+                                        stopped = True
+                                        break
+
+                                    lastUpdateTime = currentTime
+
+                                    if cntDone >= 5:
+                                        avgTimePerItem = tElapsed / cntDone
+                                        remainCnt = pi.all - cntDone
+                                        remainTimeSec = avgTimePerItem * remainCnt * 1.1
+
+                                        if remainTimeSec < 60:
+                                            remainStr = f"{int(remainTimeSec)} seconds"
+                                        elif remainTimeSec < 3600:
+                                            mins = remainTimeSec / 60
+                                            remainStr = f"{mins:.1f} minutes" if mins >= 1 else "< 1 minute"
+                                        else:
+                                            hours = int(remainTimeSec / 3600)
+                                            mins = int((remainTimeSec % 3600) / 60)
+                                            remainStr = f"{hours}h {mins}m"
+                                    else:
+                                        remainStr = "Calculating..."
 
-                                percent = inPct + int(cntDone / pi.all * (100 - inPct))
-                                itemsPerSec = cntDone / tElapsed if tElapsed > 0 else 0
-                                speedStr = f" {itemsPerSec:.1f} items/sec" if itemsPerSec > 0 else ""
+                                    percent = inPct + int(min(cntDone / pi.all, 1) * (100 - inPct))
+                                    itemsPerSec = cntDone / tElapsed if tElapsed > 0 else 0
+                                    speedStr = f" {itemsPerSec:.1f} items/sec" if itemsPerSec > 0 else ""
 
-                                msg = f"CPU Threading: {cntDone}/{pi.all} ok[{pi.done}]"
-                                if pi.skip: msg += f" skip[{pi.skip}]"
-                                if pi.erro: msg += f" error[{pi.erro}]"
-                                msg += f" ( remaining: {remainStr}{speedStr} )"
-                                onUpdate(percent, msg)
+                                    msg = f"CPU Threading: {cntDone}/{pi.all} ok[{pi.done}]"
+                                    if pi.skip: msg += f" skip[{pi.skip}]"
+                                    if pi.erro: msg += f" error[{pi.erro}]"
+                                    msg += f" ( remaining: {remainStr}{speedStr} )"
+                                    onUpdate(percent, msg)
 
-                    except Exception as e:
-                        with lock:
-                            lg.error(f"Future execution failed for {asset.id}: {str(e)}")
-                            pi.erro += 1
-                            cntDone += 1
+                        except Exception as e:
+                            with lock:
+                                lg.error(f"Future execution failed for {asset.id}: {str(e)}")
+                                pi.erro += 1
+                                cntDone += 1
 
         if updAssets:
             with db.pics.mkConn() as conn:
@@ -4,7 +4,7 @@ from datetime import datetime
 import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Union
 
 from flask_socketio import SocketIO, emit
 from flask import request
@@ -25,7 +25,7 @@ class TskInfo:
     dtc: float
     status: TskStatus = TskStatus.PENDING
     prog: int = 0
-    msg: str = ""
+    msg: Union[str, List[str]] = ""
     result: Optional[IFnRst] = None
     err: Optional[str] = None
     dts: Optional[float] = None
@@ -198,7 +198,7 @@ class TskMgr:
         #------------------------------------
         dtu = 0
 
-        def fnReport(pct: int, msg: str):
+        def fnReport(pct: int, msg: Union[str, List[str]]):
             if ti.status == TskStatus.CANCELLED: return  # Stop reporting if cancelled
 
             ti.prog = pct
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Optional, Tuple
+from typing import Any, Callable, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from util import log
 from flask_socketio import SocketIO
@@ -39,8 +39,8 @@ class DashTask(BseTsk):
         #------------------------------------
         # adapter
         #------------------------------------
-        def report(pct: int, msg: str):
-            if doReport: doReport(pct, f"{msg}")
+        def report(pct: int, msg: Union[str, List[str]]):
+            if doReport: doReport(pct, msg if isinstance(msg, list) else f"{msg}")
             # lg.info(f"[Task] id[{self.tskId}] progress: {percent}% - {label} - {msg}")
 
         #------------------------------------
@@ -11,6 +11,7 @@ from .mods import Pager, Nfy, Tsk, Mdl, MdlImg, ProcessInfo
 from .shared import Sys, Cnt, Ste
 from .data import SimInfo, Usr, Asset, AssetExif, AssetExInfo
 from .data import Album, AssetFace, Tags
+from .batch import AssetRef, AssetBatch
 from .page import PgSim, Now
 
 #------------------------------------------------------------------------
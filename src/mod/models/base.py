@@ -1,7 +1,7 @@
 import inspect
 import json
 import sqlite3
-from dataclasses import dataclass, asdict, astuple
+from dataclasses import dataclass, asdict, astuple, fields, MISSING
 from datetime import datetime
 from enum import Enum
 from typing import Dict, Any, Optional, Type, Tuple, TypeVar, Union, get_type_hints, get_origin, get_args
@@ -46,7 +46,8 @@ class BaseDictModel:
     _cheTHints = {}
     _cheTChks = {}
 
-    _cheDbCols = {}
+    _cheDbDecs = {}
+    _cheDbLast = {}
     _cheTCompx = {}
 
     def __str__(self):
@@ -66,6 +67,18 @@ class BaseDictModel:
         if hasattr(obj, 'value'): return obj.value  # Handle Enum
         return str(obj)
 
+    def __getattr__(self, name):
+        # only reached when the attr is not in __dict__, i.e. a lazy db column not parsed yet
+        if name.startswith('__'): raise AttributeError(name)
+        lzy = self.__dict__.get('_lzy')
+        if not lzy or name not in lzy: raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        val = lzy.pop(name)
+        typ = self._getTypeHints()[name]
+        val = Json(val) if typ == Json and isinstance(val, str) else self._procTypedField(name, val, typ)
+        self.__dict__[name] = val
+        return val
+
     def toDict(self) -> Dict[str, Any]: return asdict(self)
     def toTuple(self) -> Tuple[Any, ...]: return astuple(self)
     def toJson(self) -> str: return json.dumps(self.toDict(), default=self.jsonSerializer, ensure_ascii=False)
@@ -278,47 +291,130 @@ class BaseDictModel:
             raise RuntimeError(f"Error converting dict to {cls.__name__}: {e}, src={src}")
 
 
+    @classmethod
+    def _mkDbDecoder(cls, cols: Tuple[str, ...]):
+        """
+        build a row decoder for one (class, column layout), fields are assigned
+        straight into __dict__; complex fields without a class default
+        (default_factory) are kept raw and parsed on first access
+        """
+        typs = cls._getTypeHints()
+        fdCompx = cls._hasCompx(typs)
+        flds = {f.name: f for f in fields(cls)}
+
+        if hasattr(cls, '__post_init__'): return None
+
+        env = {'new': object.__new__, 'cls': cls, 'proc': cls._procTypedField, 'Json': Json}
+        lines = ['def dec(row):', '    o = new(cls)', '    d = o.__dict__']
+        lzys = []
+
+        idxs = {}
+        for i, col in enumerate(cols):
+            if col in typs and col not in idxs: idxs[col] = i
+
+        for name, f in flds.items():
+            typ = typs.get(name)
+            env[f'h_{name}'] = typ
+
+            i = idxs.get(name)
+            if i is None:
+                if f.default is not MISSING:
+                    env[f'df_{name}'] = f.default
+                    lines.append(f'    d[{name!r}] = df_{name}')
+                elif f.default_factory is not MISSING:
+                    env[f'fc_{name}'] = f.default_factory
+                    lines.append(f'    d[{name!r}] = fc_{name}()')
+                else:
+                    return None
+                continue
+
+            isLazy = f.default is MISSING and f.default_factory is not MISSING
+
+            if typ == Json:
+                if isLazy: lzys.append((name, i))
+                else: lines.append(f'    v = row[{i}]; d[{name!r}] = Json(v) if isinstance(v, str) else v')
+            elif name in fdCompx:
+                args = [t for t in get_args(typ) if t is not type(None)] if get_origin(typ) is Union else []
+                if len(args) == 1 and args[0] in (str, int, float, bool):
+                    # Optional[basic], only convert when sqlite hands back another type
+                    env[f't_{name}'] = args[0]
+                    lines.append(f'    v = row[{i}]; d[{name!r}] = v if v is None or v.__class__ is t_{name} else proc({name!r}, v, h_{name})')
+                elif isLazy:
+                    lzys.append((name, i))
+                else:
+                    lines.append(f'    d[{name!r}] = proc({name!r}, row[{i}], h_{name})')
+            elif cls._isSubclass(typ):
+                lines.append(f'    v = row[{i}]; d[{name!r}] = proc({name!r}, v, h_{name}) if isinstance(v, str) else v')
+            else:
+                lines.append(f'    d[{name!r}] = row[{i}]')
+
+        if lzys:
+            lines.append('    d["_lzy"] = {' + ', '.join(f'{n!r}: row[{i}]' for n, i in lzys) + '}')
+        lines.append('    return o')
+
+        exec('\n'.join(lines), env)
+        return env['dec']
+
+    @classmethod
+    def _getDbDecoder(cls, cursor: sqlite3.Cursor):
+        desc = cursor.description
+
+        # description object is the same for every row of one execute, keep a ref so it can't be reused
+        last = BaseDictModel._cheDbLast.get(cls)
+        if last and last[0] is desc: return last[1]
+
+        ck = (cls, tuple(d[0] for d in desc))
+        if ck not in BaseDictModel._cheDbDecs:
+            BaseDictModel._cheDbDecs[ck] = cls._mkDbDecoder(ck[1])
+
+        dec = BaseDictModel._cheDbDecs[ck]
+        BaseDictModel._cheDbLast[cls] = (desc, dec)
+        return dec
+
     @classmethod
     def fromDB(cls: Type[T], cursor: sqlite3.Cursor, row: tuple) -> T:
         try:
             if not row: raise ValueError(f"row is empty")
 
-            curid = id(cursor)
-            cols = cls._cheDbCols.get(curid)
-            if cols is None:
-                cols = [desc[0] for desc in cursor.description]
-                cls._cheDbCols[curid] = cols
+            dec = cls._getDbDecoder(cursor)
+            if dec: return dec(row)
 
-            data = dict(zip(cols, row))
-            typs = cls._getTypeHints()
+            return cls._fromDBSlow(cursor, row)
+        except Exception as e:
+            lg.error(f"Error converting DB row to {cls.__name__}: {e}, row={row}")
+            raise e
 
-            jfds = [fname for fname, ftype in typs.items()
-                           if ftype == Json and fname in data and isinstance(data[fname], str)]
+    @classmethod
+    def _fromDBSlow(cls: Type[T], cursor: sqlite3.Cursor, row: tuple) -> T:
+        cols = [desc[0] for desc in cursor.description]
 
-            if jfds: data = cls._procJsonFields(data, typs)
+        data = dict(zip(cols, row))
+        typs = cls._getTypeHints()
 
-            fdCompx = cls._hasCompx(typs)
+        jfds = [fname for fname, ftype in typs.items()
+                       if ftype == Json and fname in data and isinstance(data[fname], str)]
 
-            done = {}
-            for key, val in data.items():
-                if key not in typs: continue
+        if jfds: data = cls._procJsonFields(data, typs)
 
-                typ = typs[key]
-                origin = get_origin(typ)
+        fdCompx = cls._hasCompx(typs)
 
-                if (key in fdCompx
+        done = {}
+        for key, val in data.items():
+            if key not in typs: continue
+
+            typ = typs[key]
+            origin = get_origin(typ)
+
+            if (key in fdCompx
+                or
+                (
+                    isinstance(val, str) and cls._isSubclass(typ)
                     or
-                    (
-                        isinstance(val, str) and cls._isSubclass(typ)
-                        or
-                        (origin is Union and any(cls._isSubclass(t) for t in get_args(typ) if t is not type(None)))
-                    )
-                ):
-                    done[key] = cls._procTypedField(key, val, typs[key])
-                else:
-                    done[key] = val
+                    (origin is Union and any(cls._isSubclass(t) for t in get_args(typ) if t is not type(None)))
+                )
+            ):
+                done[key] = cls._procTypedField(key, val, typs[key])
+            else:
+                done[key] = val
 
-            return cls._mkWithFallback(done, data, typs)
-        except Exception as e:
-            lg.error(f"Error converting DB row to {cls.__name__}: {e}, row={row}")
-            raise e
+        return cls._mkWithFallback(done, data, typs)
@@ -0,0 +1,119 @@
+import sys
+from typing import List, Optional, Iterator, Iterable, Sequence, Set
+
+import numpy as np
+
+from conf import envs
+from util import log
+
+lg = log.get(__name__)
+
+
+class AssetRef:
+    """
+    light view of one asset inside an AssetBatch, enough for the vector/sync jobs
+    """
+    __slots__ = ('autoId', 'id', 'ownerId', 'pathThumbnail', 'pathPreview')
+
+    def __init__(self, autoId: int, id: str, ownerId: str, pathThumbnail: Optional[str], pathPreview: Optional[str]):
+        self.autoId = autoId
+        self.id = id
+        self.ownerId = ownerId
+        self.pathThumbnail = pathThumbnail
+        self.pathPreview = pathPreview
+
+    def __repr__(self): return f"AssetRef(#{self.autoId}, {self.id})"
+
+    def getImagePath(self, photoQ=None):
+        path = envs.pth.forImg(self.pathThumbnail, self.pathPreview, photoQ)
+        if not path: raise RuntimeError(f"the thumbnail path is empty, assetId[{self.id}]")
+        return path
+
+
+class AssetBatch:
+    """
+    columnar assets for bulk jobs, numpy arrays for ids/flags and interned path strings,
+    rows are only materialized as AssetRef on access
+    """
+    cols = ('autoId', 'id', 'ownerId', 'isVectored', 'isFavorite', 'isArchived', 'simOk', 'pathThumbnail', 'pathPreview')
+
+    __slots__ = ('autoIds', 'ids', 'ownerIds', 'isVectored', 'isFavorite', 'isArchived', 'simOk', 'pathThumbnail', 'pathPreview')
+
+    def __init__(self, autoIds: np.ndarray, ids: np.ndarray, ownerIds: List[str],
+                 isVectored: np.ndarray, isFavorite: np.ndarray, isArchived: np.ndarray, simOk: np.ndarray,
+                 pathThumbnail: List[Optional[str]], pathPreview: List[Optional[str]]):
+        self.autoIds = autoIds
+        self.ids = ids
+        self.ownerIds = ownerIds
+        self.isVectored = isVectored
+        self.isFavorite = isFavorite
+        self.isArchived = isArchived
+        self.simOk = simOk
+        self.pathThumbnail = pathThumbnail
+        self.pathPreview = pathPreview
+
+    @classmethod
+    def empty(cls) -> 'AssetBatch':
+        return cls.fromRows([])
+
+    @classmethod
+    def fromRows(cls, rows: Iterable[Sequence]) -> 'AssetBatch':
+        """
+        rows must follow AssetBatch.cols order
+        """
+        aids, ids, owns, vecs, favs, arcs, oks, ths, pvs = [], [], [], [], [], [], [], [], []
+        intern = sys.intern
+
+        for r in rows:
+            aids.append(r[0])
+            ids.append(r[1].encode('ascii') if r[1] else b'')
+            owns.append(intern(r[2]) if r[2] else '')
+            vecs.append(r[3] or 0)
+            favs.append(r[4] or 0)
+            arcs.append(r[5] or 0)
+            oks.append(r[6] or 0)
+            ths.append(intern(r[7]) if r[7] else None)
+            pvs.append(intern(r[8]) if r[8] else None)
+
+        return cls(
+            np.array(aids, dtype=np.int64),
+            np.array(ids, dtype=f"S{max((len(i) for i in ids), default=1)}"),
+            owns,
+            np.array(vecs, dtype=np.uint8),
+            np.array(favs, dtype=np.uint8),
+            np.array(arcs, dtype=np.uint8),
+            np.array(oks, dtype=np.uint8),
+            ths,
+            pvs,
+        )
+
+    def __len__(self): return len(self.autoIds)
+
+    def __bool__(self): return len(self.autoIds) > 0
+
+    def __iter__(self) -> Iterator[AssetRef]:
+        for i in range(len(self.autoIds)): yield self.ref(i)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return AssetBatch(
+                self.autoIds[idx], self.ids[idx], self.ownerIds[idx],
+                self.isVectored[idx], self.isFavorite[idx], self.isArchived[idx], self.simOk[idx],
+                self.pathThumbnail[idx], self.pathPreview[idx],
+            )
+        return self.ref(idx)
+
+    def ref(self, i: int) -> AssetRef:
+        return AssetRef(int(self.autoIds[i]), self.ids[i].decode('ascii'), self.ownerIds[i], self.pathThumbnail[i], self.pathPreview[i])
+
+    def idSet(self) -> Set[str]:
+        return {i.decode('ascii') for i in self.ids.tolist()}
+
+    def autoIdsBy(self, ids: Iterable[str]) -> List[int]:
+        keys = np.array([i.encode('ascii') for i in ids], dtype=self.ids.dtype)
+        if not len(keys): return []
+        return self.autoIds[np.isin(self.ids, keys)].tolist()
+
+    def nbytes(self) -> int:
+        arrs = self.autoIds.nbytes + self.ids.nbytes + self.isVectored.nbytes + self.isFavorite.nbytes + self.isArchived.nbytes + self.simOk.nbytes
+        return arrs + 8 * (len(self.ownerIds) + len(self.pathThumbnail) + len(self.pathPreview))
@@ -9,7 +9,7 @@ from .base import BaseDictModel
 #------------------------------------------------------------------------
 # types
 #------------------------------------------------------------------------
-IFnProg = Callable[[int, str], None]
+IFnProg = Callable[[int, Union[str, List[str]]], None]
 IFnCancel = Callable[[], bool]
 
 
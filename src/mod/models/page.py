@@ -1,14 +1,57 @@
 
+import copy
 import os
 import uuid
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict, is_dataclass
 from typing import Dict, List, Any, Optional, Callable, Tuple, Union
 
+from util import log
+from util.cache import TtlLru
 from .base import BaseDictModel
 from .mods import Pager
 from .data import Asset
 
+lg = log.get(__name__)
+
+# full asset lists stay in process, the session store only carries stoKey and
+# the few fields the client side js reads (mdlImg / ste), one entry per tab
+# entries are copied in and out, callbacks never share Asset objects
+assSto = TtlLru('assSto', maxSize=256, ttl=60 * 60 * 12)
+SlimKeys = ('autoId', 'id', 'originalFileName', 'originalPath', 'vdoId', 'simGIDs', 'jsonExif', 'vw')
+
+
+def toSlim(ass: Asset) -> Dict[str, Any]:
+    dic = {}
+    for k in SlimKeys:
+        v = getattr(ass, k)
+        dic[k] = asdict(v) if is_dataclass(v) and not isinstance(v, type) else v
+    return dic
+
+
+def rehydrate(slims: List[Asset]) -> List[Asset]:
+    """
+    the server copy was evicted (or belongs to another tab), reload by autoId and keep the view state
+    """
+    import db
+
+    try:
+        rst = db.pics.getAllByAutoIds([s.autoId for s in slims])
+    except Exception as e:
+        lg.warn(f"[assSto] rehydrate failed: {e}")
+        return []
+
+    vws = {s.autoId: s.vw for s in slims}
+    for ass in rst: ass.vw = vws[ass.autoId]
+
+    try:
+        db.psql.exInfoFill(rst)
+    except Exception as e:
+        lg.warn(f"[assSto] exInfo fill failed: {e}")
+
+    lg.info(f"[assSto] rehydrated assets[{len(rst)}/{len(slims)}] from db")
+    return rst
+
 
 
 
@@ -30,6 +73,19 @@ class PgSim(BaseDictModel):
     fspW: bool = False
     fspH: bool = False
 
+    stoKey: str = ""
+
+    def restoreAss(self):
+        ent = assSto.get(self.stoKey) if self.stoKey else None
+        if ent:
+            cur, pend = ent
+            if [a.autoId for a in cur] == [a.autoId for a in self.assCur] and [a.autoId for a in pend] == [a.autoId for a in self.assPend]:
+                self.assCur, self.assPend = copy.deepcopy(cur), copy.deepcopy(pend)
+                return
+
+        if self.assCur: self.assCur = rehydrate(self.assCur)
+        if self.assPend: self.assPend = rehydrate(self.assPend)
+
     def clearNow(self):
         self.assAid = 0
         self.assFromUrl = None
@@ -44,3 +100,27 @@ class PgSim(BaseDictModel):
 @dataclass
 class Now(BaseDictModel):
     sim: PgSim = field(default_factory=PgSim)
+
+    def toDict(self) -> Dict[str, Any]:
+        sim = self.sim
+        cur, pend = sim.assCur, sim.assPend
+        if not cur and not pend: return asdict(self)
+
+        if not sim.stoKey: sim.stoKey = uuid.uuid4().hex
+        assSto.set(sim.stoKey, (copy.deepcopy(cur), copy.deepcopy(pend)))
+
+        sim.assCur, sim.assPend = [], []
+        try:
+            dic = asdict(self)
+        finally:
+            sim.assCur, sim.assPend = cur, pend
+
+        dic['sim']['assCur'] = [toSlim(a) for a in cur]
+        dic['sim']['assPend'] = [toSlim(a) for a in pend]
+        return dic
+
+    @classmethod
+    def fromDic(cls, src: Dict[str, Any]) -> 'Now':
+        obj = super().fromDic(src)
+        obj.sim.restoreAss()
+        return obj
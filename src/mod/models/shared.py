@@ -33,11 +33,12 @@ class Cnt(BaseDictModel):
 
     def refreshFromDB(self):
         import db
-        self.ass = db.pics.count()
-        self.vec = db.vecs.count()
-        self.simOk = db.pics.countSimOk(1)
-        self.simNo = db.pics.countSimOk(0)
-        self.simPnd = db.pics.countSimPending();
+        cnts = db.pics.getCnts()
+        self.ass = cnts.get('ass', 0)
+        self.vec = db.vecs.countFast()
+        self.simOk = cnts.get('simOk', 0)
+        self.simNo = cnts.get('simNo', 0)
+        self.simPnd = cnts.get('simPnd', 0)
 
     @classmethod
     def mkNewCnt(cls) -> 'Cnt':
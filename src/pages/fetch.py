@@ -15,8 +15,10 @@ dash.register_page(
 class k:
     selectUsr = "fetch-usr-select"
     btnFetch = "fetch-btn-assets"
+    btnFetchAll = "fetch-btn-assets-all"
     btnClean = "fetch-btn-clear"
     btnReset = "fetch-btn-reset"
+    cbxFull = "fetch-cbx-full"
 
     initFetch = "fetch-init"
 
@@ -41,7 +43,10 @@ def layout():
                     dbc.Col([
                         dbc.Label("Select User"),
                         dbc.Select( id=k.selectUsr, options=[], placeholder="Select user."),
-                    ], width=12),
+                    ], width=9),
+                    dbc.Col([
+                        dbc.Checkbox(id=k.cbxFull, label="Full resync", value=False, className="mt-4"),
+                    ], width=3),
                 ],
                     className="mb-2"
                 ),
@@ -49,6 +54,10 @@ def layout():
                     htm.Li("Assets that already exist locally will be skipped"),
                     htm.Li("Assets without generated thumbnails in Immich will also be skipped"),
                     htm.Li("Updates may sync: paths, EXIF data, favorite/archive status. Re-fetch if these change in remote"),
+                    htm.Li([
+                        htm.Strong("Incremental: "),
+                        "After the first fetch only assets changed since the last run are pulled. Use 'Full resync' to re-read the whole library"
+                    ]),
                     htm.Li([
                         htm.Strong("Sync deletion: "),
                         "Local assets that are no longer in 'active' status in Immich (e.g., moved to trash) will be automatically removed along with their vectors"
@@ -68,6 +77,15 @@ def layout():
                     className="w-100",
                     disabled=True,
                 ),
+                dbc.Button(
+                    "Fetch: All Users",
+                    id=k.btnFetchAll,
+                    color="primary",
+                    size="sm",
+                    outline=True,
+                    className="w-100 mt-2",
+                    disabled=True,
+                ),
 
             ], width=5),
 
@@ -142,6 +160,7 @@ def fth_Init(dta_pi):
     [
         out(k.btnFetch, "children"),
         out(k.btnFetch, "disabled"),
+        out(k.btnFetchAll, "disabled"),
         out(k.btnClean, "children"),
         out(k.btnClean, "disabled"),
         out(ks.sto.nfy, "data", allow_duplicate=True)
@@ -202,7 +221,8 @@ def fth_Status(usrId, dta_cnt, dta_tsk, dta_nfy):
             if cntLocal <= 0:
                 disBtnClr = True
 
-            disBtnRun = cntRemote <= cntLocal or cntRemote == 0
+            # incremental fetch is cheap, keep it available to pick up remote edits
+            disBtnRun = cntRemote == 0
 
             if usr:
                 txtBtn = f"Fetch: {usr.name} ({cntRemote})"
@@ -213,7 +233,7 @@ def fth_Status(usrId, dta_cnt, dta_tsk, dta_nfy):
 
     lg.info(f"[fth:status] cnt: {cnt}")
 
-    return txtBtn, disBtnRun, txtClr, disBtnClr, nfy.toDict()
+    return txtBtn, disBtnRun, isTasking, txtClr, disBtnClr, nfy.toDict()
 
 #------------------------------------------------------------------------
 #------------------------------------------------------------------------
@@ -224,11 +244,13 @@ def fth_Status(usrId, dta_cnt, dta_tsk, dta_nfy):
     ],
     [
         inp(k.btnFetch, "n_clicks"),
+        inp(k.btnFetchAll, "n_clicks"),
         inp(k.btnClean, "n_clicks"),
         inp(k.btnReset, "n_clicks"),
     ],
     [
         ste(k.selectUsr, "value"),
+        ste(k.cbxFull, "value"),
         ste(ks.sto.now, "data"),
         ste(ks.sto.mdl, "data"),
         ste(ks.sto.tsk, "data"),
@@ -236,8 +258,8 @@ def fth_Status(usrId, dta_cnt, dta_tsk, dta_nfy):
     ],
     prevent_initial_call=True
 )
-def fth_RunModal(clk_feh, clk_clr, clk_rst, usrId, dta_now, dta_mdl, dta_tsk, dta_nfy):
-    if not clk_feh and not clk_clr and not clk_rst: return noUpd.by(2)
+def fth_RunModal(clk_feh, clk_all, clk_clr, clk_rst, usrId, isFull, dta_now, dta_mdl, dta_tsk, dta_nfy):
+    if not clk_feh and not clk_all and not clk_clr and not clk_rst: return noUpd.by(2)
 
     now = models.Now.fromDic(dta_now)
     mdl = models.Mdl.fromDic(dta_mdl)
@@ -279,9 +301,26 @@ def fth_RunModal(clk_feh, clk_clr, clk_rst, usrId, dta_now, dta_mdl, dta_tsk, dt
             if not usr:
                 nfy.warn( f"No User Id[{ db.dto.usrId }]" )
             else:
+                isFull = isFull or not db.dto.getFetchMark(usr.id)
+
                 mdl.id = ks.pg.fetch
                 mdl.cmd = ks.cmd.fetch.asset
-                mdl.msg = f"Start getting assets[ {cnt} ] for user[ {usr.name} ] ?"
+                mdl.args = {'full': bool(isFull)}
+                if isFull:
+                    mdl.msg = f"Start getting assets[ {cnt} ] for user[ {usr.name} ] ?"
+                else:
+                    mdl.msg = f"Start syncing changes since last fetch for user[ {usr.name} ] ?"
+
+    elif trgSrc == k.btnFetchAll:
+        usrs = db.psql.fetchUsers()
+        if not usrs:
+            nfy.warn("No users found")
+            mdl.reset()
+        else:
+            mdl.id = ks.pg.fetch
+            mdl.cmd = ks.cmd.fetch.assetAll
+            mdl.args = {'full': bool(isFull)}
+            mdl.msg = f"Start {'full resync' if isFull else 'fetching'} assets for all users[ {len(usrs)} ] ?"
 
     return mdl.toDict(), nfy.toDict()
 
@@ -293,16 +332,155 @@ def fth_RunModal(clk_feh, clk_clr, clk_rst, usrId, dta_now, dta_mdl, dta_tsk, dt
 #========================================================================
 # task acts
 #========================================================================
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from conf import envs
 from mod import mapFns
 from mod.models import IFnProg
 
 #------------------------------------------------------------------------
-def onFetchAssets(doReport: IFnProg, sto: models.ITaskStore):
-    nfy, now, cnt = sto.nfy, sto.now, sto.cnt
+class UsrFetch:
+    """
+    one user's fetch state, filled by its extractor thread and read by the task
+    """
+    def __init__(self, usr: models.Usr, full: bool):
+        self.usr = usr
+
+        # incremental when a watermark exists and local data is there, full resync otherwise
+        self.since = None if full else db.dto.getFetchMark(usr.id)
+        if self.since and db.pics.count(usr.id) <= 0: self.since = None
+
+        # taken before streaming, changes made during the fetch are picked up again next run
+        self.mark = db.psql.fetchMark(usr.id)
+
+        # first import of a user goes through binary COPY + bulk upsert
+        self.isBulk = not self.since and db.dto.fetchBulk and db.pics.count(usr.id) <= 0
+        self.mode = "incremental" if self.since else "bulk" if self.isBulk else "full"
+
+        self.cntAll = db.psql.count(usr.id, since=self.since)
+        self.cntFetch = 0
+        self.cntDeleted = 0
+        self.remoteIds = set()
+        self.err: Optional[str] = None
+        self.done = False
+
+    @property
+    def skip(self): return self.cntAll <= 0 and not self.since
+
+    def line(self, cnts: Optional[dict] = None) -> str:
+        nam = self.usr.name
+        if self.err: return f"{nam}: {self.err}"
+        if self.skip: return f"{nam}: no assets found"
+        if not cnts: return f"{nam}: {self.mode} {self.cntFetch}/{self.cntAll}{' done' if self.done else ''}"
+        return f"{nam}: {self.mode} fetched[ {self.cntFetch}/{self.cntAll} ] new[ {cnts['new']} ] updated[ {cnts['upd']} ] unchanged[ {cnts['skip']} ] removed[ {self.cntDeleted} ]"
+
+
+def fetchUsrs(doReport: IFnProg, sto: models.ITaskStore, usrs: List[models.Usr], full: bool) -> Tuple[List[str], bool]:
+    """
+    extract users concurrently (capped by dto.fetchWorkers) into one shared sqlite writer,
+    then sync deletions and move each user's watermark forward, returns (lines, allOk)
+    """
+    doReport(5, f"Preparing fetch for {len(usrs)} user(s)")
+
+    sts = [UsrFetch(u, full) for u in usrs]
+    runs = [st for st in sts if not st.skip]
+    cntAll = max(sum(st.cntAll for st in runs), 1)
+
+    lock = threading.Lock()
+
+    def report():
+        with lock:
+            cntFetch = sum(st.cntFetch for st in runs)
+            prog = 15 + int(min(cntFetch / cntAll, 1) * 75)
+            doReport(prog, [f"Saving photo {cntFetch}/{cntAll}"] + [st.line() for st in sts])
+
+    writer = db.pics.Writer()
+
+    def extract(st: UsrFetch):
+        try:
+            if st.isBulk: chunks = db.psql.iterAssetsBulk(st.usr, onUpdate=lambda p, m: None)
+            else: chunks = db.psql.iterAssets(st.usr, onUpdate=lambda p, m: None, since=st.since)
+
+            for chunk in chunks:
+                if sto.isCancelled():
+                    st.err = "cancelled"
+                    break
+
+                st.remoteIds.update(str(a['id']) for a in chunk)
+                writer.put(st.usr.id, chunk, st.isBulk)
+                st.cntFetch += len(chunk)
+                report()
+
+            if not st.err and not st.cntFetch and not st.since: st.err = "no assets retrieved"
+        except Exception as e:
+            st.err = f"error fetching assets, {str(e)}"
+        finally:
+            st.done = True
+            report()
+
+    tStart = time.time()
+    szWorker = max(1, min(db.dto.fetchWorkers, len(runs), envs.psqlPoolMax - 1))
+    with ThreadPoolExecutor(max_workers=szWorker, thread_name_prefix='mkit-fetch') as ex:
+        list(ex.map(extract, runs))
 
     try:
-        # todo: add support for all users?
+        writer.close()
+    except Exception as e:
+        # the writer never opened its connection, nothing was saved for anyone
+        for r in runs:
+            if not r.err: r.err = f"failed saving assets, {str(e)}"
+
+    # a failed chunk only fails its own user, the others keep what was committed
+    for r in runs:
+        e = writer.errs.get(r.usr.id)
+        if e and not r.err: r.err = f"failed saving assets, {str(e)}"
+
+    lg.info(f"[fetch] extracted users[{len(runs)}] workers[{szWorker}] in {time.time() - tStart:.1f}s")
+
+    # Sync deletion: Remove local assets that no longer exist in remote (status != 'active')
+    doReport(90, f"Syncing with remote: checking for deleted assets")
+
+    for r in runs:
+        if r.err: continue
+
+        try:
+            if r.since:
+                # only ids trashed/deleted after the watermark
+                toDeleteIds = db.psql.fetchGoneIds(r.usr.id, r.since)
+            else:
+                # Find assets that exist locally but not in remote active assets
+                localAssets = db.pics.getBatchByUsrId(r.usr.id)
+                toDeleteIds = list(localAssets.idSet() - r.remoteIds) if localAssets else []
+
+            for i in range(0, len(toDeleteIds), 500):
+                assets = [a for a in db.pics.getAllByIds(toDeleteIds[i:i + 500]) if a.ownerId == r.usr.id]
+                if not assets: continue
+
+                # removes the vectors and fixes the similar groups as well
+                db.pics.deleteBy(assets)
+                r.cntDeleted += len(assets)
+
+            # only move the watermark forward after everything above succeeded
+            db.dto.setFetchMark(r.usr.id, r.mark)
+        except Exception as e:
+            r.err = f"failed syncing deletions, {str(e)}"
+
+    sto.cnt.refreshFromDB()
+
+    lines = [st.line(writer.cnts.get(st.usr.id, {'new': 0, 'upd': 0, 'skip': 0})) for st in sts]
+    doReport(100, lines)
+
+    return lines, all(not st.err for st in sts)
+
+
+#------------------------------------------------------------------------
+def onFetchAssets(doReport: IFnProg, sto: models.ITaskStore):
+    nfy, now, cnt, tsk = sto.nfy, sto.now, sto.cnt, sto.tsk
 
+    try:
         if not db.dto.usrId:
             raise RuntimeError( f"No UserId" )
 
@@ -320,103 +498,48 @@ def onFetchAssets(doReport: IFnProg, sto: models.ITaskStore):
             nfy.error(msg)
             return sto, msg
 
-        doReport(5, f"Starting to fetch assets for {usr.name} from PostgreSQL")
+        lines, ok = fetchUsrs(doReport, sto, [usr], bool(tsk.args.get('full')))
 
-        cntAll = db.psql.count(usr.id)
-        if cntAll <= 0:
-            msg = f"No assets found for {usr.name}"
-            nfy.info(msg)
-            return sto, msg
+        msg = lines[0]
+        if ok: nfy.info(msg)
+        else: nfy.error(msg)
 
-        doReport(10, f"Found {cntAll} photos, starting to fetch assets")
+        return sto, msg
 
-        try:
-            assets = db.psql.fetchAssets(usr, onUpdate=doReport)
+    except Exception as e:
+        msg = f"Failed fetching assets: {str(e)}"
+        nfy.error(msg)
 
+        raise RuntimeError(msg)
+
+#------------------------------------------------------------------------
+def onFetchAllAssets(doReport: IFnProg, sto: models.ITaskStore):
+    nfy, now, cnt, tsk = sto.nfy, sto.now, sto.cnt, sto.tsk
+
+    try:
+        try:
+            db.psql.chk()
         except Exception as e:
-            msg = f"Error fetching assets for {usr.name}, {str(e)}"
+            msg = f"Error: Cannot connect to PostgreSQL database: {str(e)}"
             nfy.error(msg)
             return sto, msg
 
-        if not assets or len(assets) == 0:
-            msg = f"No assets retrieved for {usr.name}"
+        usrs = db.psql.fetchUsers()
+        if not usrs:
+            msg = "Error: No users found"
             nfy.error(msg)
             return sto, msg
 
-        doReport(50, f"Retrieved {len(assets)} photos, starting to save to local database")
-
-        cntFetch = len(assets)
-        cntNew = 0
-        cntUpd = 0
-        cntSkip = 0
-
-        # updateIds = []
-        # def onUpdAss( ass:models.Asset ):
-        #     nonlocal updateIds
-        #     updateIds.append( ass.id )
-
-        with db.pics.mkConn() as conn:
-            c = conn.cursor()
-            for idx, asset in enumerate(assets):
-                if idx % 10 == 0:
-                    prog = 50 + int((idx / len(assets)) * 40)
-                    doReport(prog, f"Saving photo {idx}/{len(assets)}")
-
-                rst = db.pics.saveBy(asset, c)
-                if rst == 1: cntNew += 1
-                elif rst == 2: cntUpd += 1
-                else: cntSkip += 1
-
-            conn.commit()
-
-        # Sync deletion: Remove local assets that no longer exist in remote (status != 'active')
-        doReport(90, f"Syncing with remote: checking for deleted assets")
-
-        # Get all local asset IDs for this user
-        localAssets = db.pics.getAllByUsrId(usr.id)
-        if localAssets and len(localAssets) > 0:
-            localIds = {str(asset.id) for asset in localAssets}
-            remoteIds = {str(asset['id']) for asset in assets}
-
-            # Find assets that exist locally but not in remote active assets
-            toDeleteIds = list(localIds - remoteIds)
-
-            if toDeleteIds:
-                doReport(92, f"Found {len(toDeleteIds)} assets to remove (no longer active in Immich)")
-
-                # Delete from local database
-                with db.pics.mkConn() as conn:
-                    c = conn.cursor()
-                    for assetId in toDeleteIds:
-                        c.execute("DELETE FROM assets WHERE id = ?", (assetId,))
-                    conn.commit()
-
-                # Delete vectors
-                try:
-                    db.vecs.deleteBy(toDeleteIds)
-                    doReport(95, f"Removed {len(toDeleteIds)} assets and their vectors")
-                except Exception as e:
-                    lg.error(f"Failed to delete vectors for removed assets: {str(e)}")
-
-                cntDeleted = len(toDeleteIds)
-            else:
-                cntDeleted = 0
-                doReport(95, "No assets need to be removed")
-        else:
-            cntDeleted = 0
-
-        cnt.ass = db.pics.count()
+        lines, ok = fetchUsrs(doReport, sto, usrs, bool(tsk.args.get('full')))
 
-        doReport(100, f"Completed: {cntNew} new, {cntUpd} updated, {cntSkip} unchanged, {cntDeleted} removed")
+        msg = f"{'success' if ok else 'finished with errors'}, users[ {len(usrs)} ]"
+        if ok: nfy.info(msg)
+        else: nfy.error(msg)
 
-        cntSkipped = cntAll - cntFetch
-        msg = f"success, user[ {usr.name} ] total[ {cntAll} ] fetched[ {cntFetch} ] skipped[ {cntSkipped} ] - new[ {cntNew} ] updated[ {cntUpd} ] unchanged[ {cntSkip} ] removed[ {cntDeleted} ]"
-        nfy.info(msg)
-
-        return sto, msg
+        return sto, [msg] + lines
 
     except Exception as e:
-        msg = f"Failed fetching assets: {str(e)}"
+        msg = f"Failed fetching assets of all users: {str(e)}"
         nfy.error(msg)
 
         raise RuntimeError(msg)
@@ -455,6 +578,7 @@ def onFetchClear(doReport: IFnProg, sto: models.ITaskStore):
         assIds = [a.autoId for a in assets]
         #------------------------------------
         db.pics.clearBy(db.dto.usrId)
+        db.dto.setFetchMark(db.dto.usrId, None)
 
         db.vecs.deleteBy(assIds)
 
@@ -490,5 +614,6 @@ def onFetchReset(doReport: IFnProg, sto: models.ITaskStore):
 # Set up global functions
 #========================================================================
 mapFns[ks.cmd.fetch.asset] = onFetchAssets
+mapFns[ks.cmd.fetch.assetAll] = onFetchAllAssets
 mapFns[ks.cmd.fetch.clear] = onFetchClear
 mapFns[ks.cmd.fetch.reset] = onFetchReset
@@ -295,7 +295,7 @@ def sim_onPagerChanged(dta_pgr, dta_now):
 
     lg.info(f"[sim:pager] paged: {pgr.idx}/{(pgr.cnt + pgr.size - 1) // pgr.size}, got {len(paged)} items")
 
-    gvPnd = gv.mkPndGrd(now.sim.assPend, onEmpty=[
+    gvPnd = gv.mkPndGrd(now.sim.assPend, batch=db.dto.gvBatch, onEmpty=[
         dbc.Alert("No pending items on this page", color="secondary", className="text-center"),
     ])
 
@@ -378,11 +378,11 @@ def sim_Load(dta_now, dta_cnt):
 
     # Check multi mode from dto settings
     if db.dto.muod:
-        gvSim = gv.mkGrdGrps(now.sim.assCur, onEmpty=[
+        gvSim = gv.mkGrdGrps(now.sim.assCur, batch=db.dto.gvBatch, onEmpty=[
             dbc.Alert("No grouped results found..", color="secondary", className="text-center m-5"),
         ])
     else:
-        gvSim = gv.mkGrd(now.sim.assCur, onEmpty=[
+        gvSim = gv.mkGrd(now.sim.assCur, batch=db.dto.gvBatch, onEmpty=[
             dbc.Alert("Please find the similar images..", color="secondary", className="text-center m-5"),
         ])
 
@@ -425,7 +425,7 @@ def sim_Load(dta_now, dta_cnt):
 
     # Only rebuild gvPnd if pending data changed
     if needReload:
-        gvPnd = gv.mkPndGrd(now.sim.assPend, onEmpty=[
+        gvPnd = gv.mkPndGrd(now.sim.assPend, batch=db.dto.gvBatch, onEmpty=[
             dbc.Alert("Please find the similar images..", color="secondary", className="text-center m-5"),
         ])
     else:
@@ -835,11 +835,16 @@ from mod.models import IFnProg
 
 
 def queueAutoNext(sto: models.ITaskStore):
+    from db import sim
+
     tsk = sto.tsk
 
-    ass = db.pics.getAnyNonSim()
-    if ass:
-        lg.info(f"[sim] auto found non-simOk assetId[{ass.id}]")
+    # a group found ahead of time is shown without searching
+    gid = sim.ahead.take()
+    ass = None if gid else db.pics.getAnyNonSim(sim.ahead.busyAids())
+    if gid or ass:
+        if gid: lg.info(f"[sim] auto next from prefetched group #{gid}")
+        elif ass: lg.info(f"[sim] auto found non-simOk assetId[{ass.id}]")
 
         mdl = models.Mdl()
         mdl.id = ks.pg.similar
@@ -847,7 +852,8 @@ def queueAutoNext(sto: models.ITaskStore):
         mdl.args = {'thMin': db.dto.thMin}
 
         ntsk = mdl.mkTsk()
-        ntsk.args['assetId'] = ass.id
+        if gid: ntsk.args['groupAid'] = gid
+        elif ass: ntsk.args['assetId'] = ass.id
 
         sto.tsk.nexts.append(ntsk)
 
@@ -877,17 +883,24 @@ def sim_FindSimilar(doReport: IFnProg, sto: models.ITaskStore):
         lg.info(f"[sim:fs] now.sim.assAid[{now.sim.assAid}]")
         doReport(1, f"prepare..")
 
-        # Find asset candidate
-        try:
-            asset = sim.findCandidate(now.sim.assAid, tsk.args)
-        except RuntimeError as e:
-            if "already searched" in str(e):
-                now.sim.assCur = []
-                return sto, [str(e)]
-            raise e
-
-        # search
-        grps = sim.searchBy(asset, doReport, sto.isCancelled, isFromUrl)
+        gid = tsk.args.get('groupAid')
+        if gid:
+            grps = sim.ahead.toGroups(gid)
+            asset = grps[0].asset if grps else db.pics.getByAutoId(gid)
+            if not asset: raise RuntimeError(f"[sim:fs] not found prefetched group #{gid}")
+        else:
+            # Find asset candidate
+            try:
+                asset = sim.findCandidate(now.sim.assAid, tsk.args)
+            except RuntimeError as e:
+                if "already searched" in str(e):
+                    now.sim.assCur = []
+                    return sto, [str(e)]
+                raise e
+
+            # search next to a running prefetch, each keeps off the other's groups
+            exclAids, claims = sim.ahead.hold(asset.autoId)
+            grps = sim.searchBy(asset, doReport, sto.isCancelled, isFromUrl, exclAids, claims)
 
         if not grps:
             nfy.info(f"No similar Threshold[{thMin}] groups found for asset #{asset.autoId}")
@@ -904,6 +917,12 @@ def sim_FindSimilar(doReport: IFnProg, sto: models.ITaskStore):
         for g in grps: assets.extend(g.assets)
 
         doReport(95, f"Finalizing {len(grps)} group(s) with {len(assets)} total assets")
+
+        import rend
+        rend.warm([a.autoId for a in assets])
+        rend.warmPending()
+
+        sim.ahead.kick([a.autoId for a in assets])
         time.sleep(0.5)
 
         # Update state
@@ -983,6 +1002,8 @@ def sim_ClearSims(doReport: IFnProg, sto: models.ITaskStore):
 
         doReport(30, "Clearing similarity records from database...")
 
+        from db import sim
+        sim.ahead.reset()
         db.pics.clearAllSimIds(keepSimOk=keepSimOk)
 
         doReport(90, "Updating dynamic data...")
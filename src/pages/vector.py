@@ -249,10 +249,10 @@ def vec_ToVec(doReport: IFnProg, sto: models.ITaskStore):
             nfy.info(msg)
             return sto, msg
 
-        assets = db.pics.getAllNonVector()
-        doReport(5, f"Getting asset data count[{len(assets)}]")
+        cntAll = db.pics.countNonVector()
+        doReport(5, f"Getting asset data count[{cntAll}]")
 
-        if not assets or len(assets) == 0:
+        if cntAll <= 0:
             msg = "No assets to process"
             nfy.error(msg)
             return sto, msg
@@ -263,11 +263,10 @@ def vec_ToVec(doReport: IFnProg, sto: models.ITaskStore):
             nfy.info(msg)
             return sto, msg
 
-        cntAll = len(assets)
         doReport(8, f"Found [ {cntAll} ] starting processing")
 
-        # Pass the cancel checker to processVectors
-        rst = imgs.processVectors(assets, photoQ, onUpdate=doReport, isCancelled=sto.isCancelled)
+        # Pass the cancel checker to processVectors, assets are streamed in keyset chunks
+        rst = imgs.processVectors(db.pics.iterNonVector(), photoQ, onUpdate=doReport, isCancelled=sto.isCancelled, total=cntAll)
 
         # Check for cancellation after processing
         if sto.isCancelled():
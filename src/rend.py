@@ -0,0 +1,221 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from PIL import Image, ImageFile
+
+import db
+from conf import envs, pathCache
+from util import log
+
+ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+lg = log.get(__name__)
+
+# the rendition cache is walked for pruning at most this often
+PruneEvery = 60 * 60
+
+# long edge buckets, requests are rounded up so the disk cache stays small
+Buckets = (160, 240, 360, 480, 720, 960, 1440)
+GridW = 240
+
+# fmt -> (pillow format, mime, ext, quality)
+Fmts = {
+    'webp': ('WEBP', 'image/webp', 'webp', 80),
+    'avif': ('AVIF', 'image/avif', 'avif', 60),
+}
+
+dirRend = os.path.abspath(os.path.join(pathCache, 'rend'))
+
+try:
+    from pillow_heif import register_avif_opener
+    register_avif_opener()
+except Exception:
+    pass
+
+hasAvif = 'AVIF' in Image.SAVE
+
+
+def bucketOf(w) -> int:
+    try:
+        w = int(w)
+    except (TypeError, ValueError):
+        return GridW
+    return next((b for b in Buckets if b >= w), Buckets[-1])
+
+
+def fmtOf(fmt: Optional[str]) -> str:
+    if fmt == 'avif' and hasAvif: return 'avif'
+    return 'webp'
+
+
+def srcOf(autoId: int, w: int) -> Optional[str]:
+    """
+    small buckets come from the immich thumbnail, larger ones from the preview
+    """
+    thumb = db.pics.paths.get(autoId, 'pathThumbnail')
+    prev = db.pics.paths.get(autoId, 'pathPreview')
+    path = (thumb or prev) if w <= 256 else (prev or thumb)
+    return envs.pth.full(path) if path else None
+
+
+def mkKey(srcFull: str, st: os.stat_result, w: int, fmt: str) -> str:
+    # source path + size + mtime address the content, a rewritten thumbnail gets a new key
+    raw = f"{srcFull}\0{st.st_size}\0{st.st_mtime_ns}\0{w}\0{fmt}\0{Fmts[fmt][3]}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def pathOf(key: str, fmt: str) -> str:
+    return os.path.join(dirRend, key[:2], f"{key}.{Fmts[fmt][2]}")
+
+
+def render(srcFull: str, dst: str, w: int, fmt: str):
+    pilFmt, _, _, quality = Fmts[fmt]
+
+    with Image.open(srcFull) as img:
+        img.draft('RGB', (w, w))  # jpeg decodes at a reduced scale directly
+        if img.mode not in ('RGB', 'RGBA'): img = img.convert('RGB')
+        img.thumbnail((w, w), Image.Resampling.LANCZOS)
+
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = f"{dst}.{threading.get_ident()}.tmp"
+        img.save(tmp, pilFmt, quality=quality)
+        os.replace(tmp, dst)
+
+
+def getBy(autoId: int, w, fmt: Optional[str] = None) -> Optional[Tuple[str, str, str]]:
+    """
+    returns (path, mime, key) of the rendition, rendered on first request
+    """
+    w = bucketOf(w)
+    fmt = fmtOf(fmt)
+
+    srcFull = srcOf(autoId, w)
+    if not srcFull or not os.path.exists(srcFull): return None
+
+    st = os.stat(srcFull)
+    key = mkKey(srcFull, st, w, fmt)
+    dst = pathOf(key, fmt)
+
+    if not os.path.exists(dst):
+        try:
+            render(srcFull, dst, w, fmt)
+        except Exception as e:
+            lg.error(f"[rend] render failed aid[{autoId}] w[{w}] fmt[{fmt}] src[{srcFull}]: {e}")
+            return None
+
+    return dst, Fmts[fmt][1], key
+
+
+def clear():
+    import shutil
+    if os.path.exists(dirRend): shutil.rmtree(dirRend, ignore_errors=True)
+    lg.info(f"[rend] cleared {dirRend}")
+
+
+def prune(maxBytes: int):
+    """
+    drop the least recently written renditions once the cache goes over maxBytes
+    """
+    if not os.path.exists(dirRend): return 0
+
+    ents = []
+    total = 0
+    for root, _, files in os.walk(dirRend):
+        for fn in files:
+            p = os.path.join(root, fn)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            ents.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+
+    if total <= maxBytes: return 0
+
+    cnt = 0
+    for _, sz, p in sorted(ents):
+        if total <= maxBytes * 0.9: break
+        try:
+            os.remove(p)
+            total -= sz
+            cnt += 1
+        except OSError:
+            pass
+
+    lg.info(f"[rend] pruned {cnt} renditions, size now {total / 1048576:.0f}MB")
+    return cnt
+
+
+#------------------------------------------------------------------------
+# background warm-up
+#------------------------------------------------------------------------
+class Warmer:
+    """
+    one low priority thread renders the grid bucket ahead of the browser asking for it
+    """
+    def __init__(self):
+        self.q: queue.Queue = queue.Queue()
+        self.queued = set()
+        self.lock = threading.Lock()
+        self.th: Optional[threading.Thread] = None
+        self.tsPrune = 0.0
+        self.pendSig: Optional[tuple] = None
+
+    def put(self, autoIds: Iterable[int], w=GridW):
+        with self.lock:
+            for aid in autoIds:
+                ent = (int(aid), bucketOf(w))
+                if ent in self.queued: continue
+                self.queued.add(ent)
+                self.q.put(ent)
+
+            if not self.th:
+                self.th = threading.Thread(target=self.run, name='mkit-rend-warm', daemon=True)
+                self.th.start()
+
+    def run(self):
+        cnt = 0
+        if time.time() - self.tsPrune >= PruneEvery:
+            self.tsPrune = time.time()
+            prune(envs.rendCacheMb * 1024 * 1024)
+        while True:
+            try:
+                aid, w = self.q.get(timeout=5)
+            except queue.Empty:
+                with self.lock:
+                    if self.q.empty():
+                        self.th = None
+                        break
+                continue
+
+            try:
+                if getBy(aid, w): cnt += 1
+            except Exception as e:
+                lg.warn(f"[rend] warm aid[{aid}] failed: {e}")
+            finally:
+                with self.lock: self.queued.discard((aid, w))
+
+        if cnt: lg.info(f"[rend] warmed {cnt} renditions")
+
+
+warmer = Warmer()
+
+
+def warm(autoIds: Iterable[int], w=GridW):
+    warmer.put(autoIds, w)
+
+
+def warmPending(limit=500):
+    try:
+        # searches mostly leave the pending set as it was, skip the id query then
+        sig = db.pics.getPendingSig()
+        with warmer.lock:
+            if sig == warmer.pendSig: return
+            warmer.pendSig = sig
+        warm(db.pics.getPendingAutoIds(limit))
+    except Exception as e:
+        lg.warn(f"[rend] warm pending failed: {e}")
@@ -1,83 +1,255 @@
 import os
 import shutil
-from typing import Optional
+import threading
 from flask import send_file, request, make_response, jsonify
-from flask_caching import Cache
 
 from conf import envs, ks, pathCache
 from util import log
+from util.cache import TtlLru
 
 lg = log.get(__name__)
 
-enableCache = False
+enableCache = True
 
 CacheBrowserSecs = 60 #暫時先不用, 頻繁換容易造成用到舊圖
 TIMEOUT = (60 * 60 * 24) * 0.1  #day
 
+# legacy flask-caching filesystem cache, only removed on clear
 dirCache = os.path.abspath(os.path.join(pathCache, 'imgs'))
-cache:Optional[Cache] = None
+
+# hot thumbnails in memory, bounded by total bytes; entry = (data, etag, mtime, pathFull)
+cache = TtlLru('imgs', maxSize=100000, ttl=TIMEOUT, maxBytes=envs.imgCacheMb * 1024 * 1024, sizeOf=lambda ent: len(ent[0]))
+
+# keys requested once, a second request inside the window admits the file into memory
+seen = TtlLru('imgSeen', maxSize=20000, ttl=TIMEOUT)
 
 def clear_cache():
     try:
-        if cache:
-            cache.clear()
+        import rend
+        cache.clear()
+        seen.clear()
+        rend.clear()
         if os.path.exists(dirCache):
             shutil.rmtree(dirCache)
-            os.makedirs(dirCache)
-            lg.info(f"Cache directory cleared: {dirCache}")
+            lg.info(f"Cache directory removed: {dirCache}")
         return True
     except Exception as e:
         lg.error(f"Error clearing cache: {str(e)}")
         return False
 
-def getCache(ck, fnQ, mime='image/jpeg'):
-    if not enableCache or not cache:
-        path = fnQ()
-        if not path:
-            lg.warn(f"[serve] the db query failed with cache_key[ {ck} ]")
-        else:
-            pathFull = envs.pth.full(path)
-            if not os.path.exists(pathFull):
-                lg.warn(f"[serve] not exists path[ {pathFull} ]({path}) immichPath[ {envs.immichPath} ]")
-            else:
-                rep = make_response(send_file(pathFull, mimetype=mime))
-                # rep.headers['Cache-Control'] = f'public, max-age={CacheBrowserSecs}'
-                return rep
+def mkEtag(st: os.stat_result) -> str:
+    # strong validator, changes whenever immich rewrites the file
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+def sendBy(src, mime, etag, mtime):
+    """
+    src is a path (zero copy) or bytes, conditional requests get 304 from werkzeug
+    """
+    from io import BytesIO
+
+    rep = make_response(send_file(
+        src if isinstance(src, str) else BytesIO(src),
+        mimetype=mime,
+        etag=etag,
+        last_modified=mtime,
+        conditional=True,
+    ))
+
+    rep.headers['Cache-Control'] = 'no-cache'  # always revalidate, unchanged files answer 304 without a body
+    return rep
+
+def getCache(ck, fnQ, mime='image/jpeg', hot=False):
+    """
+    hot entries (thumbnails) are kept in memory once requested twice,
+    everything else and every miss is sent straight from the immich file
+    """
+    useMem = enableCache and hot
+
+    if useMem:
+        ent = cache.get(ck)
+        if ent:
+            data, etag, mtime, pathFull = ent
+            try:
+                st = os.stat(pathFull)
+                if mkEtag(st) == etag: return sendBy(data, mime, etag, mtime)
+            except OSError:
+                pass
+            cache.delete(ck)
+
+    path = fnQ()
+    if not path:
+        lg.warn(f"[serve] the db query failed with cache_key[ {ck} ]")
         return None
 
-    data = cache.get(ck)
+    pathFull = envs.pth.full(path)
+    if not os.path.exists(pathFull):
+        lg.warn(f"[serve] not exists path[ {pathFull} ]({path}) immichPath[ {envs.immichPath} ]")
+        return None
+
+    st = os.stat(pathFull)
+    etag = mkEtag(st)
+
+    if useMem and not request.if_none_match.contains(etag):
+        if seen.get(ck):
+            with open(pathFull, 'rb') as f: data = f.read()
+            cache.set(ck, (data, etag, st.st_mtime, pathFull))
+            seen.delete(ck)
+            return sendBy(data, mime, etag, st.st_mtime)
+        seen.set(ck, True)
+
+    return sendBy(pathFull, mime, etag, st.st_mtime)
+
+
+
+class ByteGate:
+    """
+    caps the bytes of responses still being streamed, released when werkzeug closes the response;
+    a single response larger than the cap still passes when nothing else is in flight
+    """
+    def __init__(self, name: str, maxBytes: int):
+        self.name = name
+        self.maxBytes = maxBytes
+        self.inflight = 0
+        self.rejects = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, n: int, timeout=5.0) -> bool:
+        with self.cond:
+            ok = self.cond.wait_for(lambda: self.inflight == 0 or self.inflight + n <= self.maxBytes, timeout)
+            if not ok:
+                self.rejects += 1
+                return False
+            self.inflight += n
+            return True
+
+    def release(self, n: int):
+        with self.cond:
+            self.inflight -= n
+            self.cond.notify_all()
+
+
+vdoGate = ByteGate('livephoto', envs.vdoInflightMb * 1024 * 1024)
+
+VdoMimes = {'.mov': 'video/quicktime', '.mp4': 'video/mp4', '.m4v': 'video/mp4', '.webm': 'video/webm'}
+
+def sendVdo(pathFull: str):
+    """
+    streamed from disk by werkzeug: Range gives 206 / 416, If-None-Match / If-Modified-Since give 304
+    """
+    st = os.stat(pathFull)
+    mime = VdoMimes.get(os.path.splitext(pathFull)[1].lower(), 'video/quicktime')
+
+    rep = sendBy(pathFull, mime, mkEtag(st), st.st_mtime)
+    n = rep.content_length or 0
+    if not n: return rep
 
-    if data is None:
-        path = fnQ()
-        if path:
-            pathFull = envs.pth.full(path)
-            if os.path.exists(pathFull):
-                with open(pathFull, 'rb') as f: data = f.read()
-                cache.set(ck, data)
+    if not vdoGate.acquire(n):
+        rep.close()
+        lg.warn(f"[serve] livephoto busy, inflight[{vdoGate.inflight}] req[{n}] path[{pathFull}]")
+        return "", 503, {'Retry-After': '1'}
 
-    if data:
-        from io import BytesIO
-        rep = make_response(send_file(BytesIO(data), mimetype=mime))
-        # rep.headers['Cache-Control'] = f'public, max-age={CacheBrowserSecs}'
-        return rep
+    rep.call_on_close(lambda: vdoGate.release(n))
+    return rep
 
-    return None
 
+BatchMax = 200
+
+PayloadLogKb = 64
+
+def logPayload(rep):
+    """
+    callback sizes both ways, large ones at info so oversized stores are easy to spot
+    """
+    try:
+        if request.path != '/_dash-update-component': return rep
+
+        kbReq = (request.content_length or 0) / 1024
+        kbRep = (rep.calculate_content_length() or 0) / 1024
+        dic = request.get_json(silent=True) or {}
+        outs = str(dic.get('output', ''))[:120]
+
+        msg = f"[dash] cbk[{outs}] req[{kbReq:.1f}KB] rep[{kbRep:.1f}KB]"
+        if kbReq > PayloadLogKb or kbRep > PayloadLogKb: lg.info(msg)
+        else: lg.debug(msg)
+    except Exception as e:
+        lg.debug(f"[dash] payload log failed: {e}")
+    return rep
+
+def findBatch(aids, w):
+    """
+    resolves every aid to (aid, path, mime) without reading the files, the etag comes from their stats
+    """
+    import hashlib
+    from concurrent.futures import ThreadPoolExecutor
+    import db
+    import rend
+
+    def find(aid):
+        try:
+            if w:
+                rst = rend.getBy(aid, w)
+                if not rst: return aid, None, None, ''
+                path, mime, _ = rst
+            else:
+                rel = db.pics.paths.get(aid, 'pathThumbnail')
+                path = envs.pth.full(rel) if rel else None
+                if not path or not os.path.exists(path): return aid, None, None, ''
+                mime = 'image/jpeg'
+            return aid, path, mime, f"{path}:{mkEtag(os.stat(path))}"
+        except Exception as e:
+            lg.warn(f"[serve] batch aid[{aid}] failed: {e}")
+            return aid, None, None, ''
+
+    # missing renditions are rendered here, the pool keeps that parallel
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        rsts = list(ex.map(find, aids))
+
+    etag = hashlib.sha1('|'.join(r[3] for r in rsts).encode('utf-8')).hexdigest()[:20]
+    return [r[:3] for r in rsts], etag
+
+
+def packBatch(ents):
+    """
+    one body for many thumbnails: 4 byte big endian header length, json header
+    [{aid, off, len, mime}], then the image bytes back to back
+    """
+    import json
+    import struct
+    from concurrent.futures import ThreadPoolExecutor
+
+    def load(ent):
+        aid, path, mime = ent
+        if not path: return None
+        try:
+            with open(path, 'rb') as f: return f.read()
+        except Exception as e:
+            lg.warn(f"[serve] batch aid[{aid}] read failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        datas = list(ex.map(load, ents))
+
+    items, blobs = [], []
+    off = 0
+    for (aid, _, mime), data in zip(ents, datas):
+        sz = len(data) if data else 0
+        items.append({'aid': aid, 'off': off, 'len': sz, 'mime': mime})
+        if data: blobs.append(data)
+        off += sz
+
+    head = json.dumps(items, separators=(',', ':')).encode('utf-8')
+    return b''.join([struct.pack('>I', len(head)), head, *blobs])
 
 
 def regBy(app):
     import db
-    global cache
+    import rend
 
-    pathNoImg = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets/noimg.png")
+    rend.warmPending()
 
-    cache = Cache(app.server, config={
-        'CACHE_TYPE': 'filesystem',
-        'CACHE_DIR': dirCache,
-        'CACHE_DEFAULT_TIMEOUT': TIMEOUT,
-        'CACHE_THRESHOLD': 300,
-    })
+    app.server.after_request(logPayload)
 
+    pathNoImg = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets/noimg.png")
 
     #----------------------------------------------------------------
     # serve for Image
@@ -89,6 +261,9 @@ def regBy(app):
             cache_key = f"{aid}_{photoQ}"
 
             def query_image():
+                if db.pics.paths.ready:
+                    return db.pics.paths.get(int(aid), 'pathPreview' if photoQ == ks.db.preview else 'pathThumbnail')
+
                 with db.pics.mkConn() as conn:
                     cursor = conn.cursor()
                     cursor.execute("SELECT pathThumbnail, pathPreview FROM assets WHERE autoId = ?", [aid])
@@ -99,7 +274,7 @@ def regBy(app):
                         return row[0]
                     return None
 
-            result = getCache(cache_key, query_image, 'image/jpeg')
+            result = getCache(cache_key, query_image, 'image/jpeg', hot=photoQ != ks.db.preview)
             if result: return result
 
             return send_file(pathNoImg, mimetype='image/png')
@@ -108,15 +283,81 @@ def regBy(app):
             lg.error(f"Error serving image: {str(e)}")
             return send_file(pathNoImg, mimetype='image/png')
 
+    #----------------------------------------------------------------
+    # serve for resized renditions (grid)
+    #----------------------------------------------------------------
+    @app.server.route('/api/rend/<aid>')
+    def doGetRendBy(aid):
+        try:
+            import rend
+
+            rst = rend.getBy(int(aid), request.args.get('w', rend.GridW), request.args.get('fmt'))
+            if not rst: return send_file(pathNoImg, mimetype='image/png')
+
+            path, mime, key = rst
+            return sendBy(path, mime, key[:20], os.stat(path).st_mtime)
+
+        except Exception as e:
+            lg.error(f"Error serving rendition: {str(e)}")
+            return send_file(pathNoImg, mimetype='image/png')
+
+    #----------------------------------------------------------------
+    # serve many thumbnails in one response (batched grids)
+    #----------------------------------------------------------------
+    @app.server.route('/api/imgs')
+    def doGetImgsBy():
+        try:
+            aids = [int(a) for a in request.args.get('ids', '').split(',') if a.strip().isdigit()][:BatchMax]
+            if not aids: return "", 400
+
+            w = request.args.get('w')
+            ents, etag = findBatch(aids, w)
+
+            # revalidation answers from the stats alone, no file is read for a 304
+            if etag in request.if_none_match:
+                rep = make_response('', 304)
+                rep.set_etag(etag)
+                rep.headers['Cache-Control'] = 'no-cache'
+                return rep
+
+            rep = make_response(packBatch(ents))
+            rep.mimetype = 'application/octet-stream'
+            rep.set_etag(etag)
+            rep.headers['Cache-Control'] = 'no-cache'
+            return rep.make_conditional(request)
+
+        except Exception as e:
+            lg.error(f"Error serving image batch: {str(e)}")
+            return "", 500
+
+    #----------------------------------------------------------------
+    # asset meta for exports, windowed grids only render some cards
+    #----------------------------------------------------------------
+    @app.server.route('/api/meta')
+    def doGetMetaBy():
+        try:
+            import db
+            aids = [int(a) for a in request.args.get('ids', '').split(',') if a.strip().isdigit()]
+            if not aids: return jsonify([])
+
+            assets = db.pics.getAllByAutoIds(aids)
+            return jsonify([{'id': a.id, 'autoId': a.autoId, 'originalFileName': a.originalFileName, 'originalPath': a.originalPath} for a in assets])
+        except Exception as e:
+            lg.error(f"[api] getMeta Failed: {str(e)}")
+            return jsonify({"error": f"Failed to get Meta, {str(e)}"}), 500
+
     #----------------------------------------------------------------
     # serve for LivePhoto Video
     #----------------------------------------------------------------
     @app.server.route('/api/livephoto/<aid>')
     def doGetLivePhotoBy(aid):
         try:
-            cache_key = f"lp_{aid}"
-
             def query_livephoto():
+                if db.pics.paths.ready:
+                    path = db.pics.paths.get(int(aid), 'pathVdo')
+                    if not path: lg.warn(f"[serve] no livePhoto aid[{aid}]")
+                    return path
+
                 with db.pics.mkConn() as conn:
                     cursor = conn.cursor()
                     cursor.execute("SELECT pathVdo FROM assets WHERE autoId = ?", [aid])
@@ -127,10 +368,13 @@ def regBy(app):
 
                     return row[0] if row and row[0] else None
 
-            result = getCache(cache_key, query_livephoto, 'video/quicktime')
-            if result: return result
+            path = query_livephoto()
+            pathFull = envs.pth.full(path) if path else None
+            if not pathFull or not os.path.exists(pathFull):
+                if path: lg.warn(f"[serve] not exists path[ {pathFull} ]({path}) immichPath[ {envs.immichPath} ]")
+                return "", 404
 
-            return "", 404
+            return sendVdo(pathFull)
 
         except Exception as e:
             lg.error(f"Error serving livephoto: {str(e)}")
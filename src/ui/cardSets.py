@@ -14,6 +14,7 @@ class k:
     threshold = "thresholds"
     autoNext = "autoNext"
     showGridInfo = "showGridInfo"
+    gvBatch = "gvBatch"
     simRtree = "simRtree"
     simMaxItems = "simMaxItems"
 
@@ -193,6 +194,7 @@ def renderCard():
                 htm.Div([
                     dbc.Checkbox(id=k.id(k.autoNext), label="Auto Find Next", value=db.dto.autoNext),
                     dbc.Checkbox(id=k.id(k.showGridInfo), label="Show Grid Info", value=db.dto.showGridInfo),
+                    dbc.Checkbox(id=k.id(k.gvBatch), label="Batch Grid Images", value=db.dto.gvBatch),
 
                     htm.Div([
                         htm.Label("Max Items: "),
@@ -305,6 +307,7 @@ def renderCard():
     inp(k.id(k.threshold), "value"),
     inp(k.id(k.autoNext), "value"),
     inp(k.id(k.showGridInfo), "value"),
+    inp(k.id(k.gvBatch), "value"),
     inp(k.id(k.simRtree), "value"),
     inp(k.id(k.simMaxItems), "value"),
     inp(k.id(k.muodEnable), "value"),
@@ -316,7 +319,7 @@ def renderCard():
     ste(ks.sto.now, "data"),
     prevent_initial_call=True
 )
-def settings_OnUpd(th, auNxt, shGdInfo, rtree,  maxItems, muodEnable, muodDate, muodWidth, muodHeight, muodSize, maxGroups, dta_now):
+def settings_OnUpd(th, auNxt, shGdInfo, gvBatch, rtree,  maxItems, muodEnable, muodDate, muodWidth, muodHeight, muodSize, maxGroups, dta_now):
     retNow = noUpd
 
     now = models.Now.fromDic(dta_now)
@@ -349,6 +352,10 @@ def settings_OnUpd(th, auNxt, shGdInfo, rtree,  maxItems, muodEnable, muodDate,
         db.dto.showGridInfo = shGdInfo
         if retNow == noUpd: reloadAssets()
 
+    if db.dto.gvBatch != gvBatch:
+        db.dto.gvBatch = gvBatch
+        if retNow == noUpd: reloadAssets()
+
     if db.dto.rtree != rtree:
         db.dto.rtree = rtree
         if retNow == noUpd: reloadAssets()
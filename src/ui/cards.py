@@ -12,10 +12,16 @@ from ui import gvEx
 
 lg = log.get(__name__)
 
-def mk(ass: models.Asset, modSim=True):
+def mkImgProps(ass: models.Asset, batch: bool) -> dict:
+    # batched cards carry no src, assets/mod/imgBatch.js loads the whole grid in one request
+    if not ass.autoId: return {"src": "assets/noimg.png"}
+    if batch: return {"data-bid": ass.autoId, "data-bw": 240}
+    return {"src": f"/api/rend/{ass.autoId}?w=240"}
+
+def mk(ass: models.Asset, modSim=True, batch=False):
     if not ass: return htm.Div("Photo not found")
 
-    imgSrc = f"/api/img/{ass.autoId}" if ass.id else None
+    imgProps = mkImgProps(ass, batch) if ass.id else {}
 
     checked = False
     cssIds = "checked" if checked else ""
@@ -106,9 +112,9 @@ def mk(ass: models.Asset, modSim=True):
                         className="livephoto",
                     ) if isLive else None,
                     htm.Img(
-                        src=imgSrc,
                         id=imgPopId,
-                        className=f"card-img"
+                        className=f"card-img",
+                        **imgProps
                     ),
                 ], className='view'),
 
@@ -215,9 +221,9 @@ def mk(ass: models.Asset, modSim=True):
 
 
 
-def mkCardPnd(ass: models.Asset, showRelated=True):
+def mkCardPnd(ass: models.Asset, showRelated=True, batch=False):
 
-    imgSrc = f"/api/img/{ass.autoId}" if ass.autoId else "assets/noimg.png"
+    imgProps = mkImgProps(ass, batch)
 
     if not ass.id: return htm.Div("-No ass.id-")
 
@@ -267,9 +273,9 @@ def mkCardPnd(ass: models.Asset, showRelated=True):
         ], className="pt-2 ps-2 pb-3"),
         htm.Div([
             htm.Img(
-                src=imgSrc,
                 id={"type": "img-pop", "aid": ass.autoId}, n_clicks=0,
-                className="card-img"
+                className="card-img",
+                **imgProps
             ),
             htm.Div([
                 htm.Span(f"#{ass.autoId}", className="tag sm second"),
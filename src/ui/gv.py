@@ -1,7 +1,11 @@
-from typing import List
-from dsh import htm, dbc
+import math
+import time
+import uuid
+from typing import List, Dict, Any
+from dsh import htm, dbc, cbk, out, inp, ctx, MATCH, noUpd
 from conf import ks
 from util import log
+from util.cache import TtlLru
 from mod import models
 
 
@@ -9,8 +13,75 @@ lg = log.get(__name__)
 
 from ui import gvEx, cards
 
-
-def mkGrd(assets: list[models.Asset], minW=230, onEmpty=None, maker=cards.mk):
+# grids over WinSize cards render the first window only, later windows load when their placeholder scrolls near
+WinSize = 60
+RowPx = 420
+ColsGuess = 4
+
+# key -> (windows of row entries, row maker)
+gvSto = TtlLru('gvWin', maxSize=32, ttl=60 * 60 * 12)
+
+
+def mkWins(ents: list, mkRow) -> list:
+    """
+    ents are (isCard, payload), mkRow turns one entry into a grid row
+    """
+    cntCards = sum(1 for isCard, _ in ents if isCard)
+    if cntCards <= WinSize: return [mkRow(e) for e in ents]
+
+    wins = [[]]
+    cnt = 0
+    for e in ents:
+        if e[0]:
+            if cnt == WinSize:
+                wins.append([])
+                cnt = 0
+            cnt += 1
+        wins[-1].append(e)
+
+    key = uuid.uuid4().hex
+    gvSto.set(key, (wins, mkRow))
+
+    rows = [mkRow(e) for e in wins[0]]
+    for idx in range(1, len(wins)):
+        cnt = sum(1 for isCard, _ in wins[idx] if isCard)
+        dta: Dict[str, Any] = {"data-cnt": cnt}
+        rows.append(htm.Div(
+            htm.Div(
+                id={"type": "gv-more", "key": key, "win": idx}, className="gv-more",
+                style={"height": f"{math.ceil(cnt / ColsGuess) * RowPx}px"}, **dta
+            ),
+            id={"type": "gv-win", "key": key, "win": idx}, className="gv-win"
+        ))
+
+    lg.info(f"[gv] windowed cards[{cntCards}] wins[{len(wins)}] key[{key}]")
+    return rows
+
+
+@cbk(
+    out({"type": "gv-win", "key": MATCH, "win": MATCH}, "children"),
+    inp({"type": "gv-more", "key": MATCH, "win": MATCH}, "n_clicks"),
+    prevent_initial_call=True
+)
+def gv_LoadWin(_clicks):
+    trg = ctx.triggered_id
+    if not isinstance(trg, dict): return noUpd
+
+    ent = gvSto.get(trg["key"])
+    if not ent:
+        return dbc.Alert("This grid has expired, please reload the page", color="warning", className="text-center gv-exp")
+
+    wins, mkRow = ent
+    idx = trg["win"]
+    if idx >= len(wins): return []
+
+    st = time.perf_counter()
+    rows = [mkRow(e) for e in wins[idx]]
+    lg.info(f"[gv] win[{idx}/{len(wins)}] rows[{len(rows)}] in {(time.perf_counter() - st) * 1000:.1f}ms")
+    return rows
+
+
+def mkGrd(assets: list[models.Asset], minW=230, onEmpty=None, maker=cards.mk, batch=False):
     if not assets or len(assets) == 0:
         if onEmpty:
             if isinstance(onEmpty, str):
@@ -37,27 +108,35 @@ def mkGrd(assets: list[models.Asset], minW=230, onEmpty=None, maker=cards.mk):
         }
         styItem = {}
 
-    rows = []
+    ents = []
     firstRels = False
 
     cntRelats = sum(1 for a in assets if a.vw.isRelats)
 
-    for idx, a in enumerate(assets):
-        card = maker(a)
-
-
+    for a in assets:
         if a.vw.isRelats and not firstRels:
             firstRels = True
-            rows.append(htm.Div( htm.Label(f"relates ({cntRelats}) :"), className="hr"))
+            ents.append((False, cntRelats))
+
+        ents.append((True, a))
+
+    def mkRow(ent):
+        isCard, val = ent
+        if not isCard: return htm.Div( htm.Label(f"relates ({val}) :"), className="hr")
+
+        card = maker(val, batch=True) if batch else maker(val)
+        return htm.Div(card, style=styItem)
 
-        rows.append(htm.Div(card, style=styItem))
+    rows = mkWins(ents, mkRow)
 
     lg.info(f"[sim:gv] assets[{len(assets)}] rows[{len(rows)}]")
 
-    return htm.Div(rows, className="gv", style=styGrid)
+    # the whole id list stays on the grid so select all covers cards not rendered yet
+    dta: Dict[str, Any] = {"data-aids": ",".join(str(a.autoId) for a in assets)}
+    return htm.Div(rows, className="gv", style=styGrid, **dta)
 
 
-def mkGrdGrps(assets: List[models.Asset], minW=250, maxW=300, onEmpty=None):
+def mkGrdGrps(assets: List[models.Asset], minW=250, maxW=300, onEmpty=None, batch=False):
     if not assets or len(assets) == 0:
         if onEmpty:
             if isinstance(onEmpty, str):
@@ -90,31 +169,35 @@ def mkGrdGrps(assets: List[models.Asset], minW=250, maxW=300, onEmpty=None):
         if grpId not in groups: groups[grpId] = []
         groups[grpId].append(asset)
 
-    rows = []
+    ents = []
     for grpId in sorted(groups.keys()):
         grpAssets = groups[grpId]
-        grpCount = len(grpAssets)
+        ents.append((False, (grpId, grpAssets)))
+        ents.extend((True, a) for a in grpAssets)
 
+    def mkRow(ent):
+        isCard, val = ent
+        if isCard: return htm.Div(cards.mk(val, batch=batch), style=styItem)
 
-        rows.append(htm.Div([
-            htm.Label(f"Group {grpId} ( {grpCount} items )", className="me-3"),
+        grpId, grpAssets = val
+        return htm.Div([
+            htm.Label(f"Group {grpId} ( {len(grpAssets)} items )", className="me-3"),
 
             dbc.Button( [ htm.Span( className="fake-checkbox checked" ), "select this group all"], size="sm", color="secondary", id=f"cbx-sel-grp-all-{grpId}", className="txt-sm me-1" ),
             dbc.Button( [ htm.Span( className="fake-checkbox" ),"deselect this group All"], size="sm", color="secondary", id=f"cbx-sel-grp-non-{grpId}", className="txt-sm" ),
 
-        ], className="hr"))
+        ], className="hr", **{"data-gid": grpId, "data-aids": ",".join(str(a.autoId) for a in grpAssets)})
 
-        for asset in grpAssets:
-            card = cards.mk(asset)
-            rows.append(htm.Div(card, style=styItem))
+    rows = mkWins(ents, mkRow)
 
     lg.info(f"[fsp:gv] assets[{len(assets)}] groups[{len(groups)}] rows[{len(rows)}]")
 
-    return htm.Div(rows, className="gv fsp", style=styGrid)
+    dta: Dict[str, Any] = {"data-aids": ",".join(str(a.autoId) for a in assets)}
+    return htm.Div(rows, className="gv fsp", style=styGrid, **dta)
 
 
 
-def mkPndGrd(assets: list[models.Asset], minW=230, maxW=300, onEmpty=None):
+def mkPndGrd(assets: list[models.Asset], minW=230, maxW=300, onEmpty=None, batch=False):
     if not assets or len(assets) == 0:
         if onEmpty:
             if isinstance(onEmpty, str):
@@ -141,7 +224,7 @@ def mkPndGrd(assets: list[models.Asset], minW=230, maxW=300, onEmpty=None):
         }
         styItem = {}
 
-    rows = [htm.Div(cards.mkCardPnd(a), style=styItem) for a in assets]
+    rows = mkWins([(True, a) for a in assets], lambda ent: htm.Div(cards.mkCardPnd(ent[1], batch=batch), style=styItem))
 
     lg.info(f"[sim:gvPnd] assets[{len(assets)}] rows[{len(rows)}]")
 
@@ -2,6 +2,8 @@ from dsh import htm, dcc, dbc, inp, out, ste, cbk
 from mod import models
 from conf import ks, envs
 import conf
+import db
+import serve
 
 class k:
     connInfo = 'div-conn-info'
@@ -117,4 +119,28 @@ def onUpdateSideBar(_trigger, dta_count, dta_nfy):
         ]),
     ]
 
+    exSt = db.psql.exCache.stats()
+    cacheRows.append(
+        dbc.Row([
+            dbc.Col(htm.Small("ExInfo", className="d-inline-block me-2"), width=sizeL),
+            dbc.Col(htm.Span(
+                f"{exSt['ratio'] * 100:.0f}% ({exSt['size']})",
+                className="tag second px-3 mb-2 txt-c",
+                title=f"hits[{exSt['hits']}] misses[{exSt['misses']}] evicts[{exSt['evicts']}] expires[{exSt['expires']}]"
+            )),
+        ])
+    )
+
+    imSt = serve.cache.stats()
+    cacheRows.append(
+        dbc.Row([
+            dbc.Col(htm.Small("Thumbs", className="d-inline-block me-2"), width=sizeL),
+            dbc.Col(htm.Span(
+                f"{imSt['ratio'] * 100:.0f}% ({imSt['bytes'] / 1048576:.0f}MB)",
+                className="tag second px-3 mb-2 txt-c",
+                title=f"hits[{imSt['hits']}] misses[{imSt['misses']}] evicts[{imSt['evicts']}] items[{imSt['size']}] max[{imSt['maxBytes'] / 1048576:.0f}MB]"
+            )),
+        ])
+    )
+
     return envRows, cacheRows, nfy.toDict()
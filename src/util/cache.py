@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+from . import log
+
+lg = log.get(__name__)
+
+
+class TtlLru:
+    """
+    thread safe lru bounded by item count, entries older than ttl seconds count as misses (ttl 0 = no expiry)
+    with maxBytes + sizeOf it is also bounded by the total size of the values, values larger than maxBytes are not kept
+    """
+    def __init__(self, name: str, maxSize: int, ttl: float = 0, maxBytes: int = 0, sizeOf: Optional[Callable[[Any], int]] = None):
+        self.name = name
+        self.maxSize = max(maxSize, 1)
+        self.ttl = ttl
+        self.maxBytes = maxBytes if sizeOf else 0
+        self.sizeOf = sizeOf
+
+        self.lock = threading.Lock()
+        self.items: OrderedDict[Hashable, Tuple[float, Any, int]] = OrderedDict()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evicts = 0
+        self.expires = 0
+
+    def __len__(self): return len(self.items)
+
+    def _getLocked(self, key, now: float):
+        ent = self.items.get(key)
+        if ent is None:
+            self.misses += 1
+            return None
+
+        if self.ttl and now - ent[0] > self.ttl:
+            del self.items[key]
+            self.bytes -= ent[2]
+            self.expires += 1
+            self.misses += 1
+            return None
+
+        self.items.move_to_end(key)
+        self.hits += 1
+        return ent
+
+    def get(self, key, default=None):
+        with self.lock:
+            ent = self._getLocked(key, time.monotonic())
+            return ent[1] if ent else default
+
+    def getMany(self, keys: Iterable[Any]) -> Tuple[Dict[Any, Any], List[Any]]:
+        """
+        returns (hits, missed keys)
+        """
+        hits, miss = {}, []
+        with self.lock:
+            now = time.monotonic()
+            for key in keys:
+                ent = self._getLocked(key, now)
+                if ent: hits[key] = ent[1]
+                else: miss.append(key)
+        return hits, miss
+
+    def set(self, key, val):
+        self.setMany({key: val})
+
+    def setMany(self, dic: Mapping[Any, Any]):
+        with self.lock:
+            now = time.monotonic()
+            for key, val in dic.items():
+                sz = self.sizeOf(val) if self.sizeOf else 0
+                old = self.items.pop(key, None)
+                if old: self.bytes -= old[2]
+                if self.maxBytes and sz > self.maxBytes: continue
+
+                self.items[key] = (now, val, sz)
+                self.bytes += sz
+
+            while len(self.items) > self.maxSize or (self.maxBytes and self.bytes > self.maxBytes):
+                _, ent = self.items.popitem(last=False)
+                self.bytes -= ent[2]
+                self.evicts += 1
+
+    def delete(self, key):
+        self.deleteMany([key])
+
+    def deleteMany(self, keys: Iterable[Hashable]) -> int:
+        cnt = 0
+        with self.lock:
+            for key in keys:
+                ent = self.items.pop(key, None)
+                if ent is not None:
+                    self.bytes -= ent[2]
+                    cnt += 1
+        return cnt
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self.items),
+                'max': self.maxSize,
+                'bytes': self.bytes,
+                'maxBytes': self.maxBytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evicts': self.evicts,
+                'expires': self.expires,
+                'ratio': self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,26 @@
+"""
+production entry for gunicorn, started by app.py when MKIT_SERVER=gunicorn or directly:
+    gunicorn --pythonpath src -w 1 -k gthread --threads 64 -b 0.0.0.0:8086 wsgi:server
+keep a single worker, task state and socketio clients are per process
+"""
+import atexit
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from util import log
+from conf import envs
+from app import app
+import db
+
+lg = log.get(__name__)
+
+lg.info("========================================================================")
+lg.info(f"[MediaKit] Start ... ver[{ envs.version }] gunicorn worker pid[{os.getpid()}]")
+lg.info("========================================================================")
+envs.showVars()
+
+atexit.register(db.close)
+
+server = app.server
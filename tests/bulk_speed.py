@@ -0,0 +1,175 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+bench = 'mkit_bench'
+
+# every pooled connection resolves asset/asset_file/asset_exif to the synthetic schema first
+os.environ['PGOPTIONS'] = f"-c search_path={bench},public"
+
+from db import psql, pics
+from mod import models
+from util import log
+
+lg = log.get(__name__)
+
+ownerId = '00000000-0000-4000-8000-000000000001'
+
+
+# noinspection SqlResolve
+def setup_pg(num_records: int):
+    with psql.mkConn() as conn:
+        with conn.cursor() as c:
+            c.execute(f"DROP SCHEMA IF EXISTS {bench} CASCADE")
+            c.execute(f"CREATE SCHEMA {bench}")
+            c.execute(f"""
+                CREATE TABLE {bench}.asset (
+                    id                 uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+                    "ownerId"          uuid NOT NULL,
+                    "deviceId"         varchar,
+                    type               varchar,
+                    status             varchar DEFAULT 'active',
+                    visibility         varchar DEFAULT 'timeline',
+                    "originalFileName" varchar,
+                    "originalPath"     varchar,
+                    "encodedVideoPath" varchar,
+                    "livePhotoVideoId" uuid,
+                    "isFavorite"       boolean DEFAULT false,
+                    "fileCreatedAt"    timestamptz,
+                    "fileModifiedAt"   timestamptz,
+                    "localDateTime"    timestamptz,
+                    "createdAt"        timestamptz DEFAULT now(),
+                    "deletedAt"        timestamptz
+                )
+            """)
+            c.execute(f"""
+                CREATE TABLE {bench}.asset_file (
+                    "assetId" uuid,
+                    type      varchar,
+                    path      varchar
+                )
+            """)
+            c.execute(f"""
+                CREATE TABLE {bench}.asset_exif (
+                    "assetId"          uuid PRIMARY KEY,
+                    make               varchar,
+                    model              varchar,
+                    "exifImageWidth"   integer,
+                    "exifImageHeight"  integer,
+                    "fileSizeInByte"   bigint,
+                    "fNumber"          double precision,
+                    iso                integer,
+                    city               varchar,
+                    "livePhotoCID"     varchar,
+                    "dateTimeOriginal" timestamptz,
+                    "modifyDate"       timestamptz
+                )
+            """)
+
+            c.execute(f"""
+                INSERT INTO {bench}.asset ("ownerId", "deviceId", type, "originalFileName", "originalPath", "isFavorite",
+                                          "fileCreatedAt", "fileModifiedAt", "localDateTime")
+                SELECT %s, 'bench', 'IMAGE', 'IMG_' || g || '.jpg', '/upload/library/' || (g % 97) || '/IMG_' || g || '.jpg', g % 13 = 0,
+                       now() - g * interval '1 minute', now() - g * interval '1 minute', now() - g * interval '1 minute'
+                FROM generate_series(1, %s) g
+            """, (ownerId, num_records))
+            c.execute(f"""
+                INSERT INTO {bench}.asset_file ("assetId", type, path)
+                SELECT id, t, '/upload/thumbs/' || t || '/' || id || '.webp'
+                FROM {bench}.asset CROSS JOIN (VALUES ('thumbnail'), ('preview')) v(t)
+            """)
+            c.execute(f"""
+                INSERT INTO {bench}.asset_exif ("assetId", make, model, "exifImageWidth", "exifImageHeight", "fileSizeInByte",
+                                               "fNumber", iso, city, "dateTimeOriginal", "modifyDate")
+                SELECT id, 'Apple', 'iPhone 15', 4032, 3024, 2500000 + (random() * 1000000)::int,
+                       1.8, 100, 'Taipei', "fileCreatedAt", "fileModifiedAt"
+                FROM {bench}.asset
+            """)
+            c.execute(f'CREATE INDEX ON {bench}.asset ("ownerId", status, type)')
+            c.execute(f'CREATE INDEX ON {bench}.asset_file ("assetId")')
+            c.execute(f'CREATE INDEX ON {bench}.asset_exif ("livePhotoCID")')
+            c.execute(f"ANALYZE {bench}.asset")
+            c.execute(f"ANALYZE {bench}.asset_file")
+            c.execute(f"ANALYZE {bench}.asset_exif")
+        conn.commit()
+
+
+def drop_pg():
+    with psql.mkConn() as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {bench} CASCADE")
+        conn.commit()
+
+
+def reset_sqlite():
+    for ext in ('', '-wal', '-shm'):
+        if os.path.exists(pics.pathDb + ext): os.remove(pics.pathDb + ext)
+    pics.init()
+
+
+def run_rows(usr: models.Usr):
+    reset_sqlite()
+    st = time.perf_counter()
+    cnt = 0
+    for chunk in psql.iterAssets(usr, onUpdate=lambda p, m: None):
+        with pics.mkConn() as conn:
+            c = conn.cursor()
+            for asset in chunk: pics.saveBy(asset, c)
+            conn.commit()
+        cnt += len(chunk)
+    return cnt, time.perf_counter() - st
+
+
+def run_bulk(usr: models.Usr):
+    reset_sqlite()
+    st = time.perf_counter()
+    cnt = 0
+    for chunk in psql.iterAssetsBulk(usr, onUpdate=lambda p, m: None):
+        with pics.mkConn() as conn:
+            pics.saveBulk(chunk, conn.cursor())
+            conn.commit()
+        cnt += len(chunk)
+    return cnt, time.perf_counter() - st
+
+
+def run_test(num_records: int, keep: bool = False):
+    lg.info(f"\n## Import test ({num_records} assets)")
+    usr = models.Usr(id=ownerId, name='bench')
+
+    st = time.time()
+    setup_pg(num_records)
+    lg.info(f"setup postgres: {time.time() - st:.1f}s")
+
+    try:
+        cntBulk, tBulk = run_bulk(usr)
+        lg.info(f"COPY binary + bulk upsert: {cntBulk} assets in {tBulk:.2f}s ({cntBulk / tBulk:.0f}/s)")
+
+        cntRows, tRows = run_rows(usr)
+        lg.info(f"server cursor + saveBy:    {cntRows} assets in {tRows:.2f}s ({cntRows / tRows:.0f}/s)")
+
+        assert cntRows == cntBulk, f"count mismatch rows[{cntRows}] bulk[{cntBulk}]"
+        lg.info(f"=> Speed ratio: {tRows / tBulk:.2f}x")
+        return tRows, tBulk
+    finally:
+        if not keep: drop_pg()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare binary COPY bulk import against the row by row fetch on a synthetic local Postgres')
+    parser.add_argument('--rows', type=int, default=1000000, help='synthetic assets to generate')
+    parser.add_argument('--small', action='store_true', help='Run only small tests (skip large data tests)')
+    parser.add_argument('--keep', action='store_true', help='keep the synthetic schema after the run')
+    args = parser.parse_args()
+
+    log.setup(logging.INFO, enableFile=False)
+    if not psql.init(): raise RuntimeError("cannot connect to PostgreSQL")
+
+    pics.pathDb = os.path.join(tempfile.mkdtemp(prefix='mkit-bulk-'), 'pics.db')
+
+    run_test(10000, keep=args.keep and args.small)
+    if not args.small: run_test(args.rows, keep=args.keep)
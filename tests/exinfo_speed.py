@@ -0,0 +1,151 @@
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from psycopg.rows import dict_row
+
+from db import psql
+from mod import models
+from util import log
+
+lg = log.get(__name__)
+
+
+def legacy_exinfos(assetIds):
+    """
+    previous implementation: albums, tags and faces as three queries per 100 ids, rows filtered into dicts
+    """
+    sch = psql.getSchema()
+    rst = {str(a): models.AssetExInfo() for a in assetIds}
+    tQry = tDec = 0.0
+    cntQry = 0
+
+    with psql.mkConn() as conn:
+        with conn.cursor(row_factory=dict_row) as cursor:
+            for i in range(0, len(assetIds), 100):
+                chunk = assetIds[i:i + 100]
+                sqls = [
+                    (f"""
+                    Select aaa."{sch.albumAssetAssetId}" AS "_aid", a.id, a."ownerId", a."albumName", a.description,
+                           a."createdAt", a."updatedAt", a."albumThumbnailAssetId", a."isActivityEnabled", a."order"
+                    From {sch.album} a
+                    Join album_asset aaa On a.id = aaa."{sch.albumAssetAlbumId}"
+                    Where aaa."{sch.albumAssetAssetId}" = ANY(%s) And a."deletedAt" Is Null
+                    Order By a."createdAt" Desc
+                    """, 'albs', models.Album),
+                    (f"""
+                    Select ta."{sch.tagAssetAssetId}" AS "_aid", t.id, t.value, t."userId"
+                    From {sch.tag} t
+                    Join tag_asset ta On t.id = ta."{sch.tagAssetTagId}"
+                    Where ta."{sch.tagAssetAssetId}" = ANY(%s)
+                    """, 'tags', models.Tags),
+                    ("""
+                    Select af."assetId" AS "_aid", af.id, af."personId", p.name, p."ownerId",
+                           af."imageWidth", af."imageHeight", af."boundingBoxX1", af."boundingBoxY1",
+                           af."boundingBoxX2", af."boundingBoxY2", af."sourceType"
+                    From asset_face af
+                    Join person p On af."personId" = p.id
+                    Where p.name Is Not Null And p.name != '' And af."assetId" = ANY(%s) And af."deletedAt" Is Null
+                    """, 'facs', models.AssetFace),
+                ]
+                for sql, attr, typ in sqls:
+                    st = time.perf_counter()
+                    cursor.execute(sql, (chunk,))
+                    rows = cursor.fetchall()
+                    tQry += time.perf_counter() - st
+                    cntQry += 1
+
+                    st = time.perf_counter()
+                    for row in rows:
+                        aid = str(row['_aid']).strip()
+                        if aid in rst:
+                            getattr(rst[aid], attr).append(typ.fromDic({k: v for k, v in row.items() if k != '_aid'}))
+                    tDec += time.perf_counter() - st
+
+    return rst, tQry, tDec, cntQry
+
+
+def aggregated_exinfos(assetIds):
+    sql = psql.mkExInfoSql()
+    rst = {}
+    tQry = tDec = 0.0
+    cntQry = 0
+
+    with psql.mkConn() as conn:
+        with conn.cursor(row_factory=dict_row) as cursor:
+            for i in range(0, len(assetIds), 500):
+                st = time.perf_counter()
+                cursor.execute(sql, (assetIds[i:i + 500],), prepare=True)
+                rows = cursor.fetchall()
+                tQry += time.perf_counter() - st
+                cntQry += 1
+
+                st = time.perf_counter()
+                for row in rows: rst[str(row['_aid'])] = models.AssetExInfo.fromDic(row)
+                tDec += time.perf_counter() - st
+
+    return rst, tQry, tDec, cntQry
+
+
+def run_test(assetIds, iterations: int = 5):
+    lg.info(f"\n## ExInfo test ({len(assetIds)} assets, {iterations} runs)")
+
+    legacy_exinfos(assetIds)
+    aggregated_exinfos(assetIds)
+
+    rsts = {}
+    for name, fn in (('3 queries / 100 ids', legacy_exinfos), ('aggregated json', aggregated_exinfos)):
+        tQry = tDec = 0.0
+        for _ in range(iterations):
+            rst, q, d, cntQry = fn(assetIds)
+            tQry += q
+            tDec += d
+        tQry /= iterations
+        tDec /= iterations
+        rsts[name] = (rst, tQry + tDec)
+
+        cntAlb = sum(len(e.albs) for e in rst.values())
+        cntTag = sum(len(e.tags) for e in rst.values())
+        cntFac = sum(len(e.facs) for e in rst.values())
+        lg.info(f"{name:<20} queries[{cntQry}] round trip {tQry * 1000:7.2f}ms decode {tDec * 1000:7.2f}ms | albums[{cntAlb}] tags[{cntTag}] faces[{cntFac}]")
+
+    (old, tOld), (new, tNew) = rsts.values()
+    for aid in old:
+        assert len(old[aid].albs) == len(new[aid].albs) and len(old[aid].tags) == len(new[aid].tags), f"mismatch on {aid}"
+
+    lg.info(f"=> Speed ratio: {tOld / tNew:.2f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare the aggregated extended info query against three queries per chunk')
+    parser.add_argument('--usr', default='', help='Immich user id, default the first user')
+    parser.add_argument('--size', type=int, default=200, help='assets in the group')
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    log.setup(logging.INFO, enableFile=False)
+    if not psql.init(): raise RuntimeError("cannot connect to PostgreSQL")
+
+    usrs = psql.fetchUsers()
+    usr = next((u for u in usrs if u.id == args.usr), usrs[0]) if usrs else None
+    if not usr: raise RuntimeError("no users")
+
+    # prefer assets that have albums so the aggregates are not empty
+    with psql.mkConn() as conn:
+        with conn.cursor() as c:
+            sch = psql.getSchema()
+            c.execute(f"""
+                Select a.id From asset a
+                Where a."ownerId" = %s And a.status = 'active'
+                Order By Exists (Select 1 From album_asset aa Where aa."{sch.albumAssetAssetId}" = a.id) Desc, a."createdAt" Desc
+                Limit %s
+            """, (usr.id, args.size))
+            ids = [str(r[0]) for r in c.fetchall()]
+
+    if not ids: raise RuntimeError(f"no assets for user[{usr.name}]")
+    run_test(ids, args.iterations)
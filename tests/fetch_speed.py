@@ -0,0 +1,77 @@
+import logging
+import math
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import psycopg
+
+from db import psql
+from util import log
+
+lg = log.get(__name__)
+
+
+class QueryCounter:
+    """
+    counts round trips made through psycopg cursors (execute + server-side fetches)
+    """
+    def __init__(self):
+        self.cnt = 0
+        self.origs = []
+
+    def __enter__(self):
+        def wrap(cls, name):
+            orig = getattr(cls, name)
+            self.origs.append((cls, name, orig))
+
+            def fn(cur, *args, **kwargs):
+                self.cnt += 1
+                return orig(cur, *args, **kwargs)
+            setattr(cls, name, fn)
+
+        wrap(psycopg.Cursor, 'execute')
+        wrap(psycopg.ServerCursor, 'execute')
+        wrap(psycopg.ServerCursor, 'fetchmany')
+        return self
+
+    def __exit__(self, *args):
+        for cls, name, orig in reversed(self.origs): setattr(cls, name, orig)
+
+
+def run_fetch_test(usr, szChunk: int):
+    with QueryCounter() as qc:
+        st = time.perf_counter()
+        tFirst = None
+        cnt = 0
+        for chunk in psql.iterAssets(usr, onUpdate=lambda p, m: None, szChunk=szChunk):
+            if tFirst is None: tFirst = time.perf_counter() - st
+            cnt += len(chunk)
+        dt = time.perf_counter() - st
+
+    # previous implementation: 1 select + 3 side queries per 100 ids
+    legacy = 2 + 3 * math.ceil(cnt / 100)
+    lg.info(f"chunk[{szChunk:>5}] assets[{cnt}] time[{dt:.2f}s] first chunk[{(tFirst or 0) * 1000:.0f}ms] queries[{qc.cnt}] (legacy ~{legacy})")
+    return dt, qc.cnt
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure streaming fetch from Immich: time and query count per chunk size')
+    parser.add_argument('--usr', default='', help='Immich user id, default the first user')
+    parser.add_argument('--chunks', default='100,500,2000', help='comma separated chunk sizes')
+    args = parser.parse_args()
+
+    log.setup(logging.INFO, enableFile=False)
+    if not psql.init(): raise RuntimeError("cannot connect to PostgreSQL")
+
+    usrs = psql.fetchUsers()
+    usr = next((u for u in usrs if u.id == args.usr), usrs[0]) if usrs else None
+    if not usr: raise RuntimeError("no users")
+
+    lg.info(f"user[{usr.name}] remote assets[{psql.count(usr.id)}]")
+    for sz in [int(s) for s in args.chunks.split(',') if s.strip()]:
+        run_fetch_test(usr, sz)
@@ -0,0 +1,157 @@
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from util import log
+
+lg = log.get(__name__)
+
+
+class TaskWatch:
+    """
+    listens to the task broadcasts so samples can be split by whether a task was running
+    """
+    def __init__(self, url: str):
+        self.running = False
+        self.name = ''
+        self.cntMsg = 0
+        self.sio = None
+
+        try:
+            import socketio
+        except ImportError:
+            lg.warning("python-socketio client not available, samples are not split by task state")
+            return
+
+        sio = socketio.Client(reconnection=True)
+
+        @sio.on('task_message')
+        def onMsg(data):
+            self.cntMsg += 1
+            typ = data.get('typ')
+            if typ == 'start':
+                self.running = True
+                self.name = data.get('nam') or ''
+            elif typ == 'complete':
+                self.running = False
+
+        try:
+            sio.connect(url, wait_timeout=5)
+            self.sio = sio
+        except Exception as e:
+            lg.warning(f"socket.io connect failed: {e}")
+
+    def close(self):
+        if self.sio: self.sio.disconnect()
+
+
+def pct(vals, p):
+    if not vals: return 0.0
+    s = sorted(vals)
+    return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+
+def get(url: str) -> int:
+    with urllib.request.urlopen(url, timeout=60) as rep:
+        return len(rep.read())
+
+
+def loadGrid(base: str, aids, mode: str, conns: int):
+    """
+    one grid open: every card image, or one batch request, returns (seconds, bytes, per request seconds)
+    """
+    st = time.perf_counter()
+    reqs = []
+
+    def one(url):
+        t = time.perf_counter()
+        n = get(url)
+        reqs.append(time.perf_counter() - t)
+        return n
+
+    if mode == 'batch':
+        size = one(f"{base}/api/imgs?ids={','.join(map(str, aids))}&w=240")
+    else:
+        path = '/api/img/{}' if mode == 'img' else '/api/rend/{}?w=240'
+        with ThreadPoolExecutor(max_workers=conns) as ex:  # browsers open ~6 connections per host
+            size = sum(ex.map(lambda a: one(base + path.format(a)), aids))
+
+    return time.perf_counter() - st, size, reqs
+
+
+def run_test(base: str, aids, mode: str, users: int, conns: int, duration: float, watch: TaskWatch):
+    lg.info(f"\n## Grid load ({mode}) users[{users}] cards[{len(aids)}] {duration:.0f}s")
+
+    samples = {False: [], True: []}
+    reqs = []
+    errs = 0
+    total = 0
+    lock = threading.Lock()
+    stop = time.time() + duration
+
+    def user():
+        nonlocal errs, total
+        while time.time() < stop:
+            busy = watch.running
+            try:
+                dt, size, rq = loadGrid(base, aids, mode, conns)
+                with lock:
+                    samples[busy or watch.running].append(dt)
+                    reqs.extend(rq)
+                    total += size
+            except Exception as e:
+                with lock: errs += 1
+                lg.warning(f"grid load failed: {e}")
+
+    ths = [threading.Thread(target=user, daemon=True) for _ in range(users)]
+    for t in ths: t.start()
+    for t in ths: t.join()
+
+    for busy, vals in samples.items():
+        if not vals: continue
+        lg.info(f"{'task running' if busy else 'idle':<13} grids[{len(vals):>4}] p50[{pct(vals, 50) * 1000:7.1f}ms] p99[{pct(vals, 99) * 1000:7.1f}ms] max[{max(vals) * 1000:7.1f}ms]")
+    lg.info(f"{'per request':<13} reqs[{len(reqs):>5}] p50[{pct(reqs, 50) * 1000:7.1f}ms] p99[{pct(reqs, 99) * 1000:7.1f}ms] bytes[{total / 1048576:.1f}MB] errors[{errs}]")
+
+    allVals = samples[False] + samples[True]
+    return pct(allVals, 50), pct(allVals, 99)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load a running MediaKit with similar-group grid opens and report p50/p99, start a vector task in the UI while it runs')
+    parser.add_argument('--url', default='http://127.0.0.1:8086')
+    parser.add_argument('--db', default=os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/pics.db')), help='pics.db to pick autoIds from')
+    parser.add_argument('--cards', type=int, default=50, help='images per grid')
+    parser.add_argument('--users', type=int, default=4, help='concurrent browsers')
+    parser.add_argument('--conns', type=int, default=6, help='connections per browser')
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--modes', default='img,rend,batch', help='comma separated: img, rend, batch')
+    args = parser.parse_args()
+
+    log.setup(logging.INFO, enableFile=False)
+
+    with sqlite3.connect(args.db) as conn:
+        aids = [r[0] for r in conn.execute("Select autoId From assets Where pathThumbnail Is Not Null Order By random() Limit ?", (args.cards,))]
+    if not aids: raise RuntimeError(f"no assets in {args.db}")
+
+    watch = TaskWatch(args.url)
+    try:
+        rsts = {}
+        for mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+            rsts[mode] = run_test(args.url, aids, mode, args.users, args.conns, args.duration, watch)
+
+        lg.info(f"task messages received[{watch.cntMsg}]")
+        if 'img' in rsts:
+            for mode, (p50, p99) in rsts.items():
+                if mode == 'img' or not p50: continue
+                lg.info(f"{mode} vs img => Speed ratio: p50 {rsts['img'][0] / p50:.2f}x p99 {rsts['img'][1] / p99:.2f}x")
+    finally:
+        watch.close()
@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import plotly.utils
+
+import db
+from ui import gv
+from util import log
+
+lg = log.get(__name__)
+
+
+def render(assets, muod: bool, batch: bool):
+    """
+    builds the grid and serializes it like the dash response does, returns (seconds, bytes)
+    """
+    st = time.perf_counter()
+    if muod:
+        grid = gv.mkGrdGrps(assets, batch=batch)
+    else:
+        grid = gv.mkGrd(assets, batch=batch)
+    size = len(json.dumps(grid, cls=plotly.utils.PlotlyJSONEncoder))
+    return time.perf_counter() - st, size
+
+
+def run_test(assets, muod: bool, batch: bool, iterations: int = 5):
+    lg.info(f"\n## Grid render ({len(assets)} assets, muod {muod}, {iterations} runs)")
+
+    winSize = gv.WinSize
+    rsts = {}
+    try:
+        for name, size in (('full', 10 ** 9), ('windowed', winSize)):
+            gv.WinSize = size
+            render(assets, muod, batch)
+
+            dt = 0.0
+            for _ in range(iterations):
+                t, sz = render(assets, muod, batch)
+                dt += t
+            dt /= iterations
+            rsts[name] = dt
+            lg.info(f"{name:<9} render {dt * 1000:8.1f}ms payload[{sz / 1024:8.1f}KB]")
+    finally:
+        gv.WinSize = winSize
+
+    # one scrolled window through the callback body
+    key = next(reversed(gv.gvSto.items), None)
+    if key:
+        wins, mkRow = gv.gvSto.get(key)
+        st = time.perf_counter()
+        rows = [mkRow(e) for e in wins[-1]]
+        size = len(json.dumps(rows, cls=plotly.utils.PlotlyJSONEncoder))
+        lg.info(f"{'window':<9} render {(time.perf_counter() - st) * 1000:8.1f}ms payload[{size / 1024:8.1f}KB] wins[{len(wins)}]")
+
+    lg.info(f"=> Speed ratio: {rsts['full'] / rsts['windowed']:.2f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare building a large similar group grid in full against the windowed grid')
+    parser.add_argument('--size', type=int, default=1000, help='assets in the group')
+    parser.add_argument('--groups', type=int, default=0, help='split into this many groups and use the multi group grid')
+    parser.add_argument('--no-batch', action='store_true', help='cards with their own image src')
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    log.setup(logging.INFO, enableFile=False)
+    db.sets.init()
+    db.pics.init()
+
+    assets = db.pics.getAll(args.size)
+    if not assets: raise RuntimeError("no assets in pics.db")
+    while len(assets) < args.size: assets = assets + assets[:args.size - len(assets)]
+
+    if args.groups:
+        for i, a in enumerate(assets): a.vw.muodId = i % args.groups + 1
+
+    run_test(assets, args.groups > 0, not args.no_batch, args.iterations)
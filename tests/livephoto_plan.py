@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+bench = 'mkit_bench_lp'
+
+# every pooled connection resolves asset/asset_file/asset_exif to the synthetic schema first
+os.environ['PGOPTIONS'] = f"-c search_path={bench},public"
+
+from db import psql
+from util import log
+
+lg = log.get(__name__)
+
+ownerId = '00000000-0000-4000-8000-000000000002'
+
+# previous enrich query: live video through a lateral UNION with a self join on livePhotoCID for every chunk
+legacySql = """
+    SELECT
+        e.*,
+        ids.id AS "_aid",
+        f.files AS "_files",
+        lv.video_id AS "_vdoId",
+        lv.video_path AS "_vdoPath",
+        lv.video_original_path AS "_vdoOrigPath"
+    FROM unnest(%s::uuid[]) AS ids(id)
+    LEFT JOIN LATERAL (
+        SELECT json_object_agg(af.type, af.path) AS files
+        FROM asset_file af
+        WHERE af."assetId" = ids.id
+    ) f ON true
+    LEFT JOIN asset_exif e ON e."assetId" = ids.id
+    LEFT JOIN LATERAL (
+        SELECT v.id AS video_id, v."encodedVideoPath" AS video_path, v."originalPath" AS video_original_path
+        FROM asset a
+        JOIN asset v ON v.id = a."livePhotoVideoId" AND v.type = 'VIDEO'
+        WHERE a.id = ids.id AND a.type = 'IMAGE'
+
+        UNION ALL
+
+        SELECT v.id, v."encodedVideoPath", v."originalPath"
+        FROM asset a
+        JOIN asset_exif ve ON ve."livePhotoCID" = e."livePhotoCID"
+        JOIN asset v ON ve."assetId" = v.id
+        WHERE a.id = ids.id
+        AND e."livePhotoCID" IS NOT NULL
+        AND a."livePhotoVideoId" IS NULL
+        AND a.type = 'IMAGE'
+        AND v.type = 'VIDEO'
+        AND v.id != a.id
+        LIMIT 1
+    ) lv ON true
+"""
+
+
+# noinspection SqlResolve
+def setup_pg(num_live: int, num_plain: int, indexCid: bool):
+    with psql.mkConn() as conn:
+        with conn.cursor() as c:
+            c.execute(f"DROP SCHEMA IF EXISTS {bench} CASCADE")
+            c.execute(f"CREATE SCHEMA {bench}")
+            c.execute(f"""
+                CREATE TABLE {bench}.asset (
+                    id                 uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+                    "ownerId"          uuid NOT NULL,
+                    type               varchar,
+                    "originalPath"     varchar,
+                    "encodedVideoPath" varchar,
+                    "livePhotoVideoId" uuid,
+                    "createdAt"        timestamptz DEFAULT now()
+                )
+            """)
+            c.execute(f'CREATE TABLE {bench}.asset_file ("assetId" uuid, type varchar, path varchar)')
+            c.execute(f'CREATE TABLE {bench}.asset_exif ("assetId" uuid PRIMARY KEY, make varchar, "livePhotoCID" varchar)')
+
+            # live pairs: photo + video sharing a CID, most photos are not linked by livePhotoVideoId
+            c.execute(f"""
+                INSERT INTO {bench}.asset ("ownerId", type, "originalPath", "encodedVideoPath")
+                SELECT %s, t, '/upload/' || t || '/' || g, CASE WHEN t = 'VIDEO' THEN '/encoded-video/' || g || '.mp4' END
+                FROM generate_series(1, %s) g CROSS JOIN (VALUES ('IMAGE'), ('VIDEO')) v(t)
+            """, (ownerId, num_live))
+            c.execute(f"""
+                INSERT INTO {bench}.asset ("ownerId", type, "originalPath")
+                SELECT %s, 'IMAGE', '/upload/plain/' || g FROM generate_series(1, %s) g
+            """, (ownerId, num_plain))
+            c.execute(f"""
+                INSERT INTO {bench}.asset_exif ("assetId", make, "livePhotoCID")
+                SELECT id, 'Apple', CASE WHEN "originalPath" NOT LIKE '/upload/plain/%'
+                                         THEN 'cid-' || regexp_replace("originalPath", '^.*/', '') END
+                FROM {bench}.asset
+            """)
+            c.execute(f"""
+                UPDATE {bench}.asset a SET "livePhotoVideoId" = v.id
+                FROM {bench}.asset v
+                WHERE a.type = 'IMAGE' AND v.type = 'VIDEO'
+                AND a."originalPath" = replace(v."originalPath", '/VIDEO/', '/IMAGE/')
+                AND mod((regexp_replace(a."originalPath", '^.*/', ''))::int, 10) = 0
+            """)
+            c.execute(f"""
+                INSERT INTO {bench}.asset_file ("assetId", type, path)
+                SELECT id, 'thumbnail', '/thumbs/' || id || '.webp' FROM {bench}.asset WHERE type = 'IMAGE'
+            """)
+            c.execute(f'CREATE INDEX ON {bench}.asset_file ("assetId")')
+            if indexCid: c.execute(f'CREATE INDEX ON {bench}.asset_exif ("livePhotoCID")')
+            for t in ('asset', 'asset_file', 'asset_exif'): c.execute(f"ANALYZE {bench}.{t}")
+        conn.commit()
+
+
+def drop_pg():
+    with psql.mkConn() as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {bench} CASCADE")
+        conn.commit()
+
+
+def explain(c, sql, params):
+    c.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+    plan = c.fetchone()[0]
+    if isinstance(plan, str): plan = json.loads(plan)
+    return plan[0]
+
+
+def nodes(plan, depth=0, out=None):
+    if out is None: out = []
+    n = plan if 'Node Type' in plan else plan['Plan']
+    out.append(f"{'  ' * depth}{n['Node Type']}{' on ' + n['Relation Name'] if 'Relation Name' in n else ''} rows[{n.get('Actual Rows')}] loops[{n.get('Actual Loops')}] time[{n.get('Actual Total Time')}ms]")
+    for ch in n.get('Plans', []): nodes(ch, depth + 1, out)
+    return out
+
+
+def run_test(num_live: int, num_plain: int, szChunk: int, indexCid: bool, keep: bool):
+    lg.info(f"\n## Live photo pairing ({num_live} live photos, {num_plain} plain, chunk {szChunk}, cid index {indexCid})")
+    st = time.time()
+    setup_pg(num_live, num_plain, indexCid)
+    lg.info(f"setup postgres: {time.time() - st:.1f}s")
+
+    try:
+        with psql.mkConn() as conn:
+            with conn.cursor() as c:
+                c.execute("Select id From asset Where type = 'IMAGE' Order By \"createdAt\" Desc")
+                ids = [r[0] for r in c.fetchall()]
+                chunks = [ids[i:i + szChunk] for i in range(0, len(ids), szChunk)]
+
+                tOld = tNew = 0.0
+                planOld = planNew = None
+                for ch in chunks:
+                    p = explain(c, legacySql, (ch,))
+                    tOld += p['Execution Time']
+                    planOld = planOld or p
+
+                    p = explain(c, psql.enrichSql, (ch,))
+                    tNew += p['Execution Time']
+                    planNew = planNew or p
+
+                pMap = explain(c, psql.liveMapSql, (ownerId,))
+                tMap = pMap['Execution Time']
+
+        lg.info("-- legacy lateral plan (first chunk)")
+        for ln in nodes(planOld): lg.info(ln)
+        lg.info("-- live map plan (once per fetch)")
+        for ln in nodes(pMap): lg.info(ln)
+        lg.info("-- enrich plan with direct join (first chunk)")
+        for ln in nodes(planNew): lg.info(ln)
+
+        lg.info(f"chunks[{len(chunks)}] legacy {tOld:.1f}ms | map {tMap:.1f}ms + enrich {tNew:.1f}ms = {tMap + tNew:.1f}ms => Speed ratio: {tOld / (tMap + tNew):.2f}x")
+        return tOld, tMap + tNew
+    finally:
+        if not keep: drop_pg()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare query plans: per chunk livePhotoCID self join against a once per fetch CID map')
+    parser.add_argument('--live', type=int, default=50000, help='live photo pairs to generate')
+    parser.add_argument('--plain', type=int, default=50000, help='photos without live video')
+    parser.add_argument('--chunk', type=int, default=100)
+    parser.add_argument('--no-index', action='store_true', help='skip the livePhotoCID index (immich ships one)')
+    parser.add_argument('--keep', action='store_true', help='keep the synthetic schema after the run')
+    args = parser.parse_args()
+
+    log.setup(logging.INFO, enableFile=False)
+    if not psql.init(): raise RuntimeError("cannot connect to PostgreSQL")
+
+    run_test(args.live, args.plain, args.chunk, not args.no_index, args.keep)
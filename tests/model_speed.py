@@ -4,7 +4,7 @@ import os
 import sqlite3
 import sys
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -54,6 +54,19 @@ class ComplexAsset(BaseDictModel):
     locations: List[Address] = None
     metadata: Json = None
 
+@dataclass
+class RowAsset(BaseDictModel):
+    autoId: int = 0
+    id: str = ""
+    ownerId: str = ""
+    originalFileName: str = ""
+    fileCreatedAt: Optional[str] = None
+    isFavorite: int = 0
+    isVectored: Optional[int] = 0
+    jsonExif: Contact = field(default_factory=lambda: Contact(email=""))
+    simInfos: List[Tag] = field(default_factory=list)
+    simGIDs: List[int] = field(default_factory=list)
+
 
 # noinspection SqlResolve
 def setup_simple_test_db(num_records: int = 1000) -> sqlite3.Connection:
@@ -426,6 +439,97 @@ def run_nested_object_test(iterations: int = 3, num_records: int = 100, silent:
     return avg_dict_time, avg_model_time
 
 
+# noinspection SqlResolve
+def setup_row_test_db(num_records: int = 1000) -> sqlite3.Connection:
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    cursor.execute('''
+	Create Table If Not Exists row_assets (
+		autoId INTEGER Primary Key,
+		id TEXT,
+		ownerId TEXT,
+		originalFileName TEXT,
+		fileCreatedAt TEXT,
+		isFavorite INTEGER,
+		isVectored INTEGER,
+		jsonExif TEXT,
+		simInfos TEXT,
+		simGIDs TEXT
+	)
+	''')
+
+    rows = []
+    for i in range(num_records):
+        rows.append((
+            i + 1,
+            f"id-{i}",
+            f"owner-{i % 10}",
+            f"image_{i}.jpg",
+            f"2023-01-{(i % 28) + 1:02d}",
+            i % 2,
+            i % 3,
+            json.dumps({"email": f"user{i}@example.com", "phone": f"555-{i:04d}"}),
+            json.dumps([{"name": f"tag{j}", "color": "red"} for j in range(i % 4)]),
+            json.dumps([i + j for j in range(i % 3)]),
+        ))
+    cursor.executemany("Insert Into row_assets Values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    conn.commit()
+    return conn
+
+
+def run_decoder_test(iterations: int = 5, num_records: int = 10000, silent: bool = False):
+    if not silent:
+        lg.info(f"Starting row decoder test: reading {num_records} records, testing {iterations} times")
+
+    conn = setup_row_test_db(num_records)
+    cursor = conn.cursor()
+    sql = "Select * From row_assets"
+
+    def timeit(fn):
+        times = []
+        for _ in range(iterations):
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+            st = time.perf_counter()
+            fn(rows)
+            times.append(time.perf_counter() - st)
+        return sum(times) / len(times)
+
+    def generic(rows):
+        return [RowAsset._fromDBSlow(cursor, row) for row in rows]
+
+    def decoder(rows):
+        return [RowAsset.fromDB(cursor, row) for row in rows]
+
+    def decoderAccess(rows):
+        rst = [RowAsset.fromDB(cursor, row) for row in rows]
+        for a in rst: _ = (a.jsonExif, a.simInfos, a.simGIDs)
+        return rst
+
+    cursor.execute(sql)
+    rows = cursor.fetchall()
+    for row in rows[:100]:
+        assert RowAsset.fromDB(cursor, row) == RowAsset._fromDBSlow(cursor, row), "decoder result mismatch"
+
+    t1 = timeit(generic)
+    t2 = timeit(decoder)
+    t3 = timeit(decoderAccess)
+    conn.close()
+
+    if not silent:
+        lg.info("=" * 50)
+        lg.info(f"Row decoder test completed: read {num_records} records, tested {iterations} times")
+        lg.info(f"Generic fromDB (reflection) average time: {t1:.6f} seconds")
+        lg.info(f"Generated decoder, json untouched average time: {t2:.6f} seconds => {t1 / t2:.2f}x faster")
+        lg.info(f"Generated decoder, json accessed average time: {t3:.6f} seconds => {t1 / t3:.2f}x faster")
+        lg.info("=" * 50)
+
+    return t1, t2, t3
+
+
 def run_all_tests(small_only: bool = False):
     log.setLog(logging.INFO)
     lg.info("=" * 80)
@@ -441,6 +545,7 @@ def run_all_tests(small_only: bool = False):
     simple_time1, simple_time2 = run_simple_test(iterations=5, num_records=1000)
     complex_time1, complex_time2 = run_complex_test(iterations=5, num_records=1000)
     nested_time1, nested_time2 = run_nested_object_test(iterations=3, num_records=100)
+    dec_time1, dec_time2, dec_time3 = run_decoder_test(iterations=5, num_records=1000 if small_only else 10000)
 
     if not small_only:
         lg.info("\n## Large test (10000 records)")
@@ -460,6 +565,8 @@ def run_all_tests(small_only: bool = False):
     lg.info(f"Complex data - dict+JSON vs BaseDictModel: {complex_time1:.6f}s vs {complex_time2:.6f}s => Speed ratio: {complex_time2 / complex_time1:.2f}x")
     lg.info(f"Nested objects - Pure dict vs BaseDictModel: {nested_time1:.6f}s vs {nested_time2:.6f}s => Speed ratio: {nested_time2 / nested_time1:.2f}x")
 
+    lg.info(f"Row decoder - generic fromDB vs generated decoder: {dec_time1:.6f}s vs {dec_time2:.6f}s => Speed ratio: {dec_time1 / dec_time2:.2f}x (json accessed: {dec_time1 / dec_time3:.2f}x)")
+
     lg.info("\nLarge dataset:")
     lg.info(f"Simple data (10000 records) - dict(zip) vs BaseDictModel: {large_simple_time1:.6f}s vs {large_simple_time2:.6f}s => Speed ratio: {large_simple_time2 / large_simple_time1:.2f}x")
     lg.info(f"Complex data (5000 records) - dict+JSON vs BaseDictModel: {large_complex_time1:.6f}s vs {large_complex_time2:.6f}s => Speed ratio: {large_complex_time2 / large_complex_time1:.2f}x")
@@ -0,0 +1,99 @@
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from db import pics
+from util import log
+
+lg = log.get(__name__)
+
+prefixes = ['IMG_', 'DSC_', 'PXL_', 'Screenshot_', 'VID_', 'photo_']
+exts = ['.jpg', '.JPG', '.heic', '.png', '.dng', '.mp4']
+terms = ['IMG_12', 'screenshot', '2021', 'heic', 'holiday', 'PXL_2023']
+
+
+# noinspection SqlResolve
+def setup_test_db(num_records: int = 100000) -> sqlite3.Connection:
+    conn = sqlite3.connect(':memory:')
+    c = conn.cursor()
+    c.execute('''
+        Create Table assets (
+            autoId           INTEGER Primary Key AUTOINCREMENT,
+            id               TEXT Unique,
+            ownerId          TEXT,
+            originalFileName TEXT,
+            originalPath     TEXT,
+            isVectored       INTEGER Default 0
+        )
+    ''')
+    pics.initFts(c)
+
+    rnd = random.Random(42)
+    dirs = ['holiday', 'family', 'work', 'camera', 'phone']
+    rows = []
+    for i in range(num_records):
+        name = f"{rnd.choice(prefixes)}{rnd.randint(2015, 2024)}{i:07d}{rnd.choice(exts)}"
+        path = f"/upload/{rnd.choice(dirs)}/{rnd.randint(2015, 2024)}/{name}"
+        rows.append((f"id-{i}", "usr", name, path))
+    c.executemany("Insert Into assets (id, ownerId, originalFileName, originalPath) Values (?, ?, ?, ?)", rows)
+    conn.commit()
+    return conn
+
+
+def query_like(c: sqlite3.Cursor, term: str):
+    c.execute("Select Count(*) From assets Where ownerId = ? AND originalFileName LIKE ?", ("usr", f"%{term}%"))
+    cnt = c.fetchone()[0]
+    c.execute("Select * From assets Where ownerId = ? AND originalFileName LIKE ? Order By autoId DESC LIMIT 24", ("usr", f"%{term}%"))
+    c.fetchall()
+    return cnt
+
+
+def query_fts(c: sqlite3.Cursor, term: str):
+    cd, pm = pics.mkSearchCond(term)
+    c.execute(f"Select Count(*) From assets Where ownerId = ? AND {cd}", ("usr", *pm))
+    cnt = c.fetchone()[0]
+    c.execute(f"Select * From assets Where ownerId = ? AND {cd} Order By autoId DESC LIMIT 24", ("usr", *pm))
+    c.fetchall()
+    return cnt
+
+
+def run_test(num_records: int, iterations: int = 5):
+    lg.info(f"\n## Search test ({num_records} records)")
+    st = time.time()
+    conn = setup_test_db(num_records)
+    lg.info(f"setup with fts triggers: {time.time() - st:.3f}s")
+    c = conn.cursor()
+
+    tLike = tFts = 0.0
+    for term in terms:
+        st = time.perf_counter()
+        for _ in range(iterations): cntLike = query_like(c, term)
+        dtLike = (time.perf_counter() - st) / iterations
+
+        st = time.perf_counter()
+        for _ in range(iterations): cntFts = query_fts(c, term)
+        dtFts = (time.perf_counter() - st) / iterations
+
+        tLike += dtLike
+        tFts += dtFts
+        lg.info(f"term[{term:<12}] like[{cntLike:>6}] {dtLike * 1000:8.2f}ms | fts[{cntFts:>6}] {dtFts * 1000:8.2f}ms => {dtLike / dtFts:.2f}x")
+
+    conn.close()
+    lg.info(f"total LIKE {tLike * 1000:.2f}ms vs FTS {tFts * 1000:.2f}ms => Speed ratio: {tLike / tFts:.2f}x")
+    lg.info("note: fts also matches originalPath, so counts can be higher than LIKE on file name")
+    return tLike, tFts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare fts5 trigram search against LIKE on assets file names')
+    parser.add_argument('--small', action='store_true', help='Run only small tests (skip large data tests)')
+    args = parser.parse_args()
+
+    run_test(10000)
+    if not args.small: run_test(200000, iterations=3)
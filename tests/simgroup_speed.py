@@ -0,0 +1,126 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from db import pics
+from util import log
+
+lg = log.get(__name__)
+
+mainCheck = """
+    WITH main_check AS (
+        SELECT DISTINCT gid.value as main_autoId
+        FROM assets a2
+        CROSS JOIN json_each(a2.simGIDs) gid
+        WHERE a2.autoId != gid.value
+    )
+    SELECT
+        a.*,
+        CASE WHEN mc.main_autoId IS NOT NULL THEN 1 ELSE 0 END as isMain
+    FROM assets a
+    LEFT JOIN main_check mc ON a.autoId = mc.main_autoId
+"""
+
+groupCond = """
+    a.autoId != ? AND (
+        EXISTS (SELECT 1 FROM json_each(a.simGIDs) WHERE value IN ({0}))
+        OR EXISTS (SELECT 1 FROM json_each(a.simGIDs) WHERE value = ?)
+    )
+"""
+
+
+# noinspection SqlResolve
+def setup_test_db(num_records: int, groupSize: int = 5, groupEvery: int = 50) -> sqlite3.Connection:
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute('''
+        Create Table assets (
+            autoId     INTEGER Primary Key AUTOINCREMENT,
+            id         TEXT Unique,
+            isVectored INTEGER Default 1,
+            simOk      INTEGER Default 0,
+            simInfos   TEXT Default '[]',
+            simGIDs    TEXT Default '[]',
+            isMain     INTEGER Default 0
+        )
+    ''')
+    c.executemany("Insert Into assets (id) Values (?)", [(f"id-{i}",) for i in range(num_records)])
+
+    rnd = random.Random(7)
+    roots = []
+    for root in range(1, num_records + 1, groupEvery):
+        kids = [root + k for k in range(1, groupSize) if root + k <= num_records]
+        infos = [{"aid": root, "score": 1.0, "isSelf": True}] + [{"aid": k, "score": rnd.uniform(0.9, 0.99), "isSelf": False} for k in kids]
+        c.execute("Update assets Set simGIDs = ?, simInfos = ? Where autoId = ?", (json.dumps([root]), json.dumps(infos), root))
+        for k in kids:
+            c.execute("Update assets Set simGIDs = ?, simInfos = ? Where autoId = ?", (json.dumps([root]), json.dumps(infos), k))
+        roots.append(root)
+
+    c.execute("CREATE INDEX idx_assets_isMain ON assets(isMain, simOk)")
+    c.execute("CREATE INDEX idx_assets_grouped ON assets(autoId) WHERE simGIDs != '[]'")
+    pics.updMainBy(c)
+    conn.commit()
+    return conn, roots
+
+
+def open_old(c: sqlite3.Cursor, root: int):
+    c.execute(mainCheck + " WHERE a.autoId = ?", (root,))
+    row = c.fetchone()
+    infos = json.loads(row['simInfos'])
+    aids = [i['aid'] for i in infos if not i['isSelf']]
+    c.execute(mainCheck + f" WHERE a.autoId IN ({','.join('?' * len(aids))})", aids)
+    c.fetchall()
+    c.execute(mainCheck + " WHERE " + groupCond.format('?'), (root, root, root))
+    return [row['isMain']] + [r['isMain'] for r in c.fetchall()]
+
+
+def open_new(c: sqlite3.Cursor, root: int):
+    c.execute("SELECT a.* FROM assets a WHERE a.autoId = ?", (root,))
+    row = c.fetchone()
+    infos = json.loads(row['simInfos'])
+    aids = [i['aid'] for i in infos if not i['isSelf']]
+    c.execute(f"SELECT a.* FROM assets a WHERE a.autoId IN ({','.join('?' * len(aids))})", aids)
+    c.fetchall()
+    c.execute("SELECT a.* FROM assets a WHERE a.simGIDs != '[]' AND " + groupCond.format('?'), (root, root, root))
+    return [row['isMain']] + [r['isMain'] for r in c.fetchall()]
+
+
+def run_test(num_records: int, samples: int = 20):
+    lg.info(f"\n## Open group test ({num_records} records)")
+    st = time.time()
+    conn, roots = setup_test_db(num_records)
+    lg.info(f"setup: {time.time() - st:.3f}s groups[{len(roots)}]")
+    c = conn.cursor()
+
+    picks = random.Random(1).sample(roots, min(samples, len(roots)))
+    for r in picks[:3]:
+        assert open_old(c, r) == open_new(c, r), f"isMain mismatch for group #{r}"
+
+    st = time.perf_counter()
+    for r in picks: open_old(c, r)
+    tOld = (time.perf_counter() - st) / len(picks)
+
+    st = time.perf_counter()
+    for r in picks: open_new(c, r)
+    tNew = (time.perf_counter() - st) / len(picks)
+
+    conn.close()
+    lg.info(f"main_check CTE: {tOld * 1000:.2f}ms/group | stored isMain: {tNew * 1000:.2f}ms/group => Speed ratio: {tOld / tNew:.2f}x")
+    return tOld, tNew
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare opening a similar group with the main_check CTE against the stored isMain flag')
+    parser.add_argument('--small', action='store_true', help='Run only small tests (skip large data tests)')
+    args = parser.parse_args()
+
+    run_test(10000)
+    if not args.small: run_test(400000, samples=10)
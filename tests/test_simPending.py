@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from util import log
+from mod import models
+from db import pics
+
+lg = log.get(__name__)
+
+
+class TestSimPending(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.oldDb = pics.pathDb
+        pics.pathDb = os.path.join(self.dir.name, 'pics.db')
+        pics.init()
+
+    def tearDown(self):
+        pics.pathDb = self.oldDb
+        self.dir.cleanup()
+
+    def mkGroup(self, root: int, kids: list[int]):
+        infos = [{"aid": root, "score": 1.0, "isSelf": True}] + [{"aid": k, "score": 0.95, "isSelf": False} for k in kids]
+        with pics.mkConn() as conn:
+            c = conn.cursor()
+            for aid in [root] + kids:
+                c.execute("Insert Into assets (autoId, id, ownerId, isVectored) Values (?, ?, 'usr', 1)", (aid, f"id-{aid}"))
+                c.execute("Update assets Set simGIDs = ?, simInfos = ? Where autoId = ?", (json.dumps([root]), json.dumps(infos), aid))
+            pics.updMainBy(c, [root])
+            conn.commit()
+
+    def isMain(self, aid: int) -> int:
+        with pics.mkConn() as conn:
+            return conn.execute("Select isMain From assets Where autoId = ?", (aid,)).fetchone()[0]
+
+    def test_group_with_children(self):
+        self.mkGroup(1, [2, 3])
+
+        self.assertEqual([self.isMain(a) for a in (1, 2, 3)], [1, 0, 0])
+        self.assertEqual(pics.countSimPending(), 1)
+        self.assertEqual([a.autoId for a in pics.getPagedPending()], [1])
+
+    def test_children_all_resolved(self):
+        self.mkGroup(1, [2, 3])
+        self.mkGroup(10, [11])
+
+        pics.setResloveBy([models.Asset(autoId=2), models.Asset(autoId=3)])
+
+        # the root keeps simGIDs=[root] and its simInfos: no longer main, but still a pending leader
+        self.assertEqual(self.isMain(1), 0)
+        self.assertEqual(self.isMain(10), 1)
+        self.assertEqual(pics.countSimPending(), 2)
+        self.assertEqual(sorted(a.autoId for a in pics.getPagedPending()), [1, 10])
+
+    def test_root_resolved(self):
+        self.mkGroup(1, [2, 3])
+
+        pics.setResloveBy([models.Asset(autoId=1), models.Asset(autoId=2), models.Asset(autoId=3)])
+
+        self.assertEqual(pics.countSimPending(), 0)
+        self.assertEqual(pics.getPagedPending(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()